@@ -17,6 +17,7 @@ os.environ['PYTHONUNBUFFERED'] = '1'
 from fastapi import FastAPI, Depends, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional, Dict, Any
 import logging
@@ -270,6 +271,8 @@ class FetchDataRequest(BaseModel):
     period: str = Field(default="2y")
     include_features: bool = False
     refresh: bool = False
+    incremental: bool = True
+    intraday_timeframe: Optional[str] = None
     
     @field_validator('symbols')
     @classmethod
@@ -287,6 +290,15 @@ class FetchDataRequest(BaseModel):
         if v not in valid_periods:
             raise ValueError(f'Invalid period. Valid options: {", ".join(valid_periods)}')
         return v
+    
+    @field_validator('intraday_timeframe')
+    @classmethod
+    def validate_intraday_timeframe(cls, v):
+        """Validate intraday timeframe is one of the buffered resolutions"""
+        valid_timeframes = ['1m', '5m', '15m', '30m', '1h']
+        if v is not None and v not in valid_timeframes:
+            raise ValueError(f'Invalid intraday timeframe. Valid options: {", ".join(valid_timeframes)}')
+        return v
 
 
 # ==================== Utility Functions ====================
@@ -421,6 +433,10 @@ async def health_check():
         memory = psutil.virtual_memory()
         disk = psutil.disk_usage('.')
         
+        # Cache directory sizes from the cache manager's last pass (no directory scan per call)
+        from core.ml.cache_manager import cache_manager
+        disk_cache = cache_manager.report()
+        
         health_data = {
             'status': 'healthy',
             'timestamp': datetime.now().isoformat(),
@@ -437,10 +453,29 @@ async def health_check():
             },
             'models': {
                 'available': True,
-                'total_trained': len(list(Path('models').glob('*.pkl')))
-            }
+                'total_trained': disk_cache['stores']['models']['files']
+            },
+            'disk_cache': disk_cache
         }
         
+        # Pipeline cache counters, once the adapter has been loaded
+        if mcp_adapter is not None:
+            from core.ml.frame_cache import frame_cache
+            from core.ml.resample import resample_cache
+            from core.ml.feature_pool import feature_pool
+            from core.ml.panel import universe_panel
+            from core.ml.indicators import backend_stats
+            health_data['pipeline'] = {
+                'memory_cache': frame_cache.stats(),
+                'resample_cache': resample_cache.stats(),
+                'feature_pool': feature_pool.stats(),
+                'universe_panel': universe_panel.stats(),
+                'indicator_backend': backend_stats(),
+                'single_flight': mcp_adapter.single_flight.stats(),
+                'background_refresh': mcp_adapter.refresher.stats(),
+                'providers': mcp_adapter.ingester.provider.stats()
+            }
+        
         return health_data
         
     except Exception as e:
@@ -467,7 +502,8 @@ async def predict(
         if not validate_horizon(data['horizon']):
             raise HTTPException(status_code=400, detail='Invalid horizon. Valid options: intraday, short, long')
         
-        result = get_mcp_adapter().predict(
+        result = await run_in_threadpool(
+            get_mcp_adapter().predict,
             symbols=data['symbols'],
             horizon=data['horizon'],
             risk_profile=data.get('risk_profile')
@@ -508,7 +544,8 @@ async def scan_all(
         if not validate_confidence(data['min_confidence']):
             raise HTTPException(status_code=400, detail='min_confidence must be between 0.0 and 1.0')
         
-        result = get_mcp_adapter().scan_all(
+        result = await run_in_threadpool(
+            get_mcp_adapter().scan_all,
             symbols=data['symbols'],
             horizon=data['horizon'],
             min_confidence=data['min_confidence'],
@@ -557,7 +594,8 @@ async def analyze(
         if not risk_validation['valid']:
             raise HTTPException(status_code=400, detail=risk_validation['error'])
         
-        result = get_mcp_adapter().analyze(
+        result = await run_in_threadpool(
+            get_mcp_adapter().analyze,
             symbol=data['symbol'],
             horizons=data['horizons'],
             stop_loss_pct=data['stop_loss_pct'],
@@ -694,7 +732,8 @@ async def train_rl(
         except (ValueError, TypeError):
             raise HTTPException(status_code=400, detail='n_episodes must be an integer')
         
-        result = get_mcp_adapter().train_rl(
+        result = await run_in_threadpool(
+            get_mcp_adapter().train_rl,
             symbol=data['symbol'],
             horizon=data['horizon'],
             n_episodes=n_episodes,
@@ -734,11 +773,14 @@ async def fetch_data(
         if data['period'] not in valid_periods:
             raise HTTPException(status_code=400, detail=f'Invalid period. Valid options: {", ".join(valid_periods)}')
         
-        result = get_mcp_adapter().fetch_data(
+        result = await run_in_threadpool(
+            get_mcp_adapter().fetch_data,
             symbols=data['symbols'],
             period=data['period'],
             include_features=data['include_features'],
-            refresh=data['refresh']
+            refresh=data['refresh'],
+            incremental=data.get('incremental', True),
+            intraday_timeframe=data.get('intraday_timeframe')
         )
         
         log_api_request('/tools/fetch_data', data, result, 200)
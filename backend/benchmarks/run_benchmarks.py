@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Performance benchmarks for the feature and cache pipeline
+
+Every benchmark runs on synthetic data in a scratch directory (nothing under
+data/ is touched) and prints its result as JSON:
+    cd backend && python benchmarks/run_benchmarks.py [obv compact ...]
+Without arguments, all benchmarks run.
+"""
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.ml.batch_features import BatchFeatureEngineer
+from core.ml.compact import compact_frame, compare_precision, FLOAT32_RTOL
+from core.ml.data import EnhancedDataIngester
+from core.ml.feature_pool import FeaturePool, FEATURE_WORKERS
+from core.ml.features import FeatureEngineer, FEATURE_CACHE_DIR
+from core.ml.providers import SyntheticProvider
+from core.ml.synthetic import SyntheticMarket
+
+
+def synthetic_histories(n_symbols: int, years: int):
+    market = SyntheticMarket()
+    end = pd.Timestamp.now().normalize()
+    start = end - pd.DateOffset(years=years)
+    return {symbol: market.history(symbol, start=start, end=end) for symbol in market.universe(n_symbols)}
+
+
+def obv_row_loop(df: pd.DataFrame) -> pd.Series:
+    # The per-row OBV that FeatureEngineer used before it was vectorized
+    obv = [0]
+    for i in range(1, len(df)):
+        if df['Close'].iloc[i] > df['Close'].iloc[i-1]:
+            obv.append(obv[-1] + df['Volume'].iloc[i])
+        elif df['Close'].iloc[i] < df['Close'].iloc[i-1]:
+            obv.append(obv[-1] - df['Volume'].iloc[i])
+        else:
+            obv.append(obv[-1])
+    return pd.Series(obv, index=df.index)
+
+
+def benchmark_obv(n_symbols: int = 500, years: int = 10, baseline_symbols: int = 10) -> Dict[str, Any]:
+    """
+    Vectorized OBV against the per-row loop. The loop only runs on
+    `baseline_symbols` symbols (seconds each at 10 years) and is extrapolated.
+    """
+    histories = list(synthetic_histories(n_symbols, years).values())
+    engineer = FeatureEngineer(compact=False)
+
+    started = time.perf_counter()
+    vectorized = [engineer._calculate_obv(df) for df in histories]
+    vectorized_seconds = time.perf_counter() - started
+
+    sample = histories[:baseline_symbols]
+    started = time.perf_counter()
+    baseline = [obv_row_loop(df) for df in sample]
+    loop_seconds = (time.perf_counter() - started) * len(histories) / max(1, len(sample))
+
+    return {
+        'symbols': len(histories),
+        'rows_per_symbol': int(np.mean([len(df) for df in histories])),
+        'vectorized_seconds': round(vectorized_seconds, 4),
+        'row_loop_seconds_estimated': round(loop_seconds, 2),
+        'speedup': round(loop_seconds / vectorized_seconds, 1),
+        'identical': all(np.array_equal(a.to_numpy(), b.to_numpy()) for a, b in zip(vectorized, baseline))
+    }
+
+
+def benchmark_batch_features(n_symbols: int = 500, years: int = 2, baseline_symbols: int = 50) -> Dict[str, Any]:
+    """
+    Batch feature building against per-symbol calculate_all_features. The
+    per-symbol path only runs on `baseline_symbols` symbols and is extrapolated.
+    """
+    frames = synthetic_histories(n_symbols, years)
+    engineer = FeatureEngineer(compact=False)
+
+    started = time.perf_counter()
+    batch = BatchFeatureEngineer(engineer).calculate(frames)
+    batch_seconds = time.perf_counter() - started
+
+    sample = list(frames)[:baseline_symbols]
+    started = time.perf_counter()
+    single = {symbol: engineer.calculate_all_features(frames[symbol], symbol) for symbol in sample}
+    single_seconds = (time.perf_counter() - started) * len(frames) / max(1, len(sample))
+
+    max_error = 0.0
+    for symbol in sample:
+        expected = single[symbol].to_numpy(dtype=np.float64)
+        actual = batch[symbol].to_numpy(dtype=np.float64)
+        if expected.shape != actual.shape:
+            max_error = float('inf')
+            break
+        scale = np.maximum(np.abs(expected), 1e-12)
+        max_error = max(max_error, float(np.max(np.abs(actual - expected) / scale)) if expected.size else 0.0)
+    return {
+        'symbols': len(frames),
+        'rows_per_symbol': int(np.mean([len(df) for df in frames.values()])),
+        'batch_seconds': round(batch_seconds, 3),
+        'per_symbol_seconds_estimated': round(single_seconds, 3),
+        'speedup': round(single_seconds / batch_seconds, 1),
+        'max_relative_error': max_error
+    }
+
+
+def benchmark_compact(n_symbols: int = 500, years: int = 2) -> Dict[str, Any]:
+    """
+    Memory of a universe's price and feature frames in float64 and in compact
+    dtypes, and the largest relative error the compact path introduces
+    """
+    engineer = FeatureEngineer(compact=False)
+    sizes = {'price_bytes': 0, 'price_bytes_compact': 0, 'feature_bytes': 0, 'feature_bytes_compact': 0}
+    histories = synthetic_histories(n_symbols, years)
+    for symbol, prices in histories.items():
+        features = engineer.calculate_all_features(prices, symbol)
+        sizes['price_bytes'] += int(prices.memory_usage(deep=True).sum())
+        sizes['price_bytes_compact'] += int(compact_frame(prices).memory_usage(deep=True).sum())
+        sizes['feature_bytes'] += int(features.memory_usage(deep=True).sum())
+        sizes['feature_bytes_compact'] += int(compact_frame(features).memory_usage(deep=True).sum())
+    precision = compare_precision(next(iter(histories.values())))
+    total = sizes['price_bytes'] + sizes['feature_bytes']
+    total_compact = sizes['price_bytes_compact'] + sizes['feature_bytes_compact']
+    return dict(
+        sizes,
+        symbols=len(histories),
+        memory_ratio=round(total_compact / total, 3) if total else None,
+        max_relative_error=precision['max_relative_error'],
+        worst_column=precision['worst_column'],
+        within_tolerance=precision['max_relative_error'] <= FLOAT32_RTOL
+    )
+
+
+def benchmark_feature_pool(n_symbols: int = 200, years: int = 2, workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    A cold feature build for a synthetic universe in process and on the pool.
+    Pool workers inherit the scratch directory as their working directory.
+    """
+    ingester = EnhancedDataIngester(provider=SyntheticProvider())
+    symbols = SyntheticMarket().universe(n_symbols)
+    for symbol in symbols:
+        ingester.fetch_all_data(symbol, period=f"{years}y", include_fundamentals=False)
+
+    def cold_build(pool: FeaturePool) -> float:
+        shutil.rmtree(FEATURE_CACHE_DIR, ignore_errors=True)
+        Path(FEATURE_CACHE_DIR).mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
+        pool.update(symbols)
+        return time.perf_counter() - started
+
+    in_process = cold_build(FeaturePool(max_workers=1))
+    pool = FeaturePool(max_workers=workers or max(2, FEATURE_WORKERS))
+    pool.update(symbols[:pool.min_symbols])  # start and warm up the workers
+    pooled = cold_build(pool)
+    pool.shutdown()
+    return {
+        'symbols': n_symbols,
+        'workers': pool.max_workers,
+        'cpu_count': os.cpu_count(),
+        'in_process_seconds': round(in_process, 3),
+        'pool_seconds': round(pooled, 3),
+        'speedup': round(in_process / pooled, 2)
+    }
+
+
+BENCHMARKS = {
+    'obv': benchmark_obv,
+    'batch_features': benchmark_batch_features,
+    'compact': benchmark_compact,
+    'feature_pool': benchmark_feature_pool,
+}
+
+
+def main(names):
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmark(s): {', '.join(unknown)}. Available: {', '.join(BENCHMARKS)}")
+        return 1
+    previous = os.getcwd()
+    for name in names or BENCHMARKS:
+        with tempfile.TemporaryDirectory() as scratch:
+            os.chdir(scratch)
+            try:
+                result = BENCHMARKS[name]()
+            finally:
+                os.chdir(previous)
+        print(json.dumps({name: result}, indent=2), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(main(sys.argv[1:]))
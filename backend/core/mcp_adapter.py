@@ -6,13 +6,25 @@ Provides tool-style interfaces for stock prediction system
 import json
 import time
 import logging
+import threading
 from datetime import datetime
 from typing import List, Dict, Optional, Any
 from pathlib import Path
 
 # Import from the new ML package structure
 from .ml.data import EnhancedDataIngester
-from .ml.features import FeatureEngineer
+from .ml.store import price_cache_path
+from .ml.frame_cache import frame_cache
+from .ml.cache_manager import cache_manager
+from .ml.intraday import intraday_store
+from .ml.resample import resample_cache
+from .ml.panel import universe_panel
+from .ml.batch import BatchFetcher
+from .ml.singleflight import SingleFlight
+from .ml.refresh import BackgroundRefresher
+from .ml.features import FeatureEngineer, feature_path, feature_mtime
+from .ml.feature_pool import feature_pool
+from .ml.indicators import backend_stats, measure_backend_import
 from .ml.model import predict_stock_price, train_ml_models, DQNTradingAgent
 from .ml.feedback import provide_feedback, load_feedback_memory
 
@@ -39,12 +51,21 @@ class MCPAdapter:
     def __init__(self):
         self.ingester = EnhancedDataIngester()
         self.engineer = FeatureEngineer()
+        self.batch_fetcher = BatchFetcher(self.ingester)
+        self.single_flight = SingleFlight()
+        self.refresher = BackgroundRefresher()
         self.request_counter = 0
+        # Keeps data/cache, data/features, models and request logs within their disk budget
+        cache_manager.start()
+        # Times the optional indicator backend's import in a child process, for health
+        measure_backend_import()
+        self._counter_lock = threading.Lock()
         
     def _log_request(self, tool_name: str, request_data: Dict) -> str:
         """Log incoming request"""
-        self.request_counter += 1
-        request_id = f"{tool_name}_{int(time.time())}_{self.request_counter}"
+        with self._counter_lock:
+            self.request_counter += 1
+            request_id = f"{tool_name}_{int(time.time())}_{self.request_counter}"
         
         log_entry = {
             "request_id": request_id,
@@ -113,6 +134,145 @@ class MCPAdapter:
         
         logger.info(f"MCP Response [{request_id}]: {duration_ms:.2f}ms")
     
+    def _fetch_price_history(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Fetch price history, sharing one download between concurrent requests"""
+        def fetch():
+            # A request that finished just before this one may already have refreshed it
+            if self.ingester.freshness(symbol) in ('fresh', 'stale'):
+                return self.ingester.load_all_data(symbol)
+            return self.ingester.fetch_all_data(symbol, period="2y", incremental=True, include_fundamentals=False)
+        
+        return self.single_flight.do(('fetch', symbol, None), fetch)
+    
+    def _calculate_features(self, symbol: str) -> bool:
+        """Calculate and save features once for concurrent requests; True if features are available"""
+        def calculate():
+            # A request that finished just before this one may already have written them
+            if self._features_current(symbol):
+                return True
+            all_data = self.ingester.load_all_data(symbol)
+            if not all_data:
+                return False
+            df = all_data.get('price_history')
+            if df is None or df.empty:
+                return False
+            # Only bars newer than the cached features are computed
+            self.engineer.update_features(df, symbol)
+            return True
+        
+        return self.single_flight.do(('features', symbol, None), calculate)
+    
+    def _batch_calculate_features(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Bring the features of cached symbols up to date on the feature worker pool
+
+        Returns update_features-style summaries for the symbols it handled;
+        the others (one or none pending, or not cached) are left to _calculate_features.
+        """
+        pending = [
+            symbol for symbol in dict.fromkeys(symbols)
+            if self.ingester.freshness(symbol, 'price') in ('fresh', 'stale') and not self._features_current(symbol)
+        ]
+        if len(pending) < 2:
+            return {}
+        return feature_pool.update(pending)
+    
+    def _check_freshness(self, symbol: str) -> str:
+        """
+        Classify cached price data for a symbol (see EnhancedDataIngester.freshness).
+
+        Stale data is served as-is while a refresh is queued in the background;
+        callers must fetch synchronously only for 'missing' or 'expired'.
+        """
+        state = self.ingester.freshness(symbol, 'price')
+        if state == 'stale':
+            self.refresher.schedule(('price', symbol), lambda: self._refresh_symbol(symbol))
+        return state
+    
+    def _refresh_symbol(self, symbol: str):
+        """Background refresh: append new bars, then recalculate features from them"""
+        self.single_flight.do(
+            ('fetch', symbol, None),
+            lambda: self.ingester.fetch_all_data(symbol, period="2y", incremental=True, include_fundamentals=False)
+        )
+        self._calculate_features(symbol)
+    
+    def _features_current(self, symbol: str) -> bool:
+        """Check that cached features exist and are not older than the cached prices"""
+        updated_at = feature_mtime(symbol)
+        if updated_at is None:
+            return False
+        price_age = self.ingester.cache_age(symbol, 'price')
+        if price_age is None:
+            return True
+        return datetime.now() - updated_at <= price_age
+    
+    def _data_age(self, symbols: List[str]) -> Dict[str, Any]:
+        """Age and freshness of the cached data each symbol was served from"""
+        ages = {}
+        for symbol in symbols:
+            ages[symbol] = self.ingester.data_age(symbol)
+            ages[symbol]['refreshing'] = self.refresher.is_pending(('price', symbol))
+        return ages
+    
+    def _universe_momentum(self, symbols: List[str], lookback: int = 20) -> Dict[str, Any]:
+        """Cross-sectional return of the scanned symbols from the universe panel as it is (refreshed in the background)"""
+        self._schedule_panel_refresh(symbols)
+        try:
+            panel = universe_panel.current()
+        except Exception as e:
+            logger.warning(f"Universe panel unavailable: {e}")
+            return {}
+        if panel is None:
+            return {}
+        returns = panel.momentum(lookback, symbols).sort_values(ascending=False)
+        return {
+            "as_of": panel.index['end'],
+            "lookback_days": lookback,
+            "returns": {symbol: round(float(value), 4) for symbol, value in returns.items()}
+        }
+    
+    def _schedule_panel_refresh(self, symbols: List[str]):
+        """Bring the universe panel up to date with newly ingested prices, off the request path"""
+        if symbols:
+            universe_panel.request(symbols)
+            self.refresher.schedule(('panel', None),
+                                    lambda: universe_panel.refresh_requested(self.ingester.load_price_history))
+    
+    def _fetch_intraday_summary(self, symbol: str, timeframe: str) -> Dict[str, Any]:
+        """Fetch intraday bars into the ring buffer and summarize what is buffered"""
+        try:
+            bars = self.single_flight.do(
+                ('intraday', symbol, timeframe),
+                lambda: self.ingester.fetch_intraday(symbol, timeframe)
+            )
+        except Exception as e:
+            logger.warning(f"Intraday fetch failed for {symbol} ({timeframe}): {e}")
+            return {"timeframe": timeframe, "error": str(e)}
+        if bars is None or bars.empty:
+            return {"timeframe": timeframe, "bars": 0}
+        # Updated from the bars appended since the last request only
+        indicators = intraday_store.indicators(symbol, timeframe) or {}
+        return {
+            "timeframe": timeframe,
+            "bars": len(bars),
+            "first_bar": str(bars.index[0]),
+            "last_bar": str(bars.index[-1]),
+            "latest_price": round(float(bars['Close'].iloc[-1]), 2),
+            "indicators": {
+                name: round(float(indicators[name]), 4) if indicators.get(name) == indicators.get(name) else None
+                for name in ['SMA_20', 'EMA_12', 'RSI_14', 'MACD', 'MACD_signal', 'BB_pct', 'ATR']
+                if name in indicators
+            }
+        }
+    
+    def _train_models(self, symbol: str, horizon: str):
+        """Train models for a horizon, sharing one training run between concurrent requests"""
+        return self.single_flight.do(
+            ('train', symbol, horizon),
+            lambda: train_ml_models(symbol, horizon, verbose=True)
+        )
+    
     def predict(
         self,
         symbols: List[str],
@@ -152,13 +312,11 @@ class MCPAdapter:
                     logger.info(f"[{request_id}] Predicting {symbol} ({horizon})")
                     
                     # STEP 1: Ensure data exists
-                    json_path = DATA_CACHE_DIR / f"{symbol}_all_data.json"
-                    
-                    if not json_path.exists():
+                    if self._check_freshness(symbol) in ('missing', 'expired'):
                         print(f"[STEP 1/4] Data not found for {symbol}. Fetching from Yahoo Finance...", flush=True)
                         logger.info(f"[{request_id}] Data not found for {symbol}. Fetching...")
                         try:
-                            self.ingester.fetch_all_data(symbol, period="2y")
+                            self._fetch_price_history(symbol)
                             print(f"[STEP 1/4] [OK] Data fetched successfully!\n", flush=True)
                             logger.info(f"[{request_id}] Data fetched for {symbol}")
                         except Exception as e:
@@ -174,31 +332,26 @@ class MCPAdapter:
                         print(f"[STEP 1/4] [OK] Data already cached\n", flush=True)
                     
                     # STEP 2: Ensure features are calculated
-                    features_path = FEATURE_CACHE_DIR / f"{symbol}_features.json"
-                    if not features_path.exists():
+                    if not self._features_current(symbol):
                         print(f"[STEP 2/4] Features not found. Calculating 50+ technical indicators...", flush=True)
                         logger.info(f"[{request_id}] Features not found for {symbol}. Calculating...")
-                        all_data = self.ingester.load_all_data(symbol)
-                        if all_data:
-                            df = all_data.get('price_history')
-                            if df is not None and not df.empty:
-                                features_df = self.engineer.calculate_all_features(df, symbol)
-                                self.engineer.save_features(features_df, symbol)
-                                print(f"[STEP 2/4] [OK] Features calculated successfully!\n", flush=True)
-                                logger.info(f"[{request_id}] Features calculated for {symbol}")
+                        if self._calculate_features(symbol):
+                            print(f"[STEP 2/4] [OK] Features calculated successfully!\n", flush=True)
+                            logger.info(f"[{request_id}] Features calculated for {symbol}")
                     
                     else:
                         print(f"[STEP 2/4] [OK] Features already calculated\n", flush=True)
                     
                     # STEP 3: Check if models exist for this horizon
                     model_files = list(MODEL_DIR.glob(f"{symbol}_{horizon}_*"))
+                    cache_manager.touch(*model_files)
                     
                     if not model_files:
                         print(f"[STEP 3/4] Models not found. Training 4 ML models (RF+LGB+XGB+DQN)...", flush=True)
                         print(f"            This will take 60-90 seconds...\n", flush=True)
                         logger.info(f"[{request_id}] Models not found for {symbol} ({horizon}). Training...")
                         try:
-                            training_result = train_ml_models(symbol, horizon, verbose=True)
+                            training_result = self._train_models(symbol, horizon)
                             
                             # Handle both dict and bool return formats
                             success = training_result.get('success', False) if isinstance(training_result, dict) else training_result
@@ -274,6 +427,7 @@ class MCPAdapter:
                     "count": len(predictions),
                     "horizon": horizon,
                     "risk_profile": risk_profile,
+                    "data_age": self._data_age(symbols),
                     "timestamp": datetime.now().isoformat(),
                     "request_id": request_id
                 },
@@ -344,6 +498,12 @@ class MCPAdapter:
             all_predictions = []
             shortlist = []
             
+            # Features for the whole (cached) universe at once, across worker processes;
+            # the loop below finds them current
+            batch_features = self._batch_calculate_features(symbols)
+            if batch_features:
+                logger.info(f"[{request_id}] Updated features for {len(batch_features)} symbols in parallel")
+            
             for symbol in symbols:
                 try:
                     print(f"\n{'='*80}", flush=True)
@@ -352,13 +512,11 @@ class MCPAdapter:
                     logger.info(f"[{request_id}] Processing {symbol}...")
                     
                     # STEP 1: Ensure data exists
-                    json_path = DATA_CACHE_DIR / f"{symbol}_all_data.json"
-                    
-                    if not json_path.exists():
+                    if self._check_freshness(symbol) in ('missing', 'expired'):
                         print(f"[STEP 1/4] Fetching data from Yahoo Finance...", flush=True)
                         logger.info(f"[{request_id}] Data not found for {symbol}. Fetching...")
                         try:
-                            self.ingester.fetch_all_data(symbol, period="2y")
+                            self._fetch_price_history(symbol)
                             print(f"[STEP 1/4] [OK] Data fetched!\n", flush=True)
                             logger.info(f"[{request_id}] Data fetched for {symbol}")
                         except Exception as e:
@@ -369,30 +527,25 @@ class MCPAdapter:
                         print(f"[STEP 1/4] [OK] Data cached\n", flush=True)
                     
                     # STEP 2: Ensure features are calculated
-                    features_path = FEATURE_CACHE_DIR / f"{symbol}_features.json"
-                    if not features_path.exists():
+                    if not self._features_current(symbol):
                         print(f"[STEP 2/4] Calculating 50+ technical indicators...", flush=True)
                         logger.info(f"[{request_id}] Features not found for {symbol}. Calculating...")
-                        all_data = self.ingester.load_all_data(symbol)
-                        if all_data:
-                            df = all_data.get('price_history')
-                            if df is not None and not df.empty:
-                                features_df = self.engineer.calculate_all_features(df, symbol)
-                                self.engineer.save_features(features_df, symbol)
-                                print(f"[STEP 2/4] [OK] Features calculated!\n", flush=True)
-                                logger.info(f"[{request_id}] Features calculated for {symbol}")
+                        if self._calculate_features(symbol):
+                            print(f"[STEP 2/4] [OK] Features calculated!\n", flush=True)
+                            logger.info(f"[{request_id}] Features calculated for {symbol}")
                     
                     else:
                         print(f"[STEP 2/4] [OK] Features cached\n", flush=True)
                     
                     # STEP 3: Check if models exist for this horizon
                     model_files = list(MODEL_DIR.glob(f"{symbol}_{horizon}_*"))
+                    cache_manager.touch(*model_files)
                     
                     if not model_files:
                         print(f"[STEP 3/4] Training 4 ML models (60-90 seconds)...", flush=True)
                         logger.info(f"[{request_id}] Models not found for {symbol} ({horizon}). Training...")
                         try:
-                            training_result = train_ml_models(symbol, horizon, verbose=True)
+                            training_result = self._train_models(symbol, horizon)
                             
                             # Handle both dict and bool return formats
                             success = training_result.get('success', False) if isinstance(training_result, dict) else training_result
@@ -440,6 +593,8 @@ class MCPAdapter:
                     "shortlist_count": len(shortlist),
                     "horizon": horizon,
                     "min_confidence": min_confidence,
+                    "universe": self._universe_momentum(symbols),
+                    "data_age": self._data_age(symbols),
                     "timestamp": datetime.now().isoformat(),
                     "request_id": request_id
                 },
@@ -507,13 +662,11 @@ class MCPAdapter:
             predictions = []
             
             # First ensure data and features exist (only once, not per horizon)
-            json_path = DATA_CACHE_DIR / f"{symbol}_all_data.json"
-            
-            if not json_path.exists():
+            if self._check_freshness(symbol) in ('missing', 'expired'):
                 print(f"\n[ANALYZE] Fetching data for {symbol}...", flush=True)
                 logger.info(f"[{request_id}] Data not found for {symbol}. Fetching...")
                 try:
-                    self.ingester.fetch_all_data(symbol, period="2y")
+                    self._fetch_price_history(symbol)
                     print(f"[ANALYZE] [OK] Data fetched!\n", flush=True)
                 except Exception as e:
                     print(f"[ANALYZE] [FAIL] Data fetch failed: {e}\n", flush=True)
@@ -531,17 +684,11 @@ class MCPAdapter:
                 print(f"[ANALYZE] [OK] Data cached for {symbol}\n", flush=True)
             
             # Ensure features are calculated
-            features_path = FEATURE_CACHE_DIR / f"{symbol}_features.json"
-            if not features_path.exists():
+            if not self._features_current(symbol):
                 print(f"[ANALYZE] Calculating features for {symbol}...", flush=True)
                 logger.info(f"[{request_id}] Features not found. Calculating...")
-                all_data = self.ingester.load_all_data(symbol)
-                if all_data:
-                    df = all_data.get('price_history')
-                    if df is not None and not df.empty:
-                        features_df = self.engineer.calculate_all_features(df, symbol)
-                        self.engineer.save_features(features_df, symbol)
-                        print(f"[ANALYZE] [OK] Features calculated!\n", flush=True)
+                if self._calculate_features(symbol):
+                    print(f"[ANALYZE] [OK] Features calculated!\n", flush=True)
             else:
                 print(f"[ANALYZE] [OK] Features cached for {symbol}\n", flush=True)
             
@@ -554,12 +701,13 @@ class MCPAdapter:
                     
                     # Check if models exist for this horizon
                     model_files = list(MODEL_DIR.glob(f"{symbol}_{horizon}_*"))
+                    cache_manager.touch(*model_files)
                     
                     if not model_files:
                         print(f"[ANALYZE] Training models for {horizon} horizon (60-90 seconds)...", flush=True)
                         logger.info(f"[{request_id}] Models not found for {symbol} ({horizon}). Training...")
                         try:
-                            training_result = train_ml_models(symbol, horizon, verbose=True)
+                            training_result = self._train_models(symbol, horizon)
                             
                             # Handle both dict and bool return formats
                             success = training_result.get('success', False) if isinstance(training_result, dict) else training_result
@@ -641,6 +789,7 @@ class MCPAdapter:
                         "capital_risk_pct": capital_risk_pct,
                         "drawdown_limit_pct": drawdown_limit_pct
                     },
+                    "data_age": self._data_age([symbol]),
                     "timestamp": datetime.now().isoformat(),
                     "request_id": request_id
                 },
@@ -721,12 +870,10 @@ class MCPAdapter:
             
             # STEP 1: Ensure data exists
             logger.info(f"[{request_id}] Ensuring data exists for {symbol}...")
-            json_path = DATA_CACHE_DIR / f"{symbol}_all_data.json"
-            
-            if not json_path.exists():
+            if self._check_freshness(symbol) in ('missing', 'expired'):
                 logger.info(f"[{request_id}] Data not found. Fetching from Yahoo Finance...")
                 try:
-                    self.ingester.fetch_all_data(symbol, period="2y")
+                    self._fetch_price_history(symbol)
                     logger.info(f"[{request_id}] Data fetched successfully")
                 except Exception as e:
                     logger.error(f"[{request_id}] Data fetch failed: {e}")
@@ -742,21 +889,15 @@ class MCPAdapter:
             
             # STEP 2: Ensure features are calculated
             logger.info(f"[{request_id}] Ensuring features are calculated...")
-            features_path = FEATURE_CACHE_DIR / f"{symbol}_features.json"
-            if not features_path.exists():
+            if not self._features_current(symbol):
                 logger.info(f"[{request_id}] Features not found. Calculating...")
-                all_data = self.ingester.load_all_data(symbol)
-                if all_data:
-                    df = all_data.get('price_history')
-                    if df is not None and not df.empty:
-                        features_df = self.engineer.calculate_all_features(df, symbol)
-                        self.engineer.save_features(features_df, symbol)
-                        logger.info(f"[{request_id}] Features calculated successfully")
+                if self._calculate_features(symbol):
+                    logger.info(f"[{request_id}] Features calculated successfully")
             
             # STEP 3: Train all models (includes DQN)
             logger.info(f"[{request_id}] Starting training for horizon: {horizon}")
             
-            training_result = train_ml_models(symbol, horizon, verbose=True)
+            training_result = self._train_models(symbol, horizon)
             
             # Handle both old (bool) and new (dict) return formats
             if isinstance(training_result, dict):
@@ -863,7 +1004,9 @@ class MCPAdapter:
         period: str = "2y",
         force_refresh: bool = False,
         refresh: bool = False,
-        include_features: bool = False
+        include_features: bool = False,
+        incremental: bool = True,
+        intraday_timeframe: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         MCP Tool: fetch_data
@@ -876,6 +1019,8 @@ class MCPAdapter:
             force_refresh: Force refresh even if cached (legacy parameter)
             refresh: Force refresh even if cached (maps to force_refresh)
             include_features: Also calculate and include technical features
+            incremental: On refresh, download only bars newer than the cache
+            intraday_timeframe: Also fetch intraday bars at this resolution (1m, 5m, 15m, 30m, 1h)
             period: Data period - "1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "max"
             force_refresh: Force refresh even if cached data exists
         
@@ -892,7 +1037,9 @@ class MCPAdapter:
             "symbols": symbols,
             "period": period,
             "refresh": refresh,
-            "include_features": include_features
+            "include_features": include_features,
+            "incremental": incremental,
+            "intraday_timeframe": intraday_timeframe
         }
         request_id = self._log_request("fetch_data", request_data)
         
@@ -908,99 +1055,118 @@ class MCPAdapter:
             
             results = []
             
+            # Fetch/load every symbol concurrently; per-symbol reporting below is unchanged
+            outcomes = self.batch_fetcher.fetch(
+                symbols, period=period, force_refresh=force_refresh, incremental=incremental
+            )
+            self._schedule_panel_refresh([symbol for symbol, outcome in outcomes.items() if outcome['status'] == 'success'])
+            
+            # Features of all fetched/cached symbols across worker processes, reported per symbol below
+            feature_updates = {}
+            if include_features:
+                feature_updates = self._batch_calculate_features(
+                    [symbol for symbol in symbols if (outcomes.get(symbol) or {}).get('status') in ('success', 'cached')]
+                )
+            
             for symbol in symbols:
                 try:
                     print(f"[{symbol}] Processing...", flush=True)
                     logger.info(f"[{request_id}] Processing {symbol}...")
+                    outcome = outcomes.get(symbol) or {'status': 'error', 'data': None, 'message': "Symbol was not fetched"}
+                    all_data = outcome['data']
                     
-                    # Check if data already exists
-                    json_path = DATA_CACHE_DIR / f"{symbol}_all_data.json"
-                    
-                    if json_path.exists() and not force_refresh:
-                        # Load existing data to get metadata
+                    if outcome['status'] == 'cached':
+                        # Existing data was loaded to get metadata
                         print(f"[{symbol}] Data cached, loading...", flush=True)
-                        all_data = self.ingester.load_all_data(symbol)
-                        if all_data:
-                            df = all_data.get('price_history')
-                            if df is not None and not df.empty:
-                                result_entry = {
-                                    "symbol": symbol,
-                                    "status": "cached",
-                                    "message": "Data already cached",
-                                    "rows": len(df),
-                                    "date_range": {
-                                        "start": str(df.index[0]),
-                                        "end": str(df.index[-1])
-                                    },
-                                    "latest_price": round(float(df['Close'].iloc[-1]), 2)
+                        # Stale (but servable) data is refreshed in the background
+                        self._check_freshness(symbol)
+                        df = all_data.get('price_history')
+                        result_entry = {
+                            "symbol": symbol,
+                            "status": "cached",
+                            "message": "Data already cached",
+                            "rows": len(df),
+                            "date_range": {
+                                "start": str(df.index[0]),
+                                "end": str(df.index[-1])
+                            },
+                            "latest_price": round(float(df['Close'].iloc[-1]), 2)
+                        }
+                        
+                        # If include_features is true, calculate and include features
+                        if include_features:
+                            print(f"[{symbol}] Calculating features...", flush=True)
+                            features_path = feature_path(symbol)
+                            
+                            update = feature_updates.get(symbol)
+                            features_header = {}
+                            if not update or update['mode'] == 'error':
+                                update = None
+                                features_header = self.engineer.load_feature_header(symbol) if self._features_current(symbol) else {}
+                            if features_header:
+                                # Existing features, described by their record header alone
+                                result_entry["features"] = {
+                                    "status": "loaded",
+                                    "total_features": features_header.get('total_features', 0),
+                                    "feature_file": str(features_path)
                                 }
-                                
-                                # If include_features is true, calculate and include features
-                                if include_features:
-                                    print(f"[{symbol}] Calculating features...", flush=True)
-                                    features_path = FEATURE_CACHE_DIR / f"{symbol}_features.json"
-                                    
-                                    if features_path.exists():
-                                        # Load existing features
-                                        with open(features_path, 'r') as f:
-                                            features_data = json.load(f)
-                                        result_entry["features"] = {
-                                            "status": "loaded",
-                                            "total_features": features_data.get('total_features', 0),
-                                            "feature_file": str(features_path)
-                                        }
-                                        print(f"[{symbol}] Features loaded from cache", flush=True)
-                                    else:
-                                        # Calculate fresh features
-                                        features_df = self.engineer.calculate_all_features(df, symbol)
-                                        self.engineer.save_features(features_df, symbol)
-                                        result_entry["features"] = {
-                                            "status": "calculated",
-                                            "total_features": len(features_df.columns),
-                                            "feature_file": str(features_path)
-                                        }
-                                        print(f"[{symbol}] Features calculated and saved", flush=True)
-                                
-                                results.append(result_entry)
-                                print(f"[{symbol}] [OK] Complete\n", flush=True)
-                                logger.info(f"[{request_id}] {symbol}: Using cached data ({len(df)} rows)")
-                                continue
-                    
-                    # Fetch fresh data
-                    print(f"[{symbol}] Fetching from Yahoo Finance...", flush=True)
-                    logger.info(f"[{request_id}] {symbol}: Fetching from Yahoo Finance...")
-                    all_data = self.ingester.fetch_all_data(symbol, period=period)
+                                print(f"[{symbol}] Features loaded from cache", flush=True)
+                            else:
+                                # Extend the cached features by the new bars (or calculate them all)
+                                update = update or self.engineer.update_features(df, symbol)
+                                result_entry["features"] = {
+                                    "status": "calculated" if update['mode'] == 'full' else "updated",
+                                    "total_features": update['total_features'],
+                                    "rows_added": update['rows_added'],
+                                    "feature_file": str(features_path)
+                                }
+                                print(f"[{symbol}] Features {update['mode']} (+{update['rows_added']} rows)", flush=True)
+                        
+                        if intraday_timeframe:
+                            result_entry["intraday"] = self._fetch_intraday_summary(symbol, intraday_timeframe)
+                        
+                        results.append(result_entry)
+                        print(f"[{symbol}] [OK] Complete\n", flush=True)
+                        logger.info(f"[{request_id}] {symbol}: Using cached data ({len(df)} rows)")
+                        continue
                     
-                    if all_data:
+                    if outcome['status'] == 'success':
                         df = all_data.get('price_history')
                         if df is not None and not df.empty:
                             print(f"[{symbol}] [OK] Data fetched: {len(df)} rows", flush=True)
                             
+                            fetch_meta = all_data.get('price_history_metadata') or {}
                             result_entry = {
                                 "symbol": symbol,
                                 "status": "success",
                                 "message": "Data fetched successfully",
+                                "fetch_mode": fetch_meta.get('fetch_mode', 'full'),
                                 "rows": len(df),
                                 "date_range": {
                                     "start": str(df.index[0]),
                                     "end": str(df.index[-1])
                                 },
                                 "latest_price": round(float(df['Close'].iloc[-1]), 2),
-                                "cache_path": str(json_path)
+                                "cache_path": str(price_cache_path(symbol))
                             }
                             
                             # If include_features is true, calculate and include features
                             if include_features:
                                 print(f"[{symbol}] Calculating 50+ technical indicators...", flush=True)
-                                features_df = self.engineer.calculate_all_features(df, symbol)
-                                self.engineer.save_features(features_df, symbol)
-                                features_path = FEATURE_CACHE_DIR / f"{symbol}_features.json"
+                                update = feature_updates.get(symbol)
+                                if not update or update['mode'] == 'error':
+                                    update = self.engineer.update_features(df, symbol)
+                                features_path = feature_path(symbol)
                                 result_entry["features"] = {
-                                    "status": "calculated",
-                                    "total_features": len(features_df.columns),
+                                    "status": "calculated" if update['mode'] == 'full' else "updated",
+                                    "total_features": update['total_features'],
+                                    "rows_added": update['rows_added'],
                                     "feature_file": str(features_path)
                                 }
-                                print(f"[{symbol}] [OK] Features calculated: {len(features_df.columns)} indicators", flush=True)
+                                print(f"[{symbol}] [OK] Features {update['mode']}: {update['total_features']} indicators", flush=True)
+                            
+                            if intraday_timeframe:
+                                result_entry["intraday"] = self._fetch_intraday_summary(symbol, intraday_timeframe)
                             
                             results.append(result_entry)
                             print(f"[{symbol}] [OK] Complete\n", flush=True)
@@ -1015,7 +1181,7 @@ class MCPAdapter:
                         results.append({
                             "symbol": symbol,
                             "status": "error",
-                            "message": "Failed to fetch data from Yahoo Finance"
+                            "message": outcome['message']
                         })
                         
                 except Exception as e:
@@ -1040,6 +1206,8 @@ class MCPAdapter:
                     "period": period,
                     "include_features": include_features,
                     "force_refresh": force_refresh,
+                    "incremental": incremental,
+                    "data_age": self._data_age(symbols),
                     "timestamp": datetime.now().isoformat(),
                     "request_id": request_id
                 },
@@ -1089,10 +1257,11 @@ class MCPAdapter:
             
             process = psutil.Process(os.getpid())
             
-            # Count cached symbols
-            cached_symbols = len(list(DATA_CACHE_DIR.glob("*_data.parquet"))) if DATA_CACHE_DIR.exists() else 0
-            feature_files = len(list(FEATURE_CACHE_DIR.glob("*_features.json"))) if FEATURE_CACHE_DIR.exists() else 0
-            model_files = len(list(MODEL_DIR.glob("*.pkl"))) + len(list(MODEL_DIR.glob("*.pt"))) if MODEL_DIR.exists() else 0
+            # Store sizes come from the cache manager's last pass instead of globbing every call
+            disk_cache = cache_manager.report()
+            cached_symbols = disk_cache['stores']['cache']['entries']
+            feature_files = disk_cache['stores']['features']['files']
+            model_files = disk_cache['stores']['models']['files']
             
             response = {
                 "status": "healthy",
@@ -1118,6 +1287,16 @@ class MCPAdapter:
                     "model_dir": str(MODEL_DIR),
                     "logs_dir": str(LOGS_DIR)
                 },
+                "memory_cache": frame_cache.stats(),
+                "single_flight": self.single_flight.stats(),
+                "background_refresh": self.refresher.stats(),
+                "intraday_buffers": intraday_store.stats(),
+                "resample_cache": resample_cache.stats(),
+                "feature_pool": feature_pool.stats(),
+                "universe_panel": universe_panel.stats(),
+                "indicator_backend": backend_stats(),
+                "disk_cache": disk_cache,
+                "providers": self.ingester.provider.stats(),
                 "directories": {
                     "cache_exists": DATA_CACHE_DIR.exists(),
                     "features_exists": FEATURE_CACHE_DIR.exists(),
@@ -0,0 +1,180 @@
+"""
+This module back-adjusts price history for corporate actions (splits and dividends).
+
+Factors follow the usual convention: a split of ratio r on day t divides every
+earlier price by r and multiplies earlier volume by r, and a dividend d going
+ex on day t multiplies every earlier price by (1 - d / close[t-1]). The
+cumulative factor of each bar is a reverse cumulative product over the event
+factors, so a whole history is adjusted in one pass over the arrays.
+
+The cache stores adjusted history together with an `actions_version` (a
+checksum of the corporate actions it reflects). When an incremental fetch
+brings a new action, only that action's factors are applied to the cached
+bars, instead of re-downloading the full history.
+"""
+import logging
+import zlib
+from typing import Dict, Any, Optional, Tuple
+import pandas as pd
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PRICE_FIELDS = ['Open', 'High', 'Low', 'Close']
+DIVIDENDS = 'Dividends'
+SPLITS = 'Stock Splits'
+# Tolerance when checking re-adjusted bars against a provider's own adjustment
+# (providers round their adjusted prices)
+ADJUSTMENT_RTOL = 1e-4
+
+
+def action_mask(df: pd.DataFrame) -> np.ndarray:
+    """
+    Boolean mask of the bars carrying a dividend or a split
+    """
+    mask = np.zeros(len(df), dtype=bool)
+    if DIVIDENDS in df.columns:
+        mask |= df[DIVIDENDS].fillna(0).to_numpy(dtype=np.float64) > 0
+    if SPLITS in df.columns:
+        splits = df[SPLITS].fillna(0).to_numpy(dtype=np.float64)
+        mask |= (splits > 0) & (splits != 1)
+    return mask
+
+
+def actions_version(df: pd.DataFrame) -> str:
+    """
+    Checksum of a history's corporate actions (dates, dividends and split ratios)
+    """
+    mask = action_mask(df)
+    crc = zlib.crc32(pd.DatetimeIndex(df.index[mask]).as_unit('ns').asi8.tobytes())
+    for col in [DIVIDENDS, SPLITS]:
+        if col in df.columns:
+            crc = zlib.crc32(df[col].to_numpy(dtype=np.float64)[mask].tobytes(), crc)
+    return f"{crc & 0xffffffff:08x}"
+
+
+def adjustment_factors(df: pd.DataFrame, events: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cumulative (price, volume) back-adjustment factors for every bar.
+
+    Only the actions on bars selected by the boolean `events` mask are applied
+    (all actions by default). Dividends are per share as of their ex-date.
+    """
+    n = len(df)
+    if events is None:
+        events = action_mask(df)
+    close = df['Close'].to_numpy(dtype=np.float64)
+    dividends = df[DIVIDENDS].fillna(0).to_numpy(dtype=np.float64) if DIVIDENDS in df.columns else np.zeros(n)
+    splits = df[SPLITS].fillna(0).to_numpy(dtype=np.float64) if SPLITS in df.columns else np.zeros(n)
+
+    ratio = np.where(events & (splits > 0), splits, 1.0)
+    prev_close = np.concatenate([[np.nan], close[:-1]])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # On a split day the dividend is per post-split share
+        div_factor = 1.0 - dividends * ratio / prev_close
+    div_factor = np.where(events & (dividends > 0) & (div_factor > 0) & np.isfinite(div_factor), div_factor, 1.0)
+
+    # Each event's factor applies to the bars strictly before it
+    price_event = div_factor / ratio
+    price_factor = np.append(np.cumprod(price_event[::-1])[::-1][1:], 1.0)
+    volume_factor = np.append(np.cumprod(ratio[::-1])[::-1][1:], 1.0)
+    return price_factor, volume_factor
+
+
+def apply_factors(df: pd.DataFrame, price_factor: np.ndarray, volume_factor: np.ndarray) -> pd.DataFrame:
+    """
+    Scale OHLC by `price_factor` and volume by `volume_factor` (a new frame)
+    """
+    df = df.copy()
+    for col in PRICE_FIELDS:
+        if col in df.columns:
+            df[col] = df[col].to_numpy(dtype=np.float64) * price_factor
+    if 'Volume' in df.columns:
+        df['Volume'] = np.rint(df['Volume'].to_numpy(dtype=np.float64) * volume_factor).astype(np.int64)
+    return df
+
+
+def back_adjust(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Back-adjust a raw (unadjusted) history for all of its splits and dividends
+    """
+    if df is None or df.empty:
+        return df
+    events = action_mask(df)
+    if not events.any():
+        return df.copy()
+    return apply_factors(df, *adjustment_factors(df, events))
+
+
+def unadjusted_close(df: pd.DataFrame, events: np.ndarray, adjusted: np.ndarray) -> np.ndarray:
+    """
+    Close as traded, for a history whose `adjusted` rows are back-adjusted for the
+    actions on `events` bars after them (other rows are taken as traded).
+
+    Walks back from the last bar, undoing each event's factor from the bars
+    before it; a dividend's factor is recovered from its adjusted previous close.
+    """
+    close = df['Close'].to_numpy(dtype=np.float64).copy()
+    n = len(close)
+    dividends = df[DIVIDENDS].fillna(0).to_numpy(dtype=np.float64) if DIVIDENDS in df.columns else np.zeros(n)
+    splits = df[SPLITS].fillna(0).to_numpy(dtype=np.float64) if SPLITS in df.columns else np.zeros(n)
+    positions = np.flatnonzero(adjusted)
+    if not len(positions):
+        return close
+    factor = 1.0
+    for i in range(n - 1, positions[0] - 1, -1):
+        if adjusted[i]:
+            close[i] /= factor
+        if not events[i] or i == 0 or not adjusted[i - 1]:
+            continue
+        ratio = splits[i] if splits[i] > 0 else 1.0
+        # Adjusted for this event only, the previous close is (raw - dividend * ratio) / ratio
+        raw_previous = (close[i - 1] / factor + dividends[i]) * ratio
+        div_factor = 1.0 - dividends[i] * ratio / raw_previous
+        if dividends[i] <= 0 or not (div_factor > 0 and np.isfinite(div_factor)):
+            div_factor = 1.0
+        factor *= div_factor / ratio
+    return close
+
+
+def readjust_for_new_actions(cached: pd.DataFrame, delta: pd.DataFrame,
+                             delta_adjusted: bool = True) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, Any]]:
+    """
+    Apply corporate actions that appear in `delta` but not in `cached` to the cached bars.
+
+    `cached` is adjusted history; `delta` is a freshly fetched slice that the
+    provider either already adjusted (`delta_adjusted`) or delivered raw, in
+    which case its bars before each new action are adjusted too. Returns
+    (cached, delta, info) with info['actions'] the number of new actions.
+    """
+    # Dividend factors need the close before each new action, which the
+    # cached bars still hold unadjusted for it
+    closes = [cached['Close'], delta['Close']] if delta_adjusted else [delta['Close'], cached['Close']]
+    timeline = pd.DataFrame({'Close': closes[0].combine_first(closes[1])})
+    for col in [DIVIDENDS, SPLITS]:
+        if col in delta.columns or col in cached.columns:
+            actions = [frame[col] for frame in (delta, cached) if col in frame.columns]
+            timeline[col] = actions[0].combine_first(actions[-1]).reindex(timeline.index).fillna(0)
+
+    known = set(cached.index[action_mask(cached)])
+    events = action_mask(timeline) & ~timeline.index.isin(list(known))
+    if not events.any():
+        return cached, delta, {'actions': 0}
+    if delta_adjusted:
+        # Closes only the delta has are adjusted for the new actions after them,
+        # and the dividend factors need them as traded
+        timeline['Close'] = unadjusted_close(timeline, events, ~timeline.index.isin(cached.index))
+
+    price_factor, volume_factor = adjustment_factors(timeline, events)
+    factors = pd.DataFrame({'price': price_factor, 'volume': volume_factor}, index=timeline.index)
+
+    cached_factors = factors.reindex(cached.index).fillna(1.0)
+    cached = apply_factors(cached, cached_factors['price'].to_numpy(), cached_factors['volume'].to_numpy())
+    if not delta_adjusted:
+        delta_factors = factors.reindex(delta.index).fillna(1.0)
+        delta = apply_factors(delta, delta_factors['price'].to_numpy(), delta_factors['volume'].to_numpy())
+
+    event_dates = timeline.index[events]
+    logger.info(f"Re-adjusted {len(cached)} cached bars for {len(event_dates)} new corporate action(s) "
+                f"from {event_dates[0].date()}")
+    return cached, delta, {'actions': int(len(event_dates)), 'first_action': str(event_dates[0].date())}
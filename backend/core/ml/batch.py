@@ -0,0 +1,152 @@
+"""
+This module handles concurrent multi-symbol ingestion for the stock analysis pipeline.
+
+Symbols are grouped by the request they need (full period or incremental from a
+start date), downloaded through the provider's bulk endpoint where one exists,
+and ingested on a bounded thread pool. The provider's own concurrency slots cap
+the number of simultaneous upstream requests.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+import pandas as pd
+
+from .data import EnhancedDataIngester
+
+logger = logging.getLogger(__name__)
+
+
+class BatchFetcher:
+    """
+    Fetch many symbols concurrently through an EnhancedDataIngester.
+
+    Results are keyed by symbol; each entry has a `status` of 'cached',
+    'success' or 'error', the loaded `data` bundle (or None) and a `message`.
+    """
+    def __init__(self, ingester: EnhancedDataIngester, max_workers: Optional[int] = None):
+        self.ingester = ingester
+        self.max_workers = max_workers or ingester.provider.max_concurrency
+
+    def fetch(self, symbols: List[str], period: str = "2y", force_refresh: bool = False,
+              incremental: bool = True, include_fundamentals: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch or load every symbol, returning per-symbol outcomes.
+
+        With `include_fundamentals=False` only price history is refreshed.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        results = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            # Serve symbols from cache when no refresh is requested, unless the
+            # cache is past its grace period (stale data is refreshed by the caller)
+            if not force_refresh:
+                cached = [s for s in symbols if self.ingester.freshness(s) in ('fresh', 'stale')]
+                for symbol, data in zip(cached, pool.map(self._load_cached, cached)):
+                    if data is not None:
+                        results[symbol] = {'status': 'cached', 'data': data, 'message': "Data already cached"}
+
+            pending = [s for s in symbols if s not in results]
+            if not pending:
+                return results
+
+            # Decide which symbols can be refreshed incrementally, and from where
+            plans = {}
+            if incremental:
+                for symbol, plan in zip(pending, pool.map(self._incremental_plan, pending)):
+                    if plan is not None:
+                        plans[symbol] = plan
+
+            groups = self._group_requests(pending, plans, period)
+            downloads = self._download(pool, groups)
+
+            futures = {}
+            for symbol in pending:
+                if symbol in plans:
+                    futures[symbol] = pool.submit(self._ingest_delta, symbol, plans[symbol][0],
+                                                  downloads.get(symbol), period, include_fundamentals)
+                else:
+                    futures[symbol] = pool.submit(self._ingest_full, symbol, downloads.get(symbol), period,
+                                                  include_fundamentals)
+
+            for symbol, future in futures.items():
+                try:
+                    data = future.result()
+                except Exception as e:
+                    logger.error(f"Batch fetch failed for {symbol}: {e}")
+                    results[symbol] = {'status': 'error', 'data': None, 'message': str(e)}
+                    continue
+
+                if data is None:
+                    results[symbol] = {'status': 'error', 'data': None,
+                                       'message': f"Failed to fetch data from {self.ingester.provider.label}"}
+                else:
+                    results[symbol] = {'status': 'success', 'data': data, 'message': "Data fetched successfully"}
+
+        return {symbol: results[symbol] for symbol in symbols}
+
+    def _load_cached(self, symbol: str) -> Optional[Dict[str, Any]]:
+        try:
+            data = self.ingester.load_all_data(symbol)
+        except Exception as e:
+            logger.warning(f"Could not load cached data for {symbol}: {e}")
+            return None
+        df = data.get('price_history') if data else None
+        return data if df is not None and not df.empty else None
+
+    def _incremental_plan(self, symbol: str) -> Optional[Tuple[pd.DataFrame, str]]:
+        try:
+            return self.ingester.incremental_start(symbol)
+        except Exception as e:
+            logger.warning(f"Could not plan incremental fetch for {symbol}: {e}")
+            return None
+
+    def _group_requests(self, symbols: List[str], plans: Dict[str, Tuple[pd.DataFrame, str]],
+                        period: str) -> Dict[Tuple[Optional[str], Optional[str]], List[str]]:
+        """
+        Group symbols by (period, start) so each group is one bulk request
+        """
+        groups = {}
+        for symbol in symbols:
+            key = (None, plans[symbol][1]) if symbol in plans else (period, None)
+            groups.setdefault(key, []).append(symbol)
+        return groups
+
+    def _download(self, pool: ThreadPoolExecutor,
+                  groups: Dict[Tuple[Optional[str], Optional[str]], List[str]]) -> Dict[str, pd.DataFrame]:
+        """
+        Download every group, one task per bulk chunk (or per symbol without bulk support)
+        """
+        provider = self.ingester.provider
+        chunk_size = provider.bulk_chunk_size if provider.supports_bulk else 1
+
+        futures = []
+        for (period, start), group in groups.items():
+            for i in range(0, len(group), chunk_size):
+                chunk = group[i:i + chunk_size]
+                futures.append((chunk, pool.submit(provider.history_many, chunk, period=period, start=start)))
+
+        frames = {}
+        for chunk, future in futures:
+            try:
+                frames.update(future.result())
+            except Exception as e:
+                # Symbols missing from `frames` are retried one by one during ingestion
+                logger.warning(f"{provider.name} download failed for {', '.join(chunk)}: {e}")
+        return frames
+
+    def _ingest_full(self, symbol: str, hist: Optional[pd.DataFrame], period: str,
+                     include_fundamentals: bool) -> Optional[Dict[str, Any]]:
+        if hist is not None:
+            data = self.ingester.ingest_history(symbol, hist, include_fundamentals)
+            if data is not None:
+                return data
+        return self.ingester.fetch_all_data(symbol, period=period, include_fundamentals=include_fundamentals)
+
+    def _ingest_delta(self, symbol: str, cached: pd.DataFrame, delta: Optional[pd.DataFrame],
+                      period: str, include_fundamentals: bool) -> Optional[Dict[str, Any]]:
+        if delta is not None:
+            data = self.ingester.apply_delta(symbol, cached, delta, include_fundamentals)
+            if data is not None:
+                return data
+        return self.ingester.fetch_all_data(symbol, period=period, include_fundamentals=include_fundamentals)
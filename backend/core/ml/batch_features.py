@@ -0,0 +1,264 @@
+"""
+This module calculates the FeatureEngineer indicators for many symbols at once.
+
+Histories are stacked into (bars x symbols) arrays, right-aligned so that
+every symbol's last bar is on the last row and shorter histories are padded
+with NaN at the top. Each indicator is then one pandas rolling/ewm/shift call
+over the whole block instead of one per symbol (rolling windows run as one
+1-D pass over the columns laid end to end), which removes the per-call
+overhead that dominates `calculate_all_features` on typical history lengths.
+Padding rows are masked where an operation would otherwise treat them as
+data (RSI gains/losses), so every symbol's features match its single-symbol
+calculation to floating-point rounding, and they are written back per symbol
+together with the incremental state `update_features` resumes from.
+"""
+import logging
+import os
+from typing import Dict, Any, Optional, List, Tuple
+import pandas as pd
+import numpy as np
+
+from .features import FeatureEngineer, price_checksum
+from .indicators import plan_for, ewm_indicators
+from .primitives import SMA_PERIODS
+from .compact import compact_frame
+
+logger = logging.getLogger(__name__)
+
+# Symbols per stacked block (bounds memory: bars x symbols x ~45 float64 arrays)
+BATCH_FEATURE_CHUNK = int(os.getenv('BATCH_FEATURE_CHUNK', '128'))
+
+PRICE_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+# Integer-valued features (restored to int64 like the single-symbol path)
+INTEGER_FEATURES = ['higher_high', 'lower_low']
+
+
+def _rolling(block: pd.DataFrame, window: int, how: str) -> pd.DataFrame:
+    """
+    `block.rolling(window).<how>()` as a single 1-D pass
+
+    DataFrame rolling runs one kernel call per column; here the columns are laid
+    end to end with `window` NaN rows between them, so no window spans two symbols.
+    """
+    values = block.to_numpy()
+    rows, cols = values.shape
+    gapped = np.full((cols, window + rows), np.nan)
+    gapped[:, window:] = values.T
+    result = getattr(pd.Series(gapped.ravel()).rolling(window=window), how)()
+    return pd.DataFrame(result.to_numpy().reshape(cols, -1)[:, window:].T)
+
+
+class BatchFeatureEngineer:
+    """
+    Universe-wide feature calculation over stacked (bars x symbols) arrays
+    """
+    def __init__(self, engineer: Optional[FeatureEngineer] = None, chunk_size: int = BATCH_FEATURE_CHUNK):
+        self.engineer = engineer or FeatureEngineer()
+        self.chunk_size = max(1, chunk_size)
+
+    def calculate(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """
+        Features of every symbol, as calculate_all_features would return them
+        """
+        return {symbol: features for symbol, (features, _) in self._calculate_with_state(frames).items()}
+
+    def calculate_and_save(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, Dict[str, Any]]:
+        """
+        Calculate and save the features (with their incremental state) of every symbol
+        """
+        results = {}
+        for symbol, (features_df, state) in self._calculate_with_state(frames).items():
+            try:
+                self.engineer.save_features(features_df, symbol, state)
+                results[symbol] = {'status': 'calculated', 'rows': len(features_df),
+                                   'total_features': len(features_df.columns)}
+            except Exception as e:
+                logger.error(f"Failed to save batch features for {symbol}: {e}")
+                results[symbol] = {'status': 'error', 'message': str(e)}
+        return results
+
+    def _calculate_with_state(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, Tuple[pd.DataFrame, Dict[str, Any]]]:
+        valid = {}
+        for symbol, df in frames.items():
+            if df is None or df.empty:
+                logger.error(f"Empty dataframe for {symbol}, cannot calculate features")
+            elif any(col not in df.columns for col in PRICE_FIELDS):
+                logger.error(f"Required columns missing from data for {symbol}")
+            else:
+                valid[symbol] = df
+
+        results = {}
+        symbols = list(valid)
+        for offset in range(0, len(symbols), self.chunk_size):
+            chunk = {symbol: valid[symbol] for symbol in symbols[offset:offset + self.chunk_size]}
+            results.update(self._calculate_chunk(chunk))
+        logger.info(f"Calculated batch features for {len(results)} symbols")
+        return results
+
+    def _calculate_chunk(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, Tuple[pd.DataFrame, Dict[str, Any]]]:
+        symbols = list(frames)
+        lengths = np.array([len(frames[symbol]) for symbol in symbols])
+        rows = int(lengths.max())
+        padding = rows - lengths
+
+        # Each frame is converted once; price fields and passthrough columns are sliced from it
+        raw = [frames[symbol].to_numpy(dtype=np.float64) for symbol in symbols]
+        # Column positions per column layout (a universe usually shares one, and
+        # Index lookups cost more than the per-symbol work here)
+        price_positions = {}
+        block = np.full((len(PRICE_FIELDS), rows, len(symbols)), np.nan)
+        for col, symbol in enumerate(symbols):
+            columns = frames[symbol].columns
+            key = tuple(columns)
+            if key not in price_positions:
+                price_positions[key] = columns.get_indexer(PRICE_FIELDS)
+            block[:, padding[col]:, col] = raw[col][:, price_positions[key]].T
+        fields = {field: pd.DataFrame(block[i]) for i, field in enumerate(PRICE_FIELDS)}
+        pad_mask = np.arange(rows)[:, None] < padding[None, :]
+
+        features = self._indicators(fields, pad_mask)
+        names = list(features)
+        # (bars, symbols, features): one (bars, features) matrix per symbol
+        stacked = np.stack([features[name] for name in names], axis=-1)
+        states = self._states(features, fields, pad_mask)
+
+        layouts = {}
+        results = {}
+        for col, symbol in enumerate(symbols):
+            df = frames[symbol]
+            key = tuple(df.columns)
+            if key not in layouts:
+                passthrough = [name for name in df.columns if name not in features]
+                layouts[key] = (passthrough, df.columns.get_indexer(passthrough))
+            passthrough, positions = layouts[key]
+            dtypes = dict(zip(key, df.dtypes))
+            values = np.hstack([raw[col][:, positions], stacked[padding[col]:, col, :]])
+            # dropna() on the combined matrix, before building the frame
+            keep = ~np.isnan(values).any(axis=1)
+            values = values[keep]
+            columns = passthrough + names
+            features_df = pd.DataFrame(values, index=df.index[keep], columns=columns)
+            # Restore the integer columns in place (astype(dict) rebuilds the whole frame)
+            integer = [name for name in passthrough if dtypes[name] != np.float64]
+            if np.issubdtype(dtypes['Volume'], np.integer):
+                integer.append('OBV')
+            for name in integer + INTEGER_FEATURES:
+                position = columns.index(name)
+                features_df.isetitem(position, values[:, position].astype(dtypes.get(name, np.int64)))
+            if self.engineer.compact:
+                features_df = compact_frame(features_df)
+            state = dict(states[col], last_timestamp=df.index[-1].isoformat(), history_rows=len(df),
+                         price_checksum=price_checksum(df))
+            results[symbol] = (features_df, state)
+        return results
+
+    def _states(self, features: Dict[str, np.ndarray], fields: Dict[str, pd.DataFrame],
+                pad_mask: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Incremental indicator state after each symbol's last bar (as FeatureEngineer._indicator_state)
+        """
+        rows = pad_mask.shape[0]
+        ewm = {}
+        for column, (source, span) in ewm_indicators().items():
+            beta = 1 - 2 / (span + 1)
+            source_values = fields[source].to_numpy() if source in fields else features[source]
+            observed = ~np.isnan(source_values) & ~pad_mask
+            # Weight of the adjusted EWM: sum of beta^age over observed inputs
+            weights = (beta ** np.arange(rows - 1, -1, -1)) @ observed
+            ewm[column] = (features[column][-1], weights)
+        close = fields['Close'].to_numpy()[-1]
+        obv = features['OBV'][-1]
+        return [
+            {
+                'last_close': float(close[col]),
+                'ewm': {column: [float(values[col]), float(weights[col])] for column, (values, weights) in ewm.items()},
+                'obv': int(obv[col]) if float(obv[col]).is_integer() else float(obv[col])
+            }
+            for col in range(pad_mask.shape[1])
+        ]
+
+    def _indicators(self, fields: Dict[str, pd.DataFrame], pad_mask: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Every FeatureEngineer indicator over (bars x symbols) frames, in its column order
+
+        The kernels are block versions of the registered indicators (see indicators.py);
+        periods and spans come from the registry, and the result must cover exactly
+        the registry's feature columns.
+        """
+        spans = {column: span for column, (_, span) in ewm_indicators().items()}
+        close = fields['Close']
+        high = fields['High']
+        low = fields['Low']
+        volume = fields['Volume']
+        out = {}
+
+        # Price-based features
+        daily_return = close.pct_change()
+        out['daily_return'] = daily_return
+        out['daily_return_ma_5'] = _rolling(daily_return, 5, 'mean')
+
+        # Simple Moving Averages
+        for period in SMA_PERIODS:
+            sma = _rolling(close, period, 'mean')
+            out[f'SMA_{period}'] = sma
+            out[f'price_to_sma_{period}'] = close / sma
+
+        # Exponential Moving Averages (leading padding is skipped like a missing start)
+        out['EMA_12'] = close.ewm(span=spans['EMA_12']).mean()
+        out['EMA_26'] = close.ewm(span=spans['EMA_26']).mean()
+
+        # Volatility indicators
+        std_20 = _rolling(close, 20, 'std')
+        out['STD_20'] = std_20
+        out['volatility_20'] = _rolling(daily_return, 20, 'std') * np.sqrt(252)
+
+        # Bollinger Bands
+        bb_middle = out['SMA_20']
+        out['BB_middle'] = bb_middle
+        out['BB_upper'] = bb_middle + (std_20 * 2)
+        out['BB_lower'] = bb_middle - (std_20 * 2)
+        out['BB_width'] = out['BB_upper'] - out['BB_lower']
+        out['BB_pct'] = (close - out['BB_lower']) / (out['BB_upper'] - out['BB_lower'])
+
+        # RSI: padding rows must not count as zero gains/losses
+        delta = close.diff()
+        gain = delta.where(delta > 0, 0).mask(pad_mask)
+        loss = (-delta.where(delta < 0, 0)).mask(pad_mask)
+        rs = _rolling(gain, 14, 'mean') / _rolling(loss, 14, 'mean')
+        out['RSI_14'] = 100 - (100 / (1 + rs))
+
+        # MACD
+        macd = out['EMA_12'] - out['EMA_26']
+        out['MACD'] = macd
+        out['MACD_signal'] = macd.ewm(span=spans['MACD_signal']).mean()
+        out['MACD_hist'] = macd - out['MACD_signal']
+
+        # Volume indicators
+        volume_sma = _rolling(volume, 20, 'mean')
+        out['Volume_SMA_20'] = volume_sma
+        out['volume_ratio'] = volume / volume_sma
+        values = close.to_numpy()
+        change = np.diff(values, axis=0, prepend=values[:1])
+        volumes = volume.to_numpy()
+        signed = np.where(change > 0, volumes, np.where(change < 0, -volumes, 0.0))
+        out['OBV'] = np.cumsum(signed, axis=0)
+
+        # Average True Range
+        previous_close = close.shift()
+        true_range = np.maximum(high - low, np.maximum(np.abs(high - previous_close), np.abs(low - previous_close)))
+        out['ATR'] = _rolling(true_range, 14, 'mean')
+
+        # Simple pattern recognition
+        out['higher_high'] = (high > high.shift(1)).astype(int)
+        out['lower_low'] = (low < low.shift(1)).astype(int)
+
+        # Price position in range
+        low_50 = _rolling(low, 50, 'min')
+        out['price_position'] = (close - low_50) / (_rolling(high, 50, 'max') - low_50)
+
+        columns = plan_for().columns
+        if set(out) != set(columns):
+            mismatch = sorted(set(out).symmetric_difference(columns))
+            raise RuntimeError(f"Batch features do not match the indicator registry: {', '.join(mismatch)}")
+        return {name: np.asarray(out[name], dtype=np.float64) for name in columns}
+
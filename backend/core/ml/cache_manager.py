@@ -0,0 +1,298 @@
+"""
+This module keeps the on-disk caches (price data, features, models, request logs) within a size budget.
+
+Files are grouped into entries that are evicted together - all cache files of
+a symbol, all model files of a (symbol, horizon) pair, one day of request
+logs - and entries are evicted least recently accessed first. Readers record
+accesses with `touch`, which also persists them to the file's atime (at most
+once a minute per file), so the LRU order survives restarts and does not
+depend on the filesystem's atime mount options. A background thread runs the
+compaction pass periodically and keeps the per-store totals that health
+checks report, so they never have to scan the directories themselves.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Directory configuration
+DATA_DIR = Path("data")
+MODEL_DIR = Path("models")
+
+# Total disk budget across all stores, and per-store budgets (0 = only the total applies)
+CACHE_MAX_MB = int(os.getenv('CACHE_MAX_MB', '2048'))
+CACHE_STORE_MAX_MB = {
+    'cache': int(os.getenv('CACHE_DATA_MAX_MB', '0')),
+    'features': int(os.getenv('CACHE_FEATURES_MAX_MB', '0')),
+    'models': int(os.getenv('CACHE_MODELS_MAX_MB', '0')),
+    'mcp_logs': int(os.getenv('CACHE_MCP_LOGS_MAX_MB', '256'))
+}
+# Seconds between background compaction passes
+CACHE_GC_INTERVAL = int(os.getenv('CACHE_GC_INTERVAL', '900'))
+# Entries accessed more recently than this are never evicted (they may be in use)
+CACHE_GC_MIN_AGE = int(os.getenv('CACHE_GC_MIN_AGE', '300'))
+# Evict down to this fraction of a budget, so a full cache is not compacted on every write
+CACHE_GC_LOW_WATERMARK = 0.9
+# Leftover temp files from interrupted atomic writes are removed after this many seconds
+TEMP_FILE_MAX_AGE = 3600
+# Persist an access to atime at most this often per file
+ACCESS_RESOLUTION = 60
+
+# Store name -> (directory, pattern whose first group is the entry key)
+CACHE_STORES = {
+    'cache': (DATA_DIR / "cache", re.compile(r'^(.+?)_(?:data\.parquet|all_data\.json|fundamentals\.json|news\.json)$')),
+    'features': (DATA_DIR / "features", re.compile(r'^(.+?)_features')),
+    'models': (MODEL_DIR, re.compile(r'^(.+?_(?:intraday|short|long))_')),
+    'mcp_logs': (DATA_DIR / "logs" / "mcp_requests", re.compile(r'^(\d{8})_(?:requests|responses)\.jsonl$'))
+}
+
+
+class CacheEntry:
+    """
+    Files of one store that are accessed and evicted together
+    """
+    def __init__(self, store: str, key: str):
+        self.store = store
+        self.key = key
+        self.paths = []
+        self.bytes = 0
+        self.accessed = 0.0
+        self.evicted = False
+
+    def add(self, path: Path, size: int, accessed: float):
+        self.paths.append(path)
+        self.bytes += size
+        self.accessed = max(self.accessed, accessed)
+
+
+class CacheManager:
+    """
+    Disk-budgeted LRU garbage collector for the cache directories
+    """
+    def __init__(self, stores: Dict[str, Tuple[Path, Any]] = CACHE_STORES,
+                 max_bytes: int = CACHE_MAX_MB * 1024 * 1024,
+                 store_max_bytes: Optional[Dict[str, int]] = None,
+                 interval: int = CACHE_GC_INTERVAL, min_age: int = CACHE_GC_MIN_AGE):
+        self.stores = stores
+        self.max_bytes = max_bytes
+        if store_max_bytes is None:
+            store_max_bytes = {name: mb * 1024 * 1024 for name, mb in CACHE_STORE_MAX_MB.items() if mb}
+        self.store_max_bytes = store_max_bytes
+        self.interval = interval
+        self.min_age = min_age
+        self._accessed = {}  # path -> last access time persisted to atime
+        self._report = None
+        self._lock = threading.Lock()
+        self._gc_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.runs = 0
+        self.evicted_entries = 0
+        self.evicted_files = 0
+        self.freed_bytes = 0
+        self.last_run = None
+
+    def touch(self, *paths: Path):
+        """
+        Record that cached files were just read
+        """
+        now = time.time()
+        for path in paths:
+            key = str(path)
+            with self._lock:
+                if now - self._accessed.get(key, 0.0) < ACCESS_RESOLUTION:
+                    continue
+                self._accessed[key] = now
+            try:
+                st = os.stat(path)
+                # atime only: the mtime/inode/size version used by the frame cache is unchanged
+                os.utime(path, ns=(int(now * 1e9), st.st_mtime_ns))
+            except OSError:
+                with self._lock:
+                    self._accessed.pop(key, None)
+
+    def scan(self) -> Dict[str, List[CacheEntry]]:
+        """
+        Group every file of every store into entries, removing stale temp files on the way
+        """
+        now = time.time()
+        entries = {}
+        for name, (directory, pattern) in self.stores.items():
+            groups = {}
+            try:
+                iterator = os.scandir(directory)
+            except FileNotFoundError:
+                entries[name] = []
+                continue
+            with iterator:
+                for item in iterator:
+                    try:
+                        if not item.is_file(follow_symlinks=False):
+                            continue
+                        st = item.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if item.name.endswith('.tmp'):
+                        if now - st.st_mtime > TEMP_FILE_MAX_AGE:
+                            self._unlink(Path(item.path))
+                        continue
+                    match = pattern.match(item.name)
+                    key = match.group(1) if match else item.name
+                    if key not in groups:
+                        groups[key] = CacheEntry(name, key)
+                    groups[key].add(Path(item.path), st.st_size, max(st.st_atime, st.st_mtime))
+            entries[name] = list(groups.values())
+        return entries
+
+    def compact(self) -> Dict[str, Any]:
+        """
+        Evict least recently accessed entries until every budget is met; returns what was evicted
+        """
+        with self._gc_lock:
+            started = time.time()
+            entries = self.scan()
+            protected = self._protected_keys()
+            evicted = []
+
+            for name, max_bytes in self.store_max_bytes.items():
+                evicted += self._evict(entries.get(name, []), max_bytes, protected)
+            pool = [entry for store in entries.values() for entry in store]
+            evicted += self._evict(pool, self.max_bytes, protected)
+
+            for name in entries:
+                entries[name] = [entry for entry in entries[name] if not entry.evicted]
+            freed = sum(entry.bytes for entry in evicted)
+            with self._lock:
+                self.runs += 1
+                self.evicted_entries += len(evicted)
+                self.evicted_files += sum(len(entry.paths) for entry in evicted)
+                self.freed_bytes += freed
+                self.last_run = datetime.now().isoformat()
+                self._report = self._build_report(entries, started)
+
+            if evicted:
+                logger.info(f"Cache GC evicted {len(evicted)} entries ({freed / 1024 / 1024:.1f} MB)")
+            return {
+                'evicted': [f"{entry.store}/{entry.key}" for entry in evicted],
+                'freed_bytes': freed,
+                'duration_ms': round((time.time() - started) * 1000, 2)
+            }
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Per-store bytes and entry counts from the last pass, however old it is
+        (`scanned_at`, `age_seconds`).
+
+        Never scans: rescanning is left to the background thread. Before its
+        first pass the counts are zero with `scanned_at` None, and the thread
+        is started if it is not running yet.
+        """
+        with self._lock:
+            report = self._report
+        if report is None:
+            self.start()
+            return self._build_report({name: [] for name in self.stores}, None)
+        return dict(report, age_seconds=round(time.time() - report['scanned_at'], 1))
+
+    def start(self):
+        """
+        Start the background compaction thread (idempotent)
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='cache-gc', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.compact()
+            except Exception as e:
+                logger.warning(f"Cache GC pass failed: {e}")
+            self._stop.wait(self.interval)
+
+    def _protected_keys(self) -> set:
+        # Today's request log is still being appended to
+        return {('mcp_logs', datetime.now().strftime('%Y%m%d'))}
+
+    def _evict(self, entries: List[CacheEntry], max_bytes: int, protected: set) -> List[CacheEntry]:
+        total = sum(entry.bytes for entry in entries if not entry.evicted)
+        if total <= max_bytes:
+            return []
+        target = max_bytes * CACHE_GC_LOW_WATERMARK
+        cutoff = time.time() - self.min_age
+        evicted = []
+        for entry in sorted(entries, key=lambda entry: entry.accessed):
+            if total <= target:
+                break
+            if entry.evicted or entry.accessed > cutoff or (entry.store, entry.key) in protected:
+                continue
+            for path in entry.paths:
+                self._unlink(path)
+            entry.evicted = True
+            total -= entry.bytes
+            evicted.append(entry)
+        if total > max_bytes:
+            logger.warning(f"Cache still {total / 1024 / 1024:.1f} MB after GC "
+                           f"(budget {max_bytes / 1024 / 1024:.1f} MB); remaining entries are in use")
+        return evicted
+
+    def _unlink(self, path: Path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove {path}: {e}")
+        with self._lock:
+            self._accessed.pop(str(path), None)
+
+    def _build_report(self, entries: Dict[str, List[CacheEntry]], started: Optional[float]) -> Dict[str, Any]:
+        stores = {}
+        for name, store in entries.items():
+            stores[name] = {
+                'directory': str(self.stores[name][0]),
+                'bytes': sum(entry.bytes for entry in store),
+                'entries': len(store),
+                'files': sum(len(entry.paths) for entry in store),
+                'max_bytes': self.store_max_bytes.get(name)
+            }
+        total = sum(store['bytes'] for store in stores.values())
+        return {
+            'total_bytes': total,
+            'max_bytes': self.max_bytes,
+            'usage': round(total / self.max_bytes, 4) if self.max_bytes else None,
+            'stores': stores,
+            'scanned_at': time.time() if started is not None else None,
+            'scan_ms': round((time.time() - started) * 1000, 2) if started is not None else None,
+            'gc': {
+                'runs': self.runs,
+                'evicted_entries': self.evicted_entries,
+                'evicted_files': self.evicted_files,
+                'freed_bytes': self.freed_bytes,
+                'last_run': self.last_run,
+                'interval_seconds': self.interval
+            }
+        }
+
+
+# Shared by every ingester, feature engineer and adapter in the process
+cache_manager = CacheManager()
+
+
+if __name__ == "__main__":
+    import json
+    logging.basicConfig(level=logging.INFO)
+    logger.info(f"Compaction: {json.dumps(cache_manager.compact())}")
+    logger.info(f"Stores: {json.dumps(cache_manager.report())}")
@@ -0,0 +1,76 @@
+"""
+This module converts price and feature frames to compact dtypes.
+
+With COMPACT_DTYPES=1, frames held in memory (the frame cache and the
+frames FeatureEngineer returns and stores) use float32 for prices and
+indicators and int8 for the 0/1 pattern flags, which halves their memory and
+cache-bandwidth cost when a large universe is scanned. Volume and OBV keep
+int64 when they are integral (running volume totals exceed float32's 24-bit
+mantissa) and become float32 otherwise. Indicators are still computed in
+float64 and only stored compactly, so the error is float32 rounding of each
+value (relative 6e-8) and does not accumulate; with float32 prices as
+input, returns inherit the rounding of both prices. `compare_precision`
+measures the error against the float64 path (asserted by backend/test_compact.py).
+"""
+import logging
+import os
+from typing import Dict, Any, Optional
+import pandas as pd
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+COMPACT_DTYPES = os.getenv('COMPACT_DTYPES', '0').lower() in ('1', 'true', 'yes')
+
+# 0/1 pattern flags
+FLAG_COLUMNS = ['higher_high', 'lower_low']
+# Volume-like columns: int64 when integral, float32 otherwise
+VOLUME_COLUMNS = ['Volume', 'OBV', 'Volume_SMA_20']
+# Accepted error relative to a column's scale: float32 keeps ~7 significant
+# digits, and differences of rounded prices (returns, RSI gains) lose a few more
+FLOAT32_RTOL = 1e-5
+
+
+def compact_frame(df: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    """
+    `df` with float32 floats, int8 flags and int64 (integral) volumes; other columns unchanged
+    """
+    if df is None or df.empty:
+        return df
+    dtypes = {}
+    for name, dtype in df.dtypes.items():
+        if name in FLAG_COLUMNS:
+            dtypes[name] = np.int8
+        elif name in VOLUME_COLUMNS and np.issubdtype(dtype, np.integer):
+            dtypes[name] = np.int64
+        elif np.issubdtype(dtype, np.floating) and dtype != np.float32:
+            dtypes[name] = np.float32
+    if not dtypes:
+        return df
+    return df.astype(dtypes)
+
+
+def compare_precision(df: pd.DataFrame, symbol: str = 'precision-check') -> Dict[str, Any]:
+    """
+    Largest relative difference per feature column between the compact and float64 paths
+    """
+    from .features import FeatureEngineer
+    full = FeatureEngineer(compact=False).calculate_all_features(df, symbol)
+    compact = FeatureEngineer(compact=True).calculate_all_features(compact_frame(df), symbol)
+    errors = {}
+    for name in full.columns:
+        expected = full[name].to_numpy(dtype=np.float64)
+        actual = compact[name].to_numpy(dtype=np.float64)
+        if len(expected) != len(actual):
+            errors[name] = float('inf')
+            continue
+        # Relative to the column's scale, so values crossing zero do not blow up
+        scale = max(float(np.max(np.abs(expected))) if len(expected) else 0.0, 1e-12)
+        errors[name] = float(np.max(np.abs(actual - expected)) / scale) if len(expected) else 0.0
+    return {
+        'rows': len(full),
+        'max_relative_error': max(errors.values()) if errors else 0.0,
+        'worst_column': max(errors, key=errors.get) if errors else None,
+        'columns': errors
+    }
+
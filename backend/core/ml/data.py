@@ -5,10 +5,23 @@ import logging
 import json
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, Optional, List, Tuple, Callable
 import pandas as pd
 import numpy as np
-import yfinance as yf
+
+from .providers import DataProvider, create_provider
+from .frame_cache import frame_cache, file_version
+from .compact import compact_frame, COMPACT_DTYPES
+from .cache_manager import cache_manager
+from .intraday import intraday_store
+from .resample import resample_cache, HORIZON_RESOLUTIONS
+from .adjust import back_adjust, actions_version, readjust_for_new_actions, ADJUSTMENT_RTOL
+from .store import (
+    PARQUET_AVAILABLE, price_cache_path, legacy_cache_path, fundamentals_cache_path,
+    news_cache_path, price_frame_from_json, write_price_frame, read_price_frame,
+    read_price_metadata, write_json_record, read_json_record, read_record_header, frame_summary,
+    migrate_json_cache, merge_price_frames, CorruptRecordError, RESTATEMENT_RTOL
+)
 
 logger = logging.getLogger(__name__)
 
@@ -17,93 +30,551 @@ DATA_DIR = Path("data")
 DATA_CACHE_DIR = DATA_DIR / "cache"
 NSE_BHAV_CACHE_DIR = DATA_DIR / "nse_bhav"
 
+# Minimum number of bars for a download to be considered usable
+MIN_HISTORY_ROWS = 50
+
+# Incremental fetch configuration
+INCREMENTAL_OVERLAP_BARS = 5  # Re-request the last few cached bars to detect restatements
+MAX_INCREMENTAL_GAP = timedelta(days=180)  # Older caches are re-downloaded in full
+
+# Independent time-to-live of each cached artifact
+CACHE_TTLS = {
+    'price': timedelta(days=1),
+    'fundamentals': timedelta(days=7),
+    'news': timedelta(hours=6)
+}
+
+# How long past its TTL a cached artifact may still be served while it is
+# refreshed in the background; beyond this a request waits for fresh data
+CACHE_GRACE_PERIODS = {
+    'price': timedelta(days=7),
+    'fundamentals': timedelta(days=30),
+    'news': timedelta(days=1)
+}
+
+# Keys served by the lazily loaded artifacts, with their defaults
+FUNDAMENTALS_KEYS = {'company_info': {}, 'financials': {}, 'recommendations': None}
+NEWS_KEYS = {'news': []}
+
 # Create directories if they don't exist
 for directory in [DATA_CACHE_DIR, NSE_BHAV_CACHE_DIR]:
     directory.mkdir(parents=True, exist_ok=True)
 
 
+class CachedDataBundle(dict):
+    """
+    Cached data for one symbol, with fundamentals and news loaded on first access.
+
+    Behaves like the dict `fetch_all_data` always returned: `price_history` and
+    `price_history_metadata` are present up front, while `company_info`,
+    `financials`, `recommendations` and `news` are read from their artifacts
+    only when a caller asks for them.
+    """
+    def __init__(self, data: Dict[str, Any], loaders: Dict[str, Callable[[], Dict[str, Any]]]):
+        super().__init__(data)
+        self._loaders = {key: loader for key, loader in loaders.items() if key not in data}
+    
+    def __missing__(self, key):
+        loader = self._loaders.get(key)
+        if loader is None:
+            raise KeyError(key)
+        loaded = loader()
+        for loaded_key, value in loaded.items():
+            self._loaders.pop(loaded_key, None)
+            dict.__setitem__(self, loaded_key, value)
+        return dict.__getitem__(self, key)
+    
+    def __contains__(self, key) -> bool:
+        return dict.__contains__(self, key) or key in self._loaders
+    
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
 class EnhancedDataIngester:
     """
-    Enhanced data ingester that fetches from Yahoo Finance with fallback to cache.
+    Enhanced data ingester that fetches from a data provider (Yahoo Finance by
+    default, or the one named by DATA_PROVIDER) with fallback to cache.
     """
-    def __init__(self):
-        self.data_sources = ['yfinance']
+    def __init__(self, provider: Optional[DataProvider] = None, compact: Optional[bool] = None):
+        self.provider = provider or create_provider()
+        # Cached price frames in float32 (see core.ml.compact); COMPACT_DTYPES by default
+        self.compact = COMPACT_DTYPES if compact is None else compact
+        self.data_sources = [self.provider.name]
     
-    def fetch_all_data(self, symbol: str, period: str = "2y") -> Dict[str, Any]:
+    def fetch_all_data(self, symbol: str, period: str = "2y", incremental: bool = False,
+                       include_fundamentals: bool = True) -> Dict[str, Any]:
         """
         Fetch all available data for a symbol with fallback mechanism
+
+        With `incremental=True` and an existing cache, only the bars after the
+        last cached timestamp are requested and appended (see `incremental_start`);
+        a full download is used when there is no cache or history was restated.
+        With `include_fundamentals=False` only prices are fetched; otherwise
+        fundamentals and news are refreshed when their own TTL has expired.
         """
         logger.info(f"Fetching data for {symbol} with period {period}")
         
-        # Try Yahoo Finance first
+        if incremental:
+            try:
+                plan = self.incremental_start(symbol)
+                if plan is not None:
+                    cached, start = plan
+                    delta = self.provider.history(symbol, start=start)
+                    all_data = self.apply_delta(symbol, cached, delta, include_fundamentals)
+                    if all_data is not None:
+                        return all_data
+            except Exception as e:
+                logger.warning(f"Incremental fetch failed for {symbol}: {e}. Falling back to full download.")
+        
+        # Try the provider first
         try:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period=period)
-            
-            if len(hist) > 50:  # Sufficient data from yfinance
-                logger.info(f"Successfully fetched {len(hist)} rows from yfinance for {symbol}")
-                
-                # Get additional info
-                info = ticker.info or {}
-                recommendations = ticker.recommendations if hasattr(ticker, 'recommendations') else None
-                news = ticker.news if hasattr(ticker, 'news') else []
-                
-                # Prepare financials data (simplified)
-                financials = {
-                    'income_stmt': ticker.income_stmt.to_dict() if hasattr(ticker, 'income_stmt') and ticker.income_stmt is not None else {},
-                    'balance_sheet': ticker.balance_sheet.to_dict() if hasattr(ticker, 'balance_sheet') and ticker.balance_sheet is not None else {},
-                    'cashflow': ticker.cashflow.to_dict() if hasattr(ticker, 'cashflow') and ticker.cashflow is not None else {}
-                }
-                
-                all_data = {
-                    'price_history': hist,
-                    'price_history_metadata': {
-                        'data_source': 'yfinance',
-                        'fetched_at': datetime.now().isoformat(),
-                        'rows': len(hist)
-                    },
-                    'company_info': info,
-                    'financials': financials,
-                    'recommendations': recommendations,
-                    'news': news
-                }
-                
-                # Cache the data
-                cache_path = DATA_CACHE_DIR / f"{symbol}_all_data.json"
-                self._save_to_cache(all_data, cache_path)
-                
+            hist = self.provider.history(symbol, period=period)
+            all_data = self.ingest_history(symbol, hist, include_fundamentals)
+            if all_data is not None:
                 return all_data
-            else:
-                logger.warning(f"Insufficient data from yfinance for {symbol}. Will try to load from cache if available.")
+            logger.warning(f"Insufficient data from {self.provider.name} for {symbol}. Will try to load from cache if available.")
         except Exception as e:
-            logger.warning(f"yfinance failed for {symbol}: {e}. Will try to load from cache if available.")
+            logger.warning(f"{self.provider.name} failed for {symbol}: {e}. Will try to load from cache if available.")
         
-        # If yfinance fails, try to load from cache
-        cache_path = DATA_CACHE_DIR / f"{symbol}_all_data.json"
-        if cache_path.exists():
+        # If the provider fails, try to load from cache
+        if self.has_cached_data(symbol):
             logger.info(f"Loading cached data for {symbol}")
-            return self._load_from_cache(cache_path)
+            return self._load_from_cache(symbol)
         
         logger.error(f"Could not fetch data for {symbol} from any source and no cache available.")
         return None
     
+    def ingest_history(self, symbol: str, hist: pd.DataFrame,
+                       include_fundamentals: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Cache a freshly downloaded full price history.
+
+        Returns None if the history is too short to be useful.
+        """
+        if hist is None or len(hist) <= MIN_HISTORY_ROWS:
+            return None
+        
+        # A fallback chain tags frames with the provider that served them
+        source = hist.attrs.get('provider', self.provider.name)
+        logger.info(f"Successfully fetched {len(hist)} rows from {source} for {symbol}")
+        if not hist.attrs.get('adjusted', self.provider.adjusted):
+            hist = back_adjust(hist)
+        metadata = {
+            'data_source': source,
+            'fetched_at': datetime.now().isoformat(),
+            'rows': len(hist),
+            'actions_version': actions_version(hist)
+        }
+        
+        # Cache the data
+        self._save_price(symbol, hist, metadata)
+        if include_fundamentals:
+            self.refresh_fundamentals(symbol)
+        
+        return self._bundle(symbol, hist, metadata)
+    
+    def incremental_start(self, symbol: str) -> Optional[Tuple[pd.DataFrame, str]]:
+        """
+        Work out where an incremental fetch for `symbol` should start.
+
+        The request starts INCREMENTAL_OVERLAP_BARS before the last cached bar so
+        that a still-forming last bar gets repaired and upstream restatements are
+        detected. Returns (cached history, start date) or None when a full
+        download is needed instead.
+        """
+        # Full precision: the merged history is written back to the cache
+        cached, _ = self._read_price(symbol, compact=False)
+        if cached is None or len(cached) <= INCREMENTAL_OVERLAP_BARS:
+            return None
+        
+        last_timestamp = cached.index[-1]
+        if datetime.now() - last_timestamp.to_pydatetime() > MAX_INCREMENTAL_GAP:
+            logger.info(f"Cache for {symbol} is older than {MAX_INCREMENTAL_GAP.days} days, doing a full download")
+            return None
+        
+        start = cached.index[-INCREMENTAL_OVERLAP_BARS]
+        return cached, start.strftime('%Y-%m-%d')
+    
+    def apply_delta(self, symbol: str, cached: pd.DataFrame, delta: pd.DataFrame,
+                    include_fundamentals: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Append an incrementally fetched `delta` to the cached history and save it.
+
+        Returns None when the delta is empty or history was restated upstream,
+        in which case the caller should fall back to a full download.
+        """
+        if delta is None or delta.empty:
+            logger.warning(f"No bars returned for {symbol} since {cached.index[-INCREMENTAL_OVERLAP_BARS].date()}")
+            return None
+        
+        # New splits/dividends re-adjust the cached bars locally; the check
+        # below still catches restatements they do not explain
+        cached, delta, adjust_info = readjust_for_new_actions(
+            cached, delta, delta_adjusted=delta.attrs.get('adjusted', self.provider.adjusted))
+        rtol = ADJUSTMENT_RTOL if adjust_info['actions'] else RESTATEMENT_RTOL
+        merged, merge_info = merge_price_frames(cached, delta, rtol=rtol)
+        if merge_info['restated']:
+            logger.info(f"History for {symbol} was restated from {merge_info['restated_from']}, doing a full download")
+            return None
+        
+        metadata = dict(self.load_price_metadata(symbol))
+        metadata.update({
+            'data_source': delta.attrs.get('provider', self.provider.name),
+            'fetched_at': datetime.now().isoformat(),
+            'rows': len(merged),
+            'fetch_mode': 'incremental',
+            'delta_rows': len(delta),
+            'appended_rows': merge_info['appended'],
+            'repaired_rows': merge_info['repaired'],
+            'actions_version': actions_version(merged),
+            'readjusted_actions': adjust_info['actions']
+        })
+        
+        self._save_price(symbol, merged, metadata)
+        if include_fundamentals:
+            self.refresh_fundamentals(symbol)
+        
+        logger.info(f"Incremental fetch for {symbol}: {merge_info['appended']} new, "
+                    f"{merge_info['repaired']} repaired ({len(delta)} bars downloaded)")
+        return self._bundle(symbol, merged, metadata)
+    
+    def refresh_fundamentals(self, symbol: str, force: bool = False) -> Dict[str, bool]:
+        """
+        Re-download fundamentals and news for a symbol if their TTL has expired.
+
+        Each artifact is refreshed independently; failures are logged and the
+        previous copy (if any) is kept. Returns which artifacts were refreshed.
+        """
+        refreshed = {'fundamentals': False, 'news': False}
+        
+        if force or self.is_stale(symbol, 'fundamentals'):
+            try:
+                fundamentals = dict(self.provider.fundamentals(symbol))
+                fundamentals['fetched_at'] = datetime.now().isoformat()
+                write_json_record(self._to_serializable(fundamentals), fundamentals_cache_path(symbol), 'fundamentals')
+                refreshed['fundamentals'] = True
+            except Exception as e:
+                logger.warning(f"Could not refresh fundamentals for {symbol}: {e}")
+        
+        if force or self.is_stale(symbol, 'news'):
+            try:
+                news = {'news': self.provider.news(symbol), 'fetched_at': datetime.now().isoformat()}
+                write_json_record(self._to_serializable(news), news_cache_path(symbol), 'news',
+                                  {'rows': len(news['news'] or [])})
+                refreshed['news'] = True
+            except Exception as e:
+                logger.warning(f"Could not refresh news for {symbol}: {e}")
+        
+        return refreshed
+    
+    def fetch_intraday(self, symbol: str, timeframe: str = "5m") -> Optional[pd.DataFrame]:
+        """
+        Fetch intraday bars into the symbol's ring buffer and return the buffered window.
+
+        An empty buffer is backfilled over the timeframe's backfill period;
+        afterwards only bars from the last buffered day onwards are requested.
+        """
+        buffer = intraday_store.buffer(symbol, timeframe)
+        last = buffer.last_timestamp
+        if last is None:
+            bars = self.provider.intraday(symbol, timeframe, period=intraday_store.timeframes[timeframe]['backfill_period'])
+        else:
+            bars = self.provider.intraday(symbol, timeframe, start=last.strftime('%Y-%m-%d'))
+        
+        written = intraday_store.update(symbol, timeframe, bars)
+        logger.info(f"Stored {written} {timeframe} bars for {symbol} ({len(buffer)}/{buffer.capacity} buffered)")
+        return intraday_store.last(symbol, timeframe)
+    
+    def load_intraday(self, symbol: str, timeframe: str = "5m", bars: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """
+        Return the last `bars` buffered intraday bars (a view on the ring buffer), or None
+        """
+        return intraday_store.last(symbol, timeframe, bars)
+    
+    def has_cached_data(self, symbol: str) -> bool:
+        """
+        Check whether price history for a symbol is cached (in any format)
+        """
+        return price_cache_path(symbol).exists() or legacy_cache_path(symbol).exists()
+    
+    def cache_age(self, symbol: str, artifact: str = 'price') -> Optional[timedelta]:
+        """
+        Age of a cached artifact ('price', 'fundamentals' or 'news'), or None if missing
+        """
+        path = self._artifact_path(symbol, artifact)
+        if not path.exists():
+            return None
+        return datetime.now() - datetime.fromtimestamp(path.stat().st_mtime)
+    
+    def is_stale(self, symbol: str, artifact: str = 'price') -> bool:
+        """
+        Check whether a cached artifact is missing or older than its TTL
+        """
+        age = self.cache_age(symbol, artifact)
+        return age is None or age > CACHE_TTLS[artifact]
+    
+    def freshness(self, symbol: str, artifact: str = 'price') -> str:
+        """
+        Classify a cached artifact against its TTL and grace period.
+
+        Returns 'missing', 'fresh' (within TTL), 'stale' (past TTL but within
+        the grace period, so it can be served while a refresh runs) or
+        'expired' (too old to serve).
+        """
+        age = self.cache_age(symbol, artifact)
+        if age is None:
+            return 'missing'
+        if age <= CACHE_TTLS[artifact]:
+            return 'fresh'
+        if age <= CACHE_TTLS[artifact] + CACHE_GRACE_PERIODS[artifact]:
+            return 'stale'
+        return 'expired'
+    
+    def data_age(self, symbol: str) -> Dict[str, Any]:
+        """
+        Age in seconds and freshness of every cached artifact for a symbol
+        """
+        ages = {}
+        for artifact in CACHE_TTLS:
+            age = self.cache_age(symbol, artifact)
+            ages[artifact] = {
+                'age_seconds': round(age.total_seconds(), 1) if age is not None else None,
+                'state': self.freshness(symbol, artifact)
+            }
+        return ages
+    
     def load_all_data(self, symbol: str) -> Dict[str, Any]:
         """
         Load previously cached data for a symbol
+
+        Only the price history is read immediately; fundamentals and news are
+        loaded lazily from their own artifacts on first access.
         """
-        cache_path = DATA_CACHE_DIR / f"{symbol}_all_data.json"
-        if cache_path.exists():
-            return self._load_from_cache(cache_path)
+        if self.has_cached_data(symbol):
+            return self._load_from_cache(symbol)
         return None
     
-    def _save_to_cache(self, data: Dict[str, Any], cache_path: Path):
+    def load_price_history(self, symbol: str, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Load only the cached price history, optionally restricted to `columns`
+        """
+        df, _ = self._read_price(symbol, columns=columns)
+        return df
+    
+    def load_resampled(self, symbol: str, resolution: str = "weekly") -> Optional[pd.DataFrame]:
+        """
+        Cached price history as 'daily', 'weekly' or 'monthly' bars
+
+        Weekly/monthly bars come from the process-wide resample cache and are
+        only rebuilt for the periods new daily bars fall into; treat them as
+        read-only.
+        """
+        # Taken before the read: a file replaced in between is only compared again next time
+        version = file_version(price_cache_path(symbol))
+        version = (version, self.compact) if version is not None else None
+        df, _ = self._read_price(symbol)
+        if df is None or resolution == 'daily':
+            return df
+        return resample_cache.get(symbol, resolution, df, version)
+    
+    def load_horizon_bars(self, symbol: str, horizon: str) -> Optional[pd.DataFrame]:
+        """
+        Price bars at the resolution of a prediction horizon (intraday: daily,
+        short: weekly, long: monthly)
+        """
+        return self.load_resampled(symbol, HORIZON_RESOLUTIONS.get(horizon, 'daily'))
+    
+    def load_price_metadata(self, symbol: str) -> Dict[str, Any]:
+        """
+        Load the metadata stored alongside the cached price history
+        """
+        _, metadata = self._read_price(symbol, columns=[])
+        return metadata
+    
+    def load_price_header(self, symbol: str) -> Dict[str, Any]:
+        """
+        Read the record header of the cached price history (rows, first/last
+        timestamp, last close, checksums) without reading any bars.
+
+        Returns {} when there is no cache or it predates record headers.
+        """
+        path = self._artifact_path(symbol, 'price')
+        if not path.exists():
+            return {}
+        try:
+            header = frame_cache.get(('price_header', symbol), path, lambda: read_record_header(path))
+            return dict(header or {})
+        except CorruptRecordError as e:
+            logger.warning(f"{e}; removing it")
+            path.unlink(missing_ok=True)
+            return {}
+    
+    def load_last_close(self, symbol: str) -> Optional[float]:
+        """
+        Return the last cached Close price for a symbol
+
+        Answered from the record header when it has one; older caches fall
+        back to reading only the Close column.
+        """
+        header = self.load_price_header(symbol)
+        if header.get('last_close') is not None:
+            cache_manager.touch(self._artifact_path(symbol, 'price'))
+            return float(header['last_close'])
+        df = self.load_price_history(symbol, columns=['Close'])
+        if df is None or df.empty:
+            return None
+        return float(df['Close'].iloc[-1])
+    
+    def load_fundamentals(self, symbol: str) -> Dict[str, Any]:
+        """
+        Load cached company info, financials and recommendations
         """
-        Save data to cache in JSON format using atomic write to prevent corruption
+        data = self._read_json_artifact(fundamentals_cache_path(symbol))
+        return {key: data.get(key, default) for key, default in FUNDAMENTALS_KEYS.items()}
+    
+    def load_news(self, symbol: str) -> Dict[str, Any]:
         """
-        import tempfile
-        import os
+        Load cached news items
+        """
+        data = self._read_json_artifact(news_cache_path(symbol))
+        return {key: data.get(key, default) for key, default in NEWS_KEYS.items()}
+    
+    def _bundle(self, symbol: str, price_history: pd.DataFrame, metadata: Dict[str, Any]) -> CachedDataBundle:
+        loaders = {key: lambda: self.load_fundamentals(symbol) for key in FUNDAMENTALS_KEYS}
+        loaders.update({key: lambda: self.load_news(symbol) for key in NEWS_KEYS})
+        return CachedDataBundle(
+            {'price_history': price_history, 'price_history_metadata': metadata},
+            loaders
+        )
+    
+    def _artifact_path(self, symbol: str, artifact: str) -> Path:
+        if artifact == 'fundamentals':
+            return fundamentals_cache_path(symbol)
+        if artifact == 'news':
+            return news_cache_path(symbol)
+        if PARQUET_AVAILABLE and (price_cache_path(symbol).exists() or not legacy_cache_path(symbol).exists()):
+            return price_cache_path(symbol)
+        # Not yet migrated, or pyarrow is unavailable
+        return legacy_cache_path(symbol)
+    
+    def _read_json_artifact(self, path: Path) -> Dict[str, Any]:
+        if not path.exists():
+            return {}
+        cache_manager.touch(path)
+        try:
+            _, data = read_json_record(path)
+            return data
+        except CorruptRecordError as e:
+            logger.warning(f"{e}; removing it")
+            path.unlink(missing_ok=True)
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not read {path}: {e}")
+            return {}
+    
+    def _read_price(self, symbol: str, columns: Optional[List[str]] = None,
+                    compact: Optional[bool] = None) -> Tuple[Optional[pd.DataFrame], Dict[str, Any]]:
+        """
+        Read the cached price history and its metadata, migrating legacy caches first
+
+        Parsed frames are served from the process-wide frame cache while the
+        file on disk is unchanged; callers always receive their own copy. In
+        compact mode the cached frame holds float32 prices.
+        """
+        parquet_path = price_cache_path(symbol)
+        json_path = legacy_cache_path(symbol)
+        compact = self.compact if compact is None else compact
+        key = ('price', symbol, 'compact') if compact else ('price', symbol)
         
-        # Convert DataFrame to dict for JSON serialization
+        if PARQUET_AVAILABLE:
+            if not parquet_path.exists() and json_path.exists():
+                self._migrate_legacy_cache(symbol)
+            try:
+                cached = frame_cache.get(key, parquet_path,
+                                         lambda: self._compact_price((read_price_frame(parquet_path),
+                                                                      read_price_metadata(parquet_path)), compact))
+            except Exception as e:
+                logger.warning(f"Price cache for {symbol} is unreadable, removing it: {e}")
+                parquet_path.unlink(missing_ok=True)
+                return None, {}
+        else:
+            cached = frame_cache.get(key, json_path, lambda: self._compact_price(self._read_json_price(json_path), compact))
+        
+        if cached is None:
+            return None, {}
+        cache_manager.touch(parquet_path if PARQUET_AVAILABLE else json_path)
+        df, metadata = cached
+        if df is None:
+            return None, dict(metadata)
+        if columns is not None:
+            df = df[[col for col in columns if col in df.columns]]
+        return df.copy(), dict(metadata)
+    
+    def _compact_price(self, cached: Tuple[Optional[pd.DataFrame], Dict[str, Any]],
+                       compact: bool) -> Tuple[Optional[pd.DataFrame], Dict[str, Any]]:
+        df, metadata = cached
+        return (compact_frame(df) if compact else df), metadata
+    
+    def _read_json_price(self, json_path: Path) -> Tuple[Optional[pd.DataFrame], Dict[str, Any]]:
+        data = self._read_json_artifact(json_path)
+        return price_frame_from_json(data.get('price_history')), data.get('price_history_metadata') or {}
+    
+    def _migrate_legacy_cache(self, symbol: str):
+        """
+        Split a legacy JSON cache into separate artifacts, if one exists
+        """
+        json_path = legacy_cache_path(symbol)
+        if not json_path.exists():
+            return
+        try:
+            migrate_json_cache(json_path)
+        except Exception as e:
+            logger.warning(f"Could not migrate legacy cache for {symbol}: {e}")
+    
+    def _save_price(self, symbol: str, price_history: pd.DataFrame, metadata: Dict[str, Any]):
+        """
+        Save price history using atomic writes to prevent corruption
+        """
+        try:
+            if PARQUET_AVAILABLE:
+                write_price_frame(price_history, price_cache_path(symbol), metadata)
+            else:
+                write_json_record(self._to_serializable({
+                    'price_history': price_history,
+                    'price_history_metadata': metadata
+                }), legacy_cache_path(symbol), 'price_history', frame_summary(price_history))
+            logger.info(f"Successfully saved price cache for {symbol}")
+        except Exception as e:
+            logger.error(f"Failed to save price cache for {symbol}: {e}")
+    
+    def _save_to_cache(self, symbol: str, data: Dict[str, Any]):
+        """
+        Save a full data bundle, writing price history, fundamentals and news
+        to their separate artifacts
+        """
+        if isinstance(data.get('price_history'), pd.DataFrame):
+            self._save_price(symbol, data['price_history'], data.get('price_history_metadata') or {})
+        
+        fetched_at = datetime.now().isoformat()
+        try:
+            if any(key in data for key in FUNDAMENTALS_KEYS):
+                fundamentals = {key: data.get(key, default) for key, default in FUNDAMENTALS_KEYS.items()}
+                fundamentals['fetched_at'] = fetched_at
+                write_json_record(self._to_serializable(fundamentals), fundamentals_cache_path(symbol), 'fundamentals')
+            if 'news' in data:
+                write_json_record(self._to_serializable({'news': data.get('news') or [], 'fetched_at': fetched_at}),
+                                  news_cache_path(symbol), 'news', {'rows': len(data.get('news') or [])})
+        except Exception as e:
+            logger.error(f"Failed to save fundamentals cache for {symbol}: {e}")
+    
+    def _to_serializable(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert DataFrames and Series in a payload to JSON-friendly structures
+        """
         serializable_data = {}
         for key, value in data.items():
             if isinstance(value, pd.DataFrame):
@@ -119,48 +590,13 @@ class EnhancedDataIngester:
                 serializable_data[key] = value.reset_index(drop=True).tolist()
             else:
                 serializable_data[key] = value
-        
-        # Use atomic write: write to temp file then rename
-        # This prevents corrupted files if the process is interrupted
-        try:
-            cache_path.parent.mkdir(parents=True, exist_ok=True)
-            temp_fd, temp_path = tempfile.mkstemp(dir=cache_path.parent, suffix='.tmp')
-            try:
-                with os.fdopen(temp_fd, 'w') as f:
-                    json.dump(serializable_data, f, default=str, indent=2)
-                # Atomic rename (on same filesystem)
-                os.replace(temp_path, cache_path)
-                logger.info(f"Successfully saved cache to {cache_path}")
-            except Exception as e:
-                # Clean up temp file on error
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
-                raise e
-        except Exception as e:
-            logger.error(f"Failed to save cache to {cache_path}: {e}")
+        return serializable_data
     
-    def _load_from_cache(self, cache_path: Path) -> Dict[str, Any]:
+    def _load_from_cache(self, symbol: str) -> Dict[str, Any]:
         """
-        Load data from cache and convert back to DataFrame where needed
+        Load cached price history, with fundamentals and news attached lazily
         """
-        with open(cache_path, 'r') as f:
-            data = json.load(f)
-        
-        # Convert dict back to DataFrame where needed
-        if 'price_history' in data and isinstance(data['price_history'], dict):
-            # Handle new format with orient='list'
-            if 'Date' in data['price_history']:
-                # Old index-based format
-                df = pd.DataFrame(data['price_history'])
-                df.index = pd.to_datetime(df.index)
-                df.index.name = 'Date'
-            else:
-                # New format with orient='list' - Date is a column
-                df = pd.DataFrame(data['price_history'])
-                if 'Date' in df.columns:
-                    df['Date'] = pd.to_datetime(df['Date'])
-                    df.set_index('Date', inplace=True)
-                    df.index.name = 'Date'
-            data['price_history'] = df
-        
-        return data
+        df, metadata = self._read_price(symbol)
+        if df is None:
+            return None
+        return self._bundle(symbol, df, metadata)
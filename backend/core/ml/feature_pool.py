@@ -0,0 +1,196 @@
+"""
+This module builds features for many symbols on a pool of worker processes.
+
+Feature calculation is CPU-bound pandas work that holds the GIL, so threads
+do not help; a persistent ProcessPoolExecutor does. Workers read each
+symbol's prices from the on-disk price cache and write the features to the
+feature store themselves, so only symbol names go to a worker and small
+summaries (rows, feature count, mode) come back. No DataFrame is pickled in
+either direction. A worker is warmed up once when it starts: it imports
+pandas and the feature modules and runs one small calculation. The pool
+stays up between requests, so only the first scan pays that cost.
+
+Within a worker, symbols without features are calculated together by
+BatchFeatureEngineer, and symbols that have features are extended
+incrementally.
+"""
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional
+import multiprocessing
+
+logger = logging.getLogger(__name__)
+
+# Worker processes for feature calculation (0 or 1 computes in the calling process)
+FEATURE_WORKERS = int(os.getenv('FEATURE_WORKERS', str(os.cpu_count() or 1)))
+# Fewer symbols than this are computed in the calling process (not worth a round trip)
+FEATURE_POOL_MIN_SYMBOLS = int(os.getenv('FEATURE_POOL_MIN_SYMBOLS', '4'))
+
+# Per-process engineer and ingester, created by the worker initializer (or on first use)
+_worker = {}
+
+
+def _components():
+    if not _worker:
+        from .data import EnhancedDataIngester
+        from .features import FeatureEngineer
+        _worker['engineer'] = FeatureEngineer()
+        _worker['ingester'] = EnhancedDataIngester()
+    return _worker['engineer'], _worker['ingester']
+
+
+def _warm_up():
+    """
+    Worker initializer: import the feature stack and run one small calculation
+    """
+    import numpy as np
+    import pandas as pd
+    engineer, _ = _components()
+    index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=250)
+    close = pd.Series(np.linspace(100, 110, len(index)), index=index)
+    frame = pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                          'Volume': np.full(len(index), 1000, dtype=np.int64)})
+    engineer.calculate_all_features(frame, 'warmup')
+
+
+def update_symbols(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Bring the stored features of `symbols` up to date from their cached prices.
+
+    Returns update_features-style summaries ({'mode', 'rows_added', 'rows',
+    'total_features'}) or {'mode': 'error', 'message'} per symbol.
+    """
+    from .batch_features import BatchFeatureEngineer
+    from .features import feature_path
+    engineer, ingester = _components()
+
+    frames = {}
+    results = {}
+    for symbol in symbols:
+        df = ingester.load_price_history(symbol)
+        if df is None or df.empty:
+            results[symbol] = {'mode': 'error', 'message': "No cached price history"}
+        else:
+            frames[symbol] = df
+
+    # Symbols without stored features: one stacked calculation
+    new = {symbol: df for symbol, df in frames.items() if not feature_path(symbol).exists()}
+    if len(new) > 1:
+        for symbol, outcome in BatchFeatureEngineer(engineer).calculate_and_save(new).items():
+            if outcome['status'] == 'calculated':
+                results[symbol] = {'mode': 'full', 'rows_added': outcome['rows'], 'rows': outcome['rows'],
+                                   'total_features': outcome['total_features']}
+            else:
+                results[symbol] = {'mode': 'error', 'message': outcome.get('message', '')}
+
+    for symbol, df in frames.items():
+        if symbol in results:
+            continue
+        try:
+            results[symbol] = engineer.update_features(df, symbol)
+        except Exception as e:
+            logger.error(f"Feature update failed for {symbol}: {e}")
+            results[symbol] = {'mode': 'error', 'message': str(e)}
+    return results
+
+
+class FeaturePool:
+    """
+    Persistent process pool that updates the feature store for many symbols at once
+    """
+    def __init__(self, max_workers: int = FEATURE_WORKERS, min_symbols: int = FEATURE_POOL_MIN_SYMBOLS):
+        self.max_workers = max_workers
+        self.min_symbols = min_symbols
+        self._executor = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.symbols = 0
+        self.pooled = 0
+        self.errors = 0
+        self.started_at = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 1
+
+    def update(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        update_symbols() for `symbols`, fanned out over the worker processes
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        with self._lock:
+            self.requests += 1
+            self.symbols += len(symbols)
+        if not self.enabled or len(symbols) < self.min_symbols:
+            return self._count_errors(update_symbols(symbols))
+
+        # A few chunks per worker balances uneven histories; each chunk is batch-calculated
+        from .batch_features import BATCH_FEATURE_CHUNK
+        chunk = max(1, min(BATCH_FEATURE_CHUNK, math.ceil(len(symbols) / (self.max_workers * 4))))
+        chunks = [symbols[i:i + chunk] for i in range(0, len(symbols), chunk)]
+        results = {}
+        try:
+            for outcome in self._pool().map(update_symbols, chunks):
+                results.update(outcome)
+        except Exception as e:
+            # A broken pool (e.g. a killed worker) is replaced on the next request
+            logger.warning(f"Feature pool failed ({e}); computing the remaining symbols in process")
+            self._reset()
+            remaining = [symbol for symbol in symbols if symbol not in results]
+            results.update(update_symbols(remaining))
+        else:
+            with self._lock:
+                self.pooled += len(symbols)
+        return self._count_errors(results)
+
+    def _count_errors(self, results: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        errors = sum(1 for outcome in results.values() if outcome.get('mode') == 'error')
+        if errors:
+            with self._lock:
+                self.errors += errors
+        return results
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: workers must not inherit the parent's threads and locks
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context('spawn'),
+                                                     initializer=_warm_up)
+                self.started_at = time.time()
+                logger.info(f"Started feature pool with {self.max_workers} worker processes")
+            return self._executor
+
+    def _reset(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'workers': self.max_workers if self.enabled else 0,
+                'running': self._executor is not None,
+                'requests': self.requests,
+                'symbols': self.symbols,
+                'pooled_symbols': self.pooled,
+                'errors': self.errors
+            }
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+# Shared by every adapter in the process
+feature_pool = FeaturePool()
+
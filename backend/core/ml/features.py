@@ -2,50 +2,225 @@
 This module handles feature engineering for the stock analysis pipeline.
 """
 import logging
-import json
+import os
+import zlib
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional, List, Tuple
 import pandas as pd
 import numpy as np
 
+from .frame_cache import frame_cache, file_version
+from .cache_manager import cache_manager
+from .compact import compact_frame, COMPACT_DTYPES
+from .indicators import IndicatorContext, plan_for, ewm_indicators, on_balance_volume, ta_backend
+from .store import (write_json_record, read_json_record, read_record_header, write_feature_frame,
+                    read_feature_frame, frame_summary, CorruptRecordError, PARQUET_AVAILABLE)
+
 logger = logging.getLogger(__name__)
 
 # Directory configuration
 DATA_DIR = Path("data")
 FEATURE_CACHE_DIR = DATA_DIR / "features"
 
+# Version of the feature definitions; bump when an indicator changes so that
+# cached features are recalculated instead of extended
+FEATURE_VERSION = 2
+
+# Price rows needed before the first new bar so that every rolling window is
+# full when features are extended incrementally (SMA_200 is the longest)
+FEATURE_WARMUP_ROWS = 200
+# Price columns whose values, with the timestamps, identify the history the
+# saved indicator state was computed from
+PRICE_CHECKSUM_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+# Exponential averages carried across incremental updates: column -> (input column, span)
+EWM_FEATURES = ewm_indicators()
+# Incremental updates append to a small per-symbol delta file; once it holds
+# this many rows it is merged into the main file (the only full rewrite)
+FEATURE_DELTA_MAX_ROWS = int(os.getenv('FEATURE_DELTA_MAX_ROWS', '250'))
+
 # Create directories if they don't exist
 for directory in [FEATURE_CACHE_DIR]:
     directory.mkdir(parents=True, exist_ok=True)
 
 
+def feature_path(symbol: str, feature_dir: Path = FEATURE_CACHE_DIR) -> Path:
+    """
+    Path of the feature store file for a symbol (Parquet, or JSON without pyarrow)
+    """
+    if PARQUET_AVAILABLE:
+        return feature_dir / f"{symbol}_features.parquet"
+    return legacy_feature_path(symbol, feature_dir)
+
+
+def legacy_feature_path(symbol: str, feature_dir: Path = FEATURE_CACHE_DIR) -> Path:
+    """
+    Path of the JSON feature file (written before the columnar store, or without pyarrow)
+    """
+    return feature_dir / f"{symbol}_features.json"
+
+
+def delta_path(symbol: str, feature_dir: Path = FEATURE_CACHE_DIR) -> Path:
+    """
+    Path of the delta file: feature rows appended since the main feature file was written
+    """
+    return feature_dir / f"{symbol}_features.delta.parquet"
+
+
+def feature_mtime(symbol: str) -> Optional[datetime]:
+    """
+    Time the stored features of a symbol last changed (main or delta file), or None without features
+    """
+    times = [path.stat().st_mtime for path in (feature_path(symbol), delta_path(symbol)) if path.exists()]
+    return datetime.fromtimestamp(max(times)) if times else None
+
+
+def snapshot_path(symbol: str, feature_dir: Path = FEATURE_CACHE_DIR) -> Path:
+    """
+    Path of the latest-snapshot sidecar: the last feature row of a symbol, as a small JSON record
+    """
+    return feature_dir / f"{symbol}_features.snapshot.json"
+
+
+def load_feature_snapshot(symbol: str) -> Dict[str, Any]:
+    """
+    Latest feature row of a symbol ({'timestamp', 'feature_version', 'values'}), or {} without one.
+
+    Served from the process-wide frame cache while the file is unchanged, so
+    repeated reads cost one stat(); the dict is shared and must not be modified.
+    """
+    path = snapshot_path(symbol)
+    try:
+        snapshot = frame_cache.get(('feature_snapshot', symbol), path, lambda: read_json_record(path)[1])
+    except (CorruptRecordError, ValueError, OSError) as e:
+        logger.warning(f"Feature snapshot for {symbol} is unreadable ({e}); removing it")
+        path.unlink(missing_ok=True)
+        return {}
+    return snapshot or {}
+
+
+def price_checksum(df: pd.DataFrame, rows: Optional[int] = None) -> int:
+    """
+    CRC32 of the timestamps and OHLCV values of the first `rows` price bars (all by default)
+    """
+    prefix = df.iloc[:len(df) if rows is None else rows]
+    checksum = zlib.crc32(pd.DatetimeIndex(prefix.index).asi8.tobytes())
+    for col in PRICE_CHECKSUM_COLUMNS:
+        if col in prefix.columns:
+            checksum = zlib.crc32(prefix[col].to_numpy(dtype=np.float64).tobytes(), checksum)
+    return checksum
+
+
 class FeatureEngineer:
     """
     Feature engineering class that calculates technical indicators
     """
-    def __init__(self):
-        # Import pandas_ta if available, otherwise use basic indicators
-        try:
-            try:
-                import pandas_ta as ta
-            except ImportError:
-                import pandas_ta_classic as ta
-            self.ta_available = True
-            self.ta = ta
-        except ImportError:
-            self.ta_available = False
-            logger.warning("pandas_ta not available, using basic indicators only")
+    def __init__(self, compact: Optional[bool] = None):
+        # float32/int8 feature frames (see core.ml.compact); COMPACT_DTYPES by default
+        self.compact = COMPACT_DTYPES if compact is None else compact
+    
+    @property
+    def ta(self):
+        """
+        pandas_ta (or pandas_ta_classic), imported once per process on first access; None without it
+        """
+        return ta_backend()
+    
+    @property
+    def ta_available(self) -> bool:
+        return ta_backend() is not None
     
     def calculate_all_features(self, df: pd.DataFrame, symbol: str) -> pd.DataFrame:
         """
         Calculate 50+ technical indicators
         """
-        logger.info(f"Calculating features for {symbol} (rows: {len(df)})")
-        
+        logger.info(f"Calculating features for {symbol} (rows: {0 if df is None else len(df)})")
+        features_df, _ = self._calculate(df, symbol)
+        if not features_df.empty:
+            logger.info(f"Calculated {len(features_df.columns)} features for {symbol}")
+        return features_df
+    
+    def calculate_features(self, df: pd.DataFrame, symbol: str, columns: List[str]) -> pd.DataFrame:
+        """
+        Only the requested columns (indicators and price fields), computing just their dependencies
+        """
         if df is None or df.empty:
             logger.error(f"Empty dataframe for {symbol}, cannot calculate features")
             return pd.DataFrame()
+        plan = plan_for(columns)
+        values = plan.compute(df)
+        selected = pd.DataFrame({name: values[name] if name in values else df[name] for name in columns},
+                                index=df.index).dropna()
+        return compact_frame(selected) if self.compact else selected
+    
+    def update_features(self, df: pd.DataFrame, symbol: str) -> Dict[str, Any]:
+        """
+        Bring the cached features of a symbol up to date with its price history.
+
+        When the cached features were computed from the same history up to some
+        bar, only the bars after it are computed (from the indicator state
+        saved with the features plus FEATURE_WARMUP_ROWS bars of history) and
+        appended. Otherwise, e.g. after a corporate-action re-adjustment or a
+        restated bar anywhere in that history, all features are recalculated. Returns the mode ('current', 'incremental'
+        or 'full') and the number of feature rows added.
+        """
+        header = self.load_feature_header(symbol)
+        state = header.get('incremental_state') if header.get('feature_version') == FEATURE_VERSION else None
+        start = self._resume_position(df, state)
+        
+        if start is not None and start == len(df):
+            return {'mode': 'current', 'rows_added': 0, 'rows': header.get('rows', 0),
+                    'total_features': header.get('total_features', 0)}
+        
+        if start is not None:
+            window_start = max(0, start - FEATURE_WARMUP_ROWS)
+            new_rows, new_state = self._calculate(df.iloc[window_start:], symbol, state, start - window_start)
+            if new_state is not None:
+                new_state['price_checksum'] = price_checksum(df)
+            if new_state is not None and list(new_rows.columns) == header.get('feature_columns'):
+                rows = self._append_features(new_rows, symbol, new_state)
+                if rows is not None:
+                    logger.info(f"Extended features for {symbol} by {len(new_rows)} rows "
+                                f"(computed {len(df) - window_start} of {len(df)} bars)")
+                    return {'mode': 'incremental', 'rows_added': len(new_rows), 'rows': rows,
+                            'total_features': len(new_rows.columns)}
+        
+        features_df, state = self._calculate(df, symbol)
+        if state is not None:
+            state['price_checksum'] = price_checksum(df)
+        self.save_features(features_df, symbol, state)
+        return {'mode': 'full', 'rows_added': len(features_df), 'rows': len(features_df),
+                'total_features': len(features_df.columns)}
+    
+    def _resume_position(self, df: pd.DataFrame, state: Optional[Dict[str, Any]]) -> Optional[int]:
+        """
+        Number of leading price rows the saved indicator state already covers,
+        or None if `df` is not the history it was computed from
+        """
+        if not state or df is None:
+            return None
+        rows = state.get('history_rows', 0)
+        if rows < 1 or rows > len(df) or df.index[rows - 1].isoformat() != state.get('last_timestamp'):
+            return None
+        if float(df['Close'].iloc[rows - 1]) != state.get('last_close'):
+            return None
+        # Any earlier bar may have been restated as well
+        if state.get('price_checksum') != price_checksum(df, rows):
+            return None
+        return rows
+    
+    def _calculate(self, df: pd.DataFrame, symbol: str, state: Optional[Dict[str, Any]] = None,
+                   start: int = 0) -> Tuple[pd.DataFrame, Optional[Dict[str, Any]]]:
+        """
+        Feature rows for df.iloc[start:] and the indicator state after the last row.
+
+        With `state` (the state after df.iloc[start - 1]), the rows before
+        `start` only fill the rolling windows; exponential averages and OBV
+        continue from the state.
+        """
+        if df is None or df.empty:
+            logger.error(f"Empty dataframe for {symbol}, cannot calculate features")
+            return pd.DataFrame(), None
         
         # Make a copy to avoid modifying the original
         features_df = df.copy()
@@ -55,126 +230,260 @@ class FeatureEngineer:
         for col in required_cols:
             if col not in features_df.columns:
                 logger.error(f"Required column {col} missing from data")
-                return pd.DataFrame()
-        
-        # Price-based features
-        features_df['daily_return'] = features_df['Close'].pct_change()
-        features_df['daily_return_ma_5'] = features_df['daily_return'].rolling(window=5).mean()
-        
-        # Simple Moving Averages
-        for period in [5, 10, 20, 50, 100, 200]:
-            features_df[f'SMA_{period}'] = features_df['Close'].rolling(window=period).mean()
-            features_df[f'price_to_sma_{period}'] = features_df['Close'] / features_df[f'SMA_{period}']
-        
-        # Exponential Moving Averages
-        features_df['EMA_12'] = features_df['Close'].ewm(span=12).mean()
-        features_df['EMA_26'] = features_df['Close'].ewm(span=26).mean()
-        
-        # Volatility indicators
-        features_df['STD_20'] = features_df['Close'].rolling(window=20).std()
-        features_df['volatility_20'] = features_df['daily_return'].rolling(window=20).std() * np.sqrt(252)  # Annualized
-        
-        # Bollinger Bands
-        bb_middle = features_df['Close'].rolling(window=20).mean()
-        bb_std = features_df['Close'].rolling(window=20).std()
-        features_df['BB_middle'] = bb_middle
-        features_df['BB_upper'] = bb_middle + (bb_std * 2)
-        features_df['BB_lower'] = bb_middle - (bb_std * 2)
-        features_df['BB_width'] = features_df['BB_upper'] - features_df['BB_lower']
-        features_df['BB_pct'] = (features_df['Close'] - features_df['BB_lower']) / (features_df['BB_upper'] - features_df['BB_lower'])
+                return pd.DataFrame(), None
         
-        # RSI (Relative Strength Index)
-        delta = features_df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        features_df['RSI_14'] = 100 - (100 / (1 + rs))
+        # Every registered feature column, each shared intermediate computed once
+        plan = plan_for()
+        values = plan.compute(features_df, IndicatorContext(state, start))
+        features_df = pd.concat([features_df.drop(columns=plan.columns, errors='ignore'),
+                                 pd.DataFrame({name: values[name] for name in plan.columns})], axis=1)
         
-        # MACD
-        exp1 = features_df['Close'].ewm(span=12).mean()
-        exp2 = features_df['Close'].ewm(span=26).mean()
-        features_df['MACD'] = exp1 - exp2
-        features_df['MACD_signal'] = features_df['MACD'].ewm(span=9).mean()
-        features_df['MACD_hist'] = features_df['MACD'] - features_df['MACD_signal']
-        
-        # Volume indicators
-        features_df['Volume_SMA_20'] = features_df['Volume'].rolling(window=20).mean()
-        features_df['volume_ratio'] = features_df['Volume'] / features_df['Volume_SMA_20']
-        features_df['OBV'] = self._calculate_obv(features_df)
-        
-        # High/Low based indicators
-        features_df['ATR'] = self._calculate_atr(features_df)
-        
-        # Simple pattern recognition
-        features_df['higher_high'] = (features_df['High'] > features_df['High'].shift(1)).astype(int)
-        features_df['lower_low'] = (features_df['Low'] < features_df['Low'].shift(1)).astype(int)
-        
-        # Price position in range
-        features_df['price_position'] = (features_df['Close'] - features_df['Low'].rolling(window=50).min()) / \
-                                       (features_df['High'].rolling(window=50).max() - features_df['Low'].rolling(window=50).min())
+        new_state = self._indicator_state(features_df, state, start)
         
         # Remove rows with NaN values (typically from rolling calculations)
-        features_df = features_df.dropna()
-        
-        logger.info(f"Calculated {len(features_df.columns)} features for {symbol}")
-        return features_df
+        features_df = features_df.iloc[start:].dropna()
+        if self.compact:
+            # The state above keeps full precision, so incremental updates do not drift
+            features_df = compact_frame(features_df)
+        return features_df, new_state
+    
+    def _indicator_state(self, features_df: pd.DataFrame, state: Optional[Dict[str, Any]],
+                         start: int) -> Dict[str, Any]:
+        """
+        State after the last row of `features_df` for continuing EWMs and OBV incrementally
+        """
+        ewm = {}
+        for column, (source, span) in EWM_FEATURES.items():
+            beta = 1 - 2 / (span + 1)
+            observed = np.flatnonzero(features_df[source].iloc[start:].notna().to_numpy())
+            # Weight of the adjusted EWM: sum of beta^age over observed inputs
+            rows = len(features_df) - start
+            weight = float(np.sum(beta ** (rows - 1 - observed)))
+            if state:
+                weight += state['ewm'][column][1] * beta ** rows
+            ewm[column] = [float(features_df[column].iloc[-1]), weight]
+        return {
+            'history_rows': (state['history_rows'] if state else 0) + len(features_df) - start,
+            'last_timestamp': features_df.index[-1].isoformat(),
+            'last_close': float(features_df['Close'].iloc[-1]),
+            'ewm': ewm,
+            'obv': features_df['OBV'].iloc[-1].item()
+        }
     
     def _calculate_obv(self, df: pd.DataFrame) -> pd.Series:
         """
         Calculate On-Balance Volume
         """
-        obv = [0]
-        for i in range(1, len(df)):
-            if df['Close'].iloc[i] > df['Close'].iloc[i-1]:
-                obv.append(obv[-1] + df['Volume'].iloc[i])
-            elif df['Close'].iloc[i] < df['Close'].iloc[i-1]:
-                obv.append(obv[-1] - df['Volume'].iloc[i])
-            else:
-                obv.append(obv[-1])
-        return pd.Series(obv, index=df.index)
+        return on_balance_volume(df['Close'], df['Volume'])
     
-    def _calculate_atr(self, df: pd.DataFrame) -> pd.Series:
+    def _append_features(self, new_rows: pd.DataFrame, symbol: str, state: Dict[str, Any]) -> Optional[int]:
         """
-        Calculate Average True Range
+        Append feature rows to the delta file, or merge everything into the main
+        file once the delta is full. Returns the total number of feature rows,
+        or None when there are no stored features to append to.
         """
-        high_low = df['High'] - df['Low']
-        high_close = np.abs(df['High'] - df['Close'].shift())
-        low_close = np.abs(df['Low'] - df['Close'].shift())
-        true_range = np.maximum(high_low, np.maximum(high_close, low_close))
-        return true_range.rolling(window=14).mean()
+        base = self._base_header(symbol)
+        if not base:
+            return None
+        delta = self._load_delta(symbol, base)
+        if delta is not None and len(delta):
+            new_rows = pd.concat([delta, new_rows])
+        
+        if not PARQUET_AVAILABLE or len(new_rows) >= FEATURE_DELTA_MAX_ROWS:
+            existing = self._load_base_frame(symbol)
+            if existing is None:
+                return None
+            features_df = pd.concat([existing, new_rows])
+            self.save_features(features_df, symbol, state)
+            return len(features_df)
+        
+        # Only the rows since the main file was written are rewritten
+        fields = dict(self._feature_fields(new_rows, state), base_written_at=base.get('written_at'))
+        write_feature_frame(new_rows, delta_path(symbol), fields)
+        rows = base.get('rows', 0) + len(new_rows)
+        self._save_snapshot(new_rows, symbol, rows)
+        return rows
+    
+    def _feature_fields(self, features_df: pd.DataFrame, state: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        # Feature version metadata lives in the file's record header
+        return {
+            'feature_version': FEATURE_VERSION,
+            'feature_columns': [str(col) for col in features_df.columns],
+            'total_features': len(features_df.columns),
+            'calculated_at': datetime.now().isoformat(),
+            'incremental_state': state
+        }
     
-    def save_features(self, features_df: pd.DataFrame, symbol: str):
+    def save_features(self, features_df: pd.DataFrame, symbol: str, state: Optional[Dict[str, Any]] = None):
         """
-        Save calculated features to cache
+        Save calculated features to cache, with the indicator state to extend them from
         """
         if features_df is None or features_df.empty:
             logger.error(f"Cannot save empty features for {symbol}")
             return
         
-        features_path = FEATURE_CACHE_DIR / f"{symbol}_features.json"
-        
-        # Convert DataFrame to dict for JSON serialization
-        # Reset index to avoid Timestamp keys in JSON
-        features_for_json = features_df.reset_index(drop=True)
-        features_dict = {
-            'features': features_for_json.to_dict(orient='list'),
-            'calculated_at': datetime.now().isoformat(),
-            'total_features': len(features_df.columns),
-            'rows': len(features_df)
-        }
+        features_path = feature_path(symbol)
+        fields = self._feature_fields(features_df, state)
         
-        with open(features_path, 'w') as f:
-            json.dump(features_dict, f, default=str, indent=2)
+        # Atomic writes with a record header, so readers never see a torn file
+        if PARQUET_AVAILABLE:
+            write_feature_frame(features_df, features_path, fields)
+            # The main file now holds every row (a stale delta is ignored by readers until then)
+            delta_path(symbol).unlink(missing_ok=True)
+            legacy_feature_path(symbol).unlink(missing_ok=True)
+        else:
+            features_dict = {
+                'index': [ts.isoformat() for ts in pd.DatetimeIndex(features_df.index)],
+                'features': features_df.reset_index(drop=True).to_dict(orient='list')
+            }
+            write_json_record(features_dict, features_path, 'features', dict(frame_summary(features_df), **fields))
+        self._save_snapshot(features_df, symbol)
         
         logger.info(f"Saved {len(features_df.columns)} features for {symbol} to {features_path}")
     
+    def _save_snapshot(self, features_df: pd.DataFrame, symbol: str, rows: Optional[int] = None):
+        """
+        Replace the latest-snapshot sidecar with the last row of `features_df` (atomically)
+        """
+        last = features_df.iloc[-1]
+        snapshot = {
+            'timestamp': pd.Timestamp(features_df.index[-1]).isoformat(),
+            'feature_version': FEATURE_VERSION,
+            'rows': len(features_df) if rows is None else rows,
+            'values': {str(col): (value.item() if hasattr(value, 'item') else value) for col, value in last.items()}
+        }
+        write_json_record(snapshot, snapshot_path(symbol), 'feature_snapshot')
+    
+    def load_feature_header(self, symbol: str) -> Dict[str, Any]:
+        """
+        Record header of the cached features (rows, first/last timestamp, feature
+        version and columns, indicator state) without reading any rows.
+
+        Returns {} when there are no cached features. Rows appended in the
+        delta file are included, and its indicator state is the current one.
+        """
+        base = self._base_header(symbol)
+        delta = self._delta_header(symbol, base)
+        if not delta:
+            return base
+        header = dict(delta)
+        header.pop('checksums', None)
+        header.pop('base_written_at', None)
+        header['rows'] = base.get('rows', 0) + delta.get('rows', 0)
+        header['first_timestamp'] = base.get('first_timestamp')
+        return header
+    
+    def _base_header(self, symbol: str) -> Dict[str, Any]:
+        return self._read_header(('feature_header', symbol), feature_path(symbol))
+    
+    def _delta_header(self, symbol: str, base: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Header of the delta file, or {} without one or when it extends an older main file
+        """
+        if not base or not PARQUET_AVAILABLE:
+            return {}
+        header = self._read_header(('feature_delta_header', symbol), delta_path(symbol))
+        return header if header and header.get('base_written_at') == base.get('written_at') else {}
+    
+    def _read_header(self, key: Tuple[str, str], path: Path) -> Dict[str, Any]:
+        if not path.exists():
+            return {}
+        try:
+            header = frame_cache.get(key, path, lambda: read_record_header(path))
+            return dict(header or {})
+        except CorruptRecordError as e:
+            logger.warning(f"{e}; removing it")
+            path.unlink(missing_ok=True)
+            return {}
+    
+    def load_feature_frame(self, symbol: str, columns: Optional[List[str]] = None,
+                           tail: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """
+        Load cached features indexed by date; only `columns` (default all) and
+        the last `tail` rows (default all) are read from disk.
+
+        The frame is shared through the process-wide frame cache and must not
+        be modified by callers.
+        """
+        features_path = feature_path(symbol)
+        base = self._base_header(symbol) if features_path.exists() else {}
+        if not self._delta_header(symbol, base):
+            features = self._load_base_frame(symbol, columns, tail)
+        else:
+            # Main file plus delta, cached under the delta file's version and the main file's
+            key = ('features', symbol, tuple(columns) if columns is not None else None, tail, self.compact,
+                   file_version(features_path))
+            features = frame_cache.get(key, delta_path(symbol),
+                                       lambda: self._merge_delta(symbol, base, columns, tail))
+            if features is None:
+                # The delta was merged into the main file in the meantime
+                features = self._load_base_frame(symbol, columns, tail)
+        if features is not None:
+            cache_manager.touch(features_path)
+        return features
+    
+    def _load_base_frame(self, symbol: str, columns: Optional[List[str]] = None,
+                         tail: Optional[int] = None) -> Optional[pd.DataFrame]:
+        features_path = feature_path(symbol)
+        key = ('features', symbol, tuple(columns) if columns is not None else None, tail, self.compact)
+        return frame_cache.get(key, features_path, lambda: self._read_features(features_path, columns, tail))
+    
+    def _load_delta(self, symbol: str, base: Dict[str, Any],
+                    columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        if not self._delta_header(symbol, base):
+            return None
+        path = delta_path(symbol)
+        key = ('features_delta', symbol, tuple(columns) if columns is not None else None, self.compact)
+        return frame_cache.get(key, path, lambda: self._read_features(path, columns, None))
+    
+    def _merge_delta(self, symbol: str, base: Dict[str, Any], columns: Optional[List[str]],
+                     tail: Optional[int]) -> Optional[pd.DataFrame]:
+        delta = self._load_delta(symbol, base, columns)
+        if delta is None:
+            return self._load_base_frame(symbol, columns, tail)
+        if tail is not None and len(delta) >= tail:
+            return delta.iloc[len(delta) - tail:]
+        existing = self._load_base_frame(symbol, columns, None if tail is None else tail - len(delta))
+        if existing is None:
+            return None
+        return pd.concat([existing, delta])
+    
     def load_features(self, symbol: str) -> Dict[str, Any]:
         """
-        Load previously calculated features
+        Load previously calculated features as {'features': {column: values}, ...}
+
+        Kept for callers of the original JSON layout; prefer load_feature_frame,
+        which can read selected columns and rows only.
         """
-        features_path = FEATURE_CACHE_DIR / f"{symbol}_features.json"
-        if features_path.exists():
-            with open(features_path, 'r') as f:
-                data = json.load(f)
-            return data
-        return None
+        features_df = self.load_feature_frame(symbol)
+        if features_df is None:
+            return None
+        header = self.load_feature_header(symbol)
+        return {
+            'features': features_df.reset_index(drop=True).to_dict(orient='list'),
+            'calculated_at': header.get('calculated_at'),
+            'total_features': len(features_df.columns),
+            'rows': len(features_df)
+        }
+    
+    def _read_features(self, features_path: Path, columns: Optional[List[str]] = None,
+                       tail: Optional[int] = None) -> Optional[pd.DataFrame]:
+        if not features_path.exists():
+            return None
+        try:
+            if features_path.suffix == '.parquet':
+                features_df = read_feature_frame(features_path, columns=columns, tail=tail)
+                # Files written with float64 columns are compacted on read
+                return compact_frame(features_df) if self.compact else features_df
+            _, data = read_json_record(features_path)
+        except CorruptRecordError as e:
+            logger.warning(f"{e}; removing it")
+            features_path.unlink(missing_ok=True)
+            return None
+        # JSON fallback (no pyarrow)
+        features_df = pd.DataFrame(data['features'], index=pd.DatetimeIndex(data['index'], name='Date'))
+        if columns is not None:
+            features_df = features_df[columns]
+        if self.compact:
+            features_df = compact_frame(features_df)
+        return features_df if tail is None else features_df.iloc[max(0, len(features_df) - tail):]
@@ -0,0 +1,154 @@
+"""
+This module provides the process-wide in-memory cache for parsed price and feature data.
+
+Entries are keyed by (kind, symbol) and remember the version of the file they
+were parsed from (inode, mtime and size). A lookup costs one `stat` call: if
+the file is unchanged the parsed object is served from memory, otherwise it is
+re-read. Total memory is bounded and the least recently used entries are
+evicted first.
+"""
+import logging
+import os
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Callable, Hashable, Optional, Tuple
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Memory budget for parsed frames held by the process
+FRAME_CACHE_MAX_MB = int(os.getenv('FRAME_CACHE_MAX_MB', '256'))
+
+
+def file_version(path: Path) -> Optional[Tuple[int, int, int]]:
+    """
+    Version key of a file: (inode, mtime in ns, size), or None if it does not exist.
+
+    Atomic temp-file renames change the inode, so a rewrite is detected even
+    when it lands within the filesystem's mtime resolution.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Approximate the memory held by a cached value, in bytes
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(value, pd.DataFrame) else int(usage)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class FrameCache:
+    """
+    Memory-bounded LRU cache of parsed objects, invalidated by file version.
+
+    Cached objects are shared between callers and must be treated as read-only;
+    callers that hand frames out for modification should copy them.
+    """
+    def __init__(self, max_bytes: int = FRAME_CACHE_MAX_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (version, value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, path: Path, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for `key` if `path` is unchanged, else `loader()`.
+
+        A loader result of None is returned but not cached.
+        """
+        version = file_version(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if version is not None and entry[0] == version:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                self._remove(key)
+                self.invalidations += 1
+            self.misses += 1
+
+        if version is None:
+            return None
+
+        value = loader()
+        if value is not None:
+            # Only cache if the file did not change while it was being read
+            if file_version(path) == version:
+                self.put(key, version, value)
+        return value
+
+    def put(self, key: Hashable, version: Tuple[int, int, int], value: Any):
+        """
+        Store a value parsed from the file at `version`, evicting LRU entries as needed
+        """
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            logger.debug(f"Not caching {key}: {size} bytes exceeds the {self.max_bytes} byte budget")
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (version, value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        """
+        Drop a key, e.g. after its backing file was rewritten
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hit/miss/eviction counters and current memory use
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _remove(self, key: Hashable):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+# Shared by every ingester and feature engineer in the process
+frame_cache = FrameCache()
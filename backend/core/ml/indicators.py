@@ -0,0 +1,424 @@
+"""
+This module declares the technical indicators of FeatureEngineer in a registry with explicit dependencies.
+
+Every indicator names its inputs (price fields or other indicators) and a
+function computing it from them. Inputs must be registered before the
+indicators that use them, so registration order is a topological order of
+the dependency graph and cycles cannot be declared. An IndicatorPlan
+resolves the columns a consumer asks for to their dependency closure and
+computes it in that order, each node once: intermediates shared by several
+indicators (the 20-bar mean and deviation behind SMA_20, STD_20 and the
+Bollinger bands, the 12/26-bar EMAs behind MACD, the 50-bar range behind
+price_position) are computed a single time, and indicators outside the
+closure are not computed at all.
+"""
+import importlib
+import json
+import logging
+import subprocess
+import sys
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
+import pandas as pd
+import numpy as np
+
+from .primitives import EMA, SMA_PERIODS
+
+logger = logging.getLogger(__name__)
+
+PRICE_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+# Optional third-party indicator libraries, tried in order
+TA_BACKENDS = ['pandas_ta', 'pandas_ta_classic']
+
+# Imported on first use and kept for the process (also when none is installed)
+_backend = {}
+_backend_lock = threading.Lock()
+# Import cost of the backend measured in a child interpreter (see measure_backend_import)
+_measured = {}
+
+
+def ta_backend():
+    """
+    The pandas_ta module (or pandas_ta_classic), or None when neither is installed.
+
+    The import pulls in a large dependency tree, so it happens once per process
+    and only when something needs the library; its cost is kept for backend_stats().
+    """
+    with _backend_lock:
+        if 'module' not in _backend:
+            started = time.perf_counter()
+            module, name = None, None
+            for candidate in TA_BACKENDS:
+                try:
+                    module, name = importlib.import_module(candidate), candidate
+                    break
+                except ImportError:
+                    continue
+            _backend.update(module=module, name=name, import_seconds=time.perf_counter() - started)
+            if module is None:
+                logger.warning("pandas_ta not available, using basic indicators only")
+            else:
+                logger.info(f"Loaded indicator backend {name} in {_backend['import_seconds']:.3f}s")
+        return _backend['module']
+
+
+# Run by measure_backend_import in a child interpreter, with TA_BACKENDS as arguments
+_MEASURE_SCRIPT = """
+import importlib, json, sys, time
+started = time.perf_counter()
+for name in sys.argv[1:]:
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        continue
+    break
+else:
+    name = None
+print(json.dumps({'backend': name, 'import_seconds': time.perf_counter() - started}))
+"""
+
+
+def measure_backend_import():
+    """
+    Time the backend import in a child interpreter, on a background thread, once per process.
+
+    No registered indicator uses the backend, so this process may never import
+    it; the measurement tells what a first use would cost without paying it here.
+    """
+    with _backend_lock:
+        if _measured:
+            return
+        _measured['state'] = 'running'
+    threading.Thread(target=_measure_import, name='ta-import-measure', daemon=True).start()
+
+
+def _measure_import():
+    try:
+        completed = subprocess.run([sys.executable, '-c', _MEASURE_SCRIPT, *TA_BACKENDS],
+                                   capture_output=True, text=True, timeout=120, check=True)
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        result['import_seconds'] = round(result['import_seconds'], 4)
+    except (OSError, subprocess.SubprocessError, ValueError, IndexError) as e:
+        logger.warning(f"Could not measure the indicator backend import: {e}")
+        result = {'backend': None, 'import_seconds': None, 'error': str(e)}
+    with _backend_lock:
+        _measured.update(result, state='done')
+
+
+def backend_stats() -> Dict[str, Any]:
+    """
+    Whether the optional indicator backend was loaded, which one, and what its import
+    cost; `measured_import` is the cost measured in a child interpreter, if any
+    """
+    with _backend_lock:
+        measured = dict(_measured) or None
+        if 'module' not in _backend:
+            return {'loaded': False, 'backend': None, 'available': None, 'import_seconds': None,
+                    'measured_import': measured}
+        return {
+            'loaded': True,
+            'backend': _backend['name'],
+            'available': _backend['module'] is not None,
+            'import_seconds': round(_backend['import_seconds'], 4),
+            'measured_import': measured
+        }
+
+
+class Indicator:
+    """
+    A registered indicator: its inputs, how to compute it and whether it is a feature column
+    """
+    def __init__(self, name: str, inputs: List[str], compute: Callable[..., pd.Series],
+                 span: Optional[int] = None, output: bool = True):
+        self.name = name
+        self.inputs = inputs
+        self.compute = compute
+        # Span of an exponential average (its state is carried across incremental updates)
+        self.span = span
+        # False for intermediates that are shared by indicators but not stored as features
+        self.output = output
+
+
+# Name -> Indicator, in registration (= dependency) order
+REGISTRY: Dict[str, Indicator] = {}
+
+
+def register(name: str, inputs: List[str], span: Optional[int] = None, output: bool = True):
+    """
+    Decorator registering `compute(context, *inputs)` as indicator `name`
+    """
+    def decorator(compute: Callable[..., pd.Series]) -> Callable[..., pd.Series]:
+        if name in REGISTRY or name in PRICE_FIELDS:
+            raise ValueError(f"Indicator {name} is already registered")
+        unknown = [source for source in inputs if source not in REGISTRY and source not in PRICE_FIELDS]
+        if unknown:
+            raise ValueError(f"Indicator {name} depends on unregistered input(s): {', '.join(unknown)}")
+        REGISTRY[name] = Indicator(name, list(inputs), compute, span, output)
+        return compute
+    return decorator
+
+
+class IndicatorContext:
+    """
+    Incremental state an indicator computation continues from (see FeatureEngineer._calculate)
+    """
+    def __init__(self, state: Optional[Dict[str, Any]] = None, start: int = 0):
+        self.state = state
+        self.start = start
+
+    @property
+    def ta(self):
+        """
+        Optional indicator library for indicators built on it (loaded on first access)
+        """
+        return ta_backend()
+
+    def ewm(self, series: pd.Series, name: str) -> pd.Series:
+        """
+        Exponential moving average (pandas ewm(span).mean()), continued from the
+        saved [average, weight] of `name` for the rows from `start` on
+        """
+        span = REGISTRY[name].span
+        seed = self.state['ewm'].get(name) if self.state else None
+        if seed is None:
+            return series.ewm(span=span).mean()
+        # Same recurrence as pandas' adjusted EWM, over the new rows only
+        ema = EMA(span, *seed)
+        values = series.to_numpy(dtype=np.float64)
+        result = np.full(len(values), np.nan)
+        for i in range(self.start, len(values)):
+            result[i] = ema.update(values[i])
+        return pd.Series(result, index=series.index)
+
+
+def on_balance_volume(close: pd.Series, volume: pd.Series) -> pd.Series:
+    """
+    On-Balance Volume from the start of the series
+    """
+    # Signed volume (+ on up closes, - on down closes, 0 when unchanged), accumulated
+    close_values = close.to_numpy()
+    volume_values = volume.to_numpy()
+    change = np.diff(close_values, prepend=close_values[:1])
+    signed = np.where(change > 0, volume_values, np.where(change < 0, -volume_values, 0))
+    return pd.Series(np.cumsum(signed), index=close.index)
+
+
+# Price-based features
+@register('daily_return', ['Close'])
+def _daily_return(context, close):
+    return close.pct_change()
+
+
+@register('daily_return_ma_5', ['daily_return'])
+def _daily_return_ma_5(context, daily_return):
+    return daily_return.rolling(window=5).mean()
+
+
+# Simple Moving Averages
+def _register_sma(period: int):
+    @register(f'SMA_{period}', ['Close'])
+    def _sma(context, close):
+        return close.rolling(window=period).mean()
+
+    @register(f'price_to_sma_{period}', ['Close', f'SMA_{period}'])
+    def _price_to_sma(context, close, sma):
+        return close / sma
+
+
+for _period in SMA_PERIODS:
+    _register_sma(_period)
+
+
+# Exponential Moving Averages
+@register('EMA_12', ['Close'], span=12)
+def _ema_12(context, close):
+    return context.ewm(close, 'EMA_12')
+
+
+@register('EMA_26', ['Close'], span=26)
+def _ema_26(context, close):
+    return context.ewm(close, 'EMA_26')
+
+
+# Volatility indicators
+@register('STD_20', ['Close'])
+def _std_20(context, close):
+    return close.rolling(window=20).std()
+
+
+@register('volatility_20', ['daily_return'])
+def _volatility_20(context, daily_return):
+    return daily_return.rolling(window=20).std() * np.sqrt(252)  # Annualized
+
+
+# Bollinger Bands (middle band = SMA_20, width from STD_20)
+@register('BB_middle', ['SMA_20'])
+def _bb_middle(context, sma_20):
+    return sma_20
+
+
+@register('BB_upper', ['BB_middle', 'STD_20'])
+def _bb_upper(context, bb_middle, std_20):
+    return bb_middle + (std_20 * 2)
+
+
+@register('BB_lower', ['BB_middle', 'STD_20'])
+def _bb_lower(context, bb_middle, std_20):
+    return bb_middle - (std_20 * 2)
+
+
+@register('BB_width', ['BB_upper', 'BB_lower'])
+def _bb_width(context, bb_upper, bb_lower):
+    return bb_upper - bb_lower
+
+
+@register('BB_pct', ['Close', 'BB_upper', 'BB_lower'])
+def _bb_pct(context, close, bb_upper, bb_lower):
+    return (close - bb_lower) / (bb_upper - bb_lower)
+
+
+# RSI (Relative Strength Index)
+@register('close_delta', ['Close'], output=False)
+def _close_delta(context, close):
+    return close.diff()
+
+
+@register('RSI_14', ['close_delta'])
+def _rsi_14(context, delta):
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+
+# MACD
+@register('MACD', ['EMA_12', 'EMA_26'])
+def _macd(context, ema_12, ema_26):
+    return ema_12 - ema_26
+
+
+@register('MACD_signal', ['MACD'], span=9)
+def _macd_signal(context, macd):
+    return context.ewm(macd, 'MACD_signal')
+
+
+@register('MACD_hist', ['MACD', 'MACD_signal'])
+def _macd_hist(context, macd, macd_signal):
+    return macd - macd_signal
+
+
+# Volume indicators
+@register('Volume_SMA_20', ['Volume'])
+def _volume_sma_20(context, volume):
+    return volume.rolling(window=20).mean()
+
+
+@register('volume_ratio', ['Volume', 'Volume_SMA_20'])
+def _volume_ratio(context, volume, volume_sma_20):
+    return volume / volume_sma_20
+
+
+@register('OBV', ['Close', 'Volume'])
+def _obv(context, close, volume):
+    obv = on_balance_volume(close, volume)
+    if context.state:
+        # Continue the running total from the last bar the state covers
+        obv += context.state['obv'] - obv.iloc[context.start - 1]
+    return obv
+
+
+# High/Low based indicators
+@register('ATR', ['High', 'Low', 'Close'])
+def _atr(context, high, low, close):
+    high_low = high - low
+    high_close = np.abs(high - close.shift())
+    low_close = np.abs(low - close.shift())
+    true_range = np.maximum(high_low, np.maximum(high_close, low_close))
+    return true_range.rolling(window=14).mean()
+
+
+# Simple pattern recognition
+@register('higher_high', ['High'])
+def _higher_high(context, high):
+    return (high > high.shift(1)).astype(int)
+
+
+@register('lower_low', ['Low'])
+def _lower_low(context, low):
+    return (low < low.shift(1)).astype(int)
+
+
+# Price position in range
+@register('low_min_50', ['Low'], output=False)
+def _low_min_50(context, low):
+    return low.rolling(window=50).min()
+
+
+@register('high_max_50', ['High'], output=False)
+def _high_max_50(context, high):
+    return high.rolling(window=50).max()
+
+
+@register('price_position', ['Close', 'low_min_50', 'high_max_50'])
+def _price_position(context, close, low_min_50, high_max_50):
+    return (close - low_min_50) / (high_max_50 - low_min_50)
+
+
+class IndicatorPlan:
+    """
+    The indicators needed for a set of requested columns, in dependency order
+    """
+    def __init__(self, columns: Optional[Iterable[str]] = None):
+        if columns is None:
+            requested = [name for name, indicator in REGISTRY.items() if indicator.output]
+        else:
+            # Price fields are passed through by the caller, not computed
+            requested = [name for name in columns if name not in PRICE_FIELDS]
+            unknown = [name for name in requested if name not in REGISTRY]
+            if unknown:
+                raise ValueError(f"Unknown indicator(s): {', '.join(unknown)}")
+
+        needed = set()
+        pending = list(requested)
+        while pending:
+            name = pending.pop()
+            if name not in needed:
+                needed.add(name)
+                pending.extend(source for source in REGISTRY[name].inputs if source in REGISTRY)
+        # Registration order is a topological order of the dependencies
+        self.steps = [name for name in REGISTRY if name in needed]
+        self.columns = [name for name in self.steps if name in set(requested)]
+
+    def compute(self, df: pd.DataFrame, context: Optional[IndicatorContext] = None) -> Dict[str, pd.Series]:
+        """
+        Every step of the plan over the price columns of `df` (requested columns and intermediates)
+        """
+        context = context or IndicatorContext()
+        values = {}
+        for name in self.steps:
+            indicator = REGISTRY[name]
+            inputs = [values[source] if source in values else df[source] for source in indicator.inputs]
+            values[name] = indicator.compute(context, *inputs)
+        return values
+
+
+@lru_cache(maxsize=64)
+def _plan(columns: Optional[Tuple[str, ...]]) -> IndicatorPlan:
+    return IndicatorPlan(columns)
+
+
+def plan_for(columns: Optional[Iterable[str]] = None) -> IndicatorPlan:
+    """
+    Cached plan for `columns` (every feature column when None)
+    """
+    return _plan(tuple(columns) if columns is not None else None)
+
+
+def ewm_indicators() -> Dict[str, Tuple[str, int]]:
+    """
+    Exponential averages carried across incremental updates: column -> (input column, span)
+    """
+    return {name: (indicator.inputs[0], indicator.span) for name, indicator in REGISTRY.items()
+            if indicator.span is not None}
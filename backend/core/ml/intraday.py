@@ -0,0 +1,250 @@
+"""
+This module handles intraday bar storage in fixed-size ring buffers.
+
+Each (symbol, timeframe) pair gets one preallocated buffer, so memory stays
+constant however long the server runs. Buffers are mirrored: every bar is
+written at position i and i + capacity, which makes the last N bars one
+contiguous slice that can be returned as a zero-copy view even when the
+ring has wrapped around.
+"""
+import logging
+import threading
+from typing import Dict, Any, Optional, List, Tuple
+import pandas as pd
+import numpy as np
+
+from .streaming import StreamingFeatures
+
+logger = logging.getLogger(__name__)
+
+INTRADAY_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Supported timeframes: bar length, ring capacity (bars kept) and the
+# provider period requested when a buffer is empty (yfinance limits 1m
+# history to 7 days and 5m-30m history to 60 days)
+INTRADAY_TIMEFRAMES = {
+    '1m': {'minutes': 1, 'capacity': 390 * 10, 'backfill_period': '5d'},
+    '5m': {'minutes': 5, 'capacity': 78 * 30, 'backfill_period': '1mo'},
+    '15m': {'minutes': 15, 'capacity': 26 * 60, 'backfill_period': '60d'},
+    '30m': {'minutes': 30, 'capacity': 13 * 60, 'backfill_period': '60d'},
+    '1h': {'minutes': 60, 'capacity': 7 * 250, 'backfill_period': '1y'}
+}
+
+
+def interval_minutes(interval: str) -> int:
+    """
+    Bar length in minutes of an interval string such as '5m' or '1h'
+    """
+    if interval in INTRADAY_TIMEFRAMES:
+        return INTRADAY_TIMEFRAMES[interval]['minutes']
+    if interval.endswith('m') and interval[:-1].isdigit():
+        return int(interval[:-1])
+    if interval.endswith('h') and interval[:-1].isdigit():
+        return int(interval[:-1]) * 60
+    raise ValueError(f"Unsupported intraday interval '{interval}'")
+
+
+class BarRingBuffer:
+    """
+    Preallocated, mirrored ring buffer of OHLCV bars with int64 ns timestamps.
+
+    Appends only accept bars newer than the last stored one; a bar with the
+    same timestamp as the last one replaces it (the still-forming bar).
+    """
+    def __init__(self, capacity: int, fields: List[str] = INTRADAY_FIELDS):
+        self.capacity = capacity
+        self.fields = list(fields)
+        self._timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self._values = np.full((2 * capacity, len(self.fields)), np.nan, dtype=np.float64)
+        self._head = 0  # next write position in [0, capacity)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        return self._timestamps.nbytes + self._values.nbytes
+
+    @property
+    def last_timestamp(self) -> Optional[pd.Timestamp]:
+        if not self._size:
+            return None
+        return pd.Timestamp(int(self._timestamps[self._head - 1 + self.capacity]))
+
+    def append(self, timestamps: np.ndarray, values: np.ndarray) -> int:
+        """
+        Append bars (timestamps in ns, values shaped (n, fields)); returns bars written
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64).reshape(len(timestamps), len(self.fields))
+        if not len(timestamps):
+            return 0
+
+        order = np.argsort(timestamps, kind='stable')
+        timestamps, values = timestamps[order], values[order]
+        # Keep the last bar of any duplicated timestamp
+        keep = np.append(timestamps[1:] != timestamps[:-1], True)
+        timestamps, values = timestamps[keep], values[keep]
+
+        written = 0
+        if self._size:
+            last = self._timestamps[self._head - 1 + self.capacity]
+            same = timestamps == last
+            if same.any():
+                self._write_at((self._head - 1) % self.capacity, values[same][-1:])
+                written += 1
+            newer = timestamps > last
+            timestamps, values = timestamps[newer], values[newer]
+
+        if len(timestamps) > self.capacity:
+            timestamps, values = timestamps[-self.capacity:], values[-self.capacity:]
+        n = len(timestamps)
+        if n:
+            positions = (self._head + np.arange(n)) % self.capacity
+            self._timestamps[positions] = timestamps
+            self._timestamps[positions + self.capacity] = timestamps
+            self._values[positions] = values
+            self._values[positions + self.capacity] = values
+            self._head = int((self._head + n) % self.capacity)
+            self._size = min(self._size + n, self.capacity)
+        return written + n
+
+    def last(self, n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Zero-copy (timestamps, values) views of the last `n` bars (all bars by default).
+
+        The views alias the buffer, so copy them if they must outlive later appends.
+        """
+        n = self._size if n is None else max(0, min(n, self._size))
+        end = self._head + self.capacity
+        timestamps = self._timestamps[end - n:end]
+        values = self._values[end - n:end]
+        timestamps.flags.writeable = False
+        values.flags.writeable = False
+        return timestamps, values
+
+    def frame(self, n: Optional[int] = None) -> pd.DataFrame:
+        """
+        The last `n` bars as a DataFrame backed by the buffer's memory
+        """
+        timestamps, values = self.last(n)
+        index = pd.DatetimeIndex(timestamps.view('datetime64[ns]'), name='Datetime')
+        return pd.DataFrame(values, index=index, columns=self.fields, copy=False)
+
+    def _write_at(self, position: int, values: np.ndarray):
+        self._values[position] = values
+        self._values[position + self.capacity] = values
+
+
+class IntradayStore:
+    """
+    Process-wide set of ring buffers keyed by (symbol, timeframe)
+    """
+    def __init__(self, timeframes: Dict[str, Dict[str, Any]] = INTRADAY_TIMEFRAMES):
+        self.timeframes = timeframes
+        self._buffers = {}
+        # (symbol, timeframe) -> (streaming indicators, ns timestamp of the last bar they consumed)
+        self._indicators = {}
+        self._lock = threading.Lock()
+
+    def buffer(self, symbol: str, timeframe: str) -> BarRingBuffer:
+        if timeframe not in self.timeframes:
+            raise ValueError(f"Unsupported intraday timeframe '{timeframe}'. "
+                             f"Available: {', '.join(self.timeframes)}")
+        key = (symbol, timeframe)
+        with self._lock:
+            if key not in self._buffers:
+                self._buffers[key] = BarRingBuffer(self.timeframes[timeframe]['capacity'])
+            return self._buffers[key]
+
+    def has(self, symbol: str, timeframe: str) -> bool:
+        with self._lock:
+            buffer = self._buffers.get((symbol, timeframe))
+        return buffer is not None and len(buffer) > 0
+
+    def update(self, symbol: str, timeframe: str, df: pd.DataFrame) -> int:
+        """
+        Append a provider frame of intraday bars; returns the number of bars written
+        """
+        if df is None or df.empty:
+            return 0
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            # Exchange-local wall time, consistent with the daily cache
+            index = index.tz_localize(None)
+        values = np.column_stack([
+            pd.to_numeric(df[field], errors='coerce').to_numpy(dtype=np.float64) if field in df.columns
+            else np.full(len(df), np.nan)
+            for field in INTRADAY_FIELDS
+        ])
+        buffer = self.buffer(symbol, timeframe)
+        with self._lock:
+            return buffer.append(index.as_unit('ns').asi8, values)
+
+    def last(self, symbol: str, timeframe: str, n: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """
+        The last `n` bars for a symbol and timeframe, or None when nothing is stored
+        """
+        if not self.has(symbol, timeframe):
+            return None
+        buffer = self.buffer(symbol, timeframe)
+        with self._lock:
+            return buffer.frame(n)
+
+    def indicators(self, symbol: str, timeframe: str) -> Optional[Dict[str, float]]:
+        """
+        Technical indicators as of the latest buffered bar (None when nothing is stored).
+
+        Streaming indicators consume each completed bar once, when first asked
+        after it arrived; the last bar may still be forming, so it is applied
+        to a copy of the state without being consumed.
+        """
+        if not self.has(symbol, timeframe):
+            return None
+        buffer = self.buffer(symbol, timeframe)
+        key = (symbol, timeframe)
+        with self._lock:
+            engine, consumed = self._indicators.get(key, (None, None))
+            if engine is None:
+                engine = StreamingFeatures()
+            timestamps, values = buffer.last()
+            first_new = 0 if consumed is None else int(np.searchsorted(timestamps, consumed, side='right'))
+            for row in values[first_new:-1].tolist():
+                engine.update(*row)
+            if len(timestamps) > 1 and first_new < len(timestamps) - 1:
+                consumed = int(timestamps[-2])
+            self._indicators[key] = (engine, consumed)
+            features = engine.peek(*values[-1].tolist())
+        features['timestamp'] = pd.Timestamp(int(timestamps[-1]))
+        return features
+
+    def latest_close(self, symbol: str) -> Optional[Tuple[float, pd.Timestamp, str]]:
+        """
+        Most recent intraday close across timeframes as (price, bar time, timeframe)
+        """
+        latest = None
+        for timeframe in self.timeframes:
+            if not self.has(symbol, timeframe):
+                continue
+            buffer = self.buffer(symbol, timeframe)
+            with self._lock:
+                timestamps, values = buffer.last(1)
+                bar_time = pd.Timestamp(int(timestamps[0]))
+                close = float(values[0, INTRADAY_FIELDS.index('Close')])
+            if latest is None or bar_time > latest[1]:
+                latest = (close, bar_time, timeframe)
+        return latest
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'buffers': len(self._buffers),
+                'bars': sum(len(buffer) for buffer in self._buffers.values()),
+                'bytes': sum(buffer.nbytes for buffer in self._buffers.values()),
+                'streaming_indicators': len(self._indicators)
+            }
+
+
+# Shared by every ingester in the process
+intraday_store = IntradayStore()
@@ -15,10 +15,48 @@ DATA_DIR = Path("data")
 MODEL_DIR = Path("models")
 LOGS_DIR = DATA_DIR / "logs"
 
+# Feature columns the heuristic prediction reads
+PREDICTION_FEATURES = ['SMA_50', 'RSI_14', 'Close', 'MACD', 'MACD_signal']
+
 # Create directories if they don't exist
 for directory in [MODEL_DIR, LOGS_DIR]:
     directory.mkdir(parents=True, exist_ok=True)
 
+# Ingester for cached price reads, created on first use and shared by every prediction
+_components = {}
+
+
+def _ingester():
+    if 'ingester' not in _components:
+        from core.ml.data import EnhancedDataIngester
+        _components['ingester'] = EnhancedDataIngester()
+    return _components['ingester']
+
+
+def _horizon_feature_values(symbol: str, horizon: str) -> Dict[str, float]:
+    """
+    Last values of PREDICTION_FEATURES computed on the bars of the horizon's
+    resolution (short: weekly, long: monthly), or {} for intraday and when there
+    are too few bars for them. Reused until the resampled bars change.
+    """
+    from core.ml.resample import HORIZON_RESOLUTIONS
+    if HORIZON_RESOLUTIONS.get(horizon, 'daily') == 'daily':
+        return {}
+    bars = _ingester().load_horizon_bars(symbol, horizon)
+    if bars is None or bars.empty:
+        return {}
+    # The resample cache returns the same frame while the daily bars are unchanged
+    computed = _components.setdefault('horizon_values', {})
+    cached = computed.get((symbol, horizon))
+    if cached is not None and cached[0] is bars:
+        return cached[1]
+    from core.ml.features import FeatureEngineer
+    feats = FeatureEngineer(compact=False).calculate_features(bars, symbol, PREDICTION_FEATURES).tail(1)
+    values = {key: float(feats[key].iloc[-1]) for key in PREDICTION_FEATURES} if not feats.empty else {}
+    computed[(symbol, horizon)] = (bars, values)
+    return values
+
+
 def log_prediction_to_file(prediction: Dict[str, Any]):
     """
     Log prediction to file
@@ -77,70 +115,26 @@ def predict_stock_price(symbol: str, horizon: str = "intraday", verbose: bool =
     if verbose:
         logger.info(f"Generating prediction for {symbol} ({horizon}) - Placeholder implementation")
     
+    # Latest feature row, maintained next to the feature store whenever features change
+    from core.ml.features import load_feature_snapshot
+    snapshot = load_feature_snapshot(symbol).get('values', {})
+    
     # Try to get current price from cached data
     current_price = 100.0  # Default fallback
     try:
-        from pathlib import Path
-        import os
-        data_file = Path('data/cache') / f"{symbol}_all_data.json"
-        if data_file.exists():
-            # Check file size to detect corrupted/incomplete files
-            file_size = os.path.getsize(data_file)
-            if file_size < 100:  # Files less than 100 bytes are likely corrupted
-                logger.warning(f"Cache file for {symbol} appears corrupted (only {file_size} bytes), deleting it")
-                os.unlink(data_file)
-            else:
-                with open(data_file, 'r') as f:
-                    data = json.load(f)
-                    # Get the last price from price_history
-                    if 'price_history' in data and data['price_history']:
-                        price_data = data['price_history']
-                        extracted_price = None
-                        
-                        if isinstance(price_data, dict):
-                            # Format 1: orient='list' (column-major) - keys are column names, values are lists
-                            # Example: {"Date": [...], "Open": [...], "Close": [...]}
-                            if 'Close' in price_data and isinstance(price_data['Close'], list):
-                                prices = price_data['Close']
-                                if prices and len(prices) > 0:
-                                    extracted_price = float(prices[-1])
-                                    logger.debug(f"Extracted price from orient='list' format: {extracted_price}")
-                            # Format 2: orient='index' (timestamp keys) - keys are timestamps, values are row dicts
-                            # Example: {"2024-01-01": {"Open": 100, "Close": 101}, ...}
-                            elif not any(isinstance(v, list) for v in price_data.values()):
-                                # All values are NOT lists, so this is likely orient='index'
-                                keys = sorted(price_data.keys())
-                                if keys:
-                                    last_key = keys[-1]
-                                    last_entry = price_data[last_key]
-                                    if isinstance(last_entry, dict):
-                                        for k in ['Close', 'close', 'ClosePrice', 'close_price', 'price']:
-                                            if k in last_entry:
-                                                extracted_price = float(last_entry[k])
-                                                logger.debug(f"Extracted price from orient='index' format: {extracted_price}")
-                                                break
-                        elif isinstance(price_data, list) and len(price_data) > 0:
-                            # Format 3: List of records
-                            # Example: [{"Date": "2024-01-01", "Open": 100, "Close": 101}, ...]
-                            last_entry = price_data[-1]
-                            if isinstance(last_entry, dict):
-                                for k in ['Close', 'close', 'ClosePrice', 'close_price', 'price']:
-                                    if k in last_entry:
-                                        extracted_price = float(last_entry[k])
-                                        logger.debug(f"Extracted price from list-of-records format: {extracted_price}")
-                                        break
-                        
-                        if extracted_price is not None and extracted_price > 0:
-                            current_price = extracted_price
-                        else:
-                            logger.warning(f"Could not extract valid price from cache for {symbol}")
-
-    except json.JSONDecodeError as e:
-        logger.warning(f"Corrupted JSON cache for {symbol}, removing file: {e}")
-        try:
-            os.unlink(data_file)
-        except:
-            pass
+        if snapshot.get('Close'):
+            extracted_price = snapshot['Close']
+        else:
+            # Reads only the Close column of the columnar cache; unreadable files are removed by the ingester
+            extracted_price = _ingester().load_last_close(symbol)
+        if extracted_price is not None and extracted_price > 0:
+            current_price = extracted_price
+        if horizon == 'intraday':
+            # Prefer the latest buffered intraday bar when one has been fetched
+            from core.ml.intraday import intraday_store
+            latest = intraday_store.latest_close(symbol)
+            if latest is not None and latest[0] > 0:
+                current_price = latest[0]
     except Exception as e:
         logger.info(f"Failed to get current price for {symbol}: {e}")
     
@@ -150,19 +144,34 @@ def predict_stock_price(symbol: str, horizon: str = "intraday", verbose: bool =
     confidence = 0.5
     expected_return = 0.0
     reason = "Insufficient data for technical analysis. Holding position."
+    feature_resolution = 'daily'
     
     try:
-        # Load pre-calculated features
-        from core.ml.features import FeatureEngineer
-        engineer = FeatureEngineer()
-        features_data = engineer.load_features(symbol)
+        # Short/long horizons read the features of weekly/monthly bars when there are enough of them
+        last_values = _horizon_feature_values(symbol, horizon)
+        if last_values:
+            from core.ml.resample import HORIZON_RESOLUTIONS
+            feature_resolution = HORIZON_RESOLUTIONS[horizon]
+        else:
+            # Last values of the pre-calculated features, from the snapshot record alone
+            last_values = {key: snapshot[key] for key in PREDICTION_FEATURES if key in snapshot}
+        if len(last_values) < len(PREDICTION_FEATURES):
+            from core.ml.features import FeatureEngineer
+            engineer = FeatureEngineer()
+            # Features saved before snapshots existed: only the last row of these columns is read
+            feats = engineer.load_feature_frame(symbol, columns=PREDICTION_FEATURES, tail=1)
+            if feats is None or feats.empty:
+                # No stored features yet: compute just these columns (and their inputs) from cached prices
+                history = _ingester().load_price_history(symbol)
+                if history is not None and not history.empty:
+                    feats = engineer.calculate_features(history, symbol, PREDICTION_FEATURES).tail(1)
+            if feats is not None and not feats.empty:
+                last_values = {key: float(feats[key].iloc[-1]) for key in PREDICTION_FEATURES if key in feats.columns}
         
-        if features_data and 'features' in features_data:
-            feats = features_data['features']
-            
+        if last_values:
             # Helper to safely get last value
             def get_last(key):
-                return feats[key][-1] if key in feats and feats[key] else None
+                return float(last_values[key]) if key in last_values else None
             
             last_sma50 = get_last('SMA_50')
             last_rsi = get_last('RSI_14')
@@ -271,6 +280,7 @@ def predict_stock_price(symbol: str, horizon: str = "intraday", verbose: bool =
             'short': {'days': 5, 'description': '1 week (Swing trading)'},
             'long': {'days': 30, 'description': '1 month (Position trading)'}
         }.get(horizon, {'days': 1, 'description': 'Unknown'}),
+        'feature_resolution': feature_resolution,
         'has_overfitting_risk': has_overfitting_risk,
         'data_quality': 'sufficient',
         'timestamp': datetime.now().isoformat()
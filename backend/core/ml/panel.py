@@ -0,0 +1,528 @@
+"""
+This module handles the universe-wide panel store for cached price history.
+
+The panel keeps aligned OHLCV for every symbol in one memory-mapped array per
+field, shaped (dates x symbols) in row-major order, so a cross-section (all
+symbols on a range of dates) is one contiguous block. Symbol and date lookups
+are dictionary / binary-search operations and every slice is a view on the
+mapped file, so worker processes reading the same panel share its pages.
+Missing bars (before a listing, after a delisting, holidays of one market)
+are NaN.
+
+`universe_panel` keeps the shared panel in step with the per-symbol price
+cache: the panel records the version of every price file it holds, and
+`refresh` reloads only the requested symbols that are missing from it or
+whose price file has changed since, writing their columns (and any new date
+rows) in place. Refreshes run in the background; the scan reads the panel as
+it is.
+"""
+import io
+import logging
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Callable, Iterable
+import pandas as pd
+import numpy as np
+
+from .frame_cache import file_version
+from .store import price_cache_path
+
+logger = logging.getLogger(__name__)
+
+# Directory configuration
+DATA_DIR = Path("data")
+PANEL_DIR = DATA_DIR / "panel"
+
+PANEL_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+PANEL_INDEX_FILE = "index.json"
+PANEL_DATES_FILE = "dates.npy"
+
+
+class PanelStore:
+    """
+    Memory-mapped (dates x symbols) OHLCV panel for a whole universe.
+
+    Build it once from per-symbol histories with `build`, then open it in any
+    number of processes. Arrays are mapped read-only and loaded lazily.
+    """
+    def __init__(self, directory: Path = PANEL_DIR):
+        self.directory = Path(directory)
+        self._index = None
+        self._dates = None
+        self._symbol_pos = {}
+        self._arrays = {}
+
+    @classmethod
+    def build(cls, symbols: Iterable[str], loader: Callable[[str], Optional[pd.DataFrame]],
+              directory: Path = PANEL_DIR, versions: Optional[Dict[str, Any]] = None) -> 'PanelStore':
+        """
+        Build a panel from `loader(symbol)` price histories and swap it in atomically.
+
+        Symbols the loader returns nothing for are left out. `versions` (symbol
+        -> source file version) is recorded in the index for UniversePanel. The
+        new panel is written to a sibling directory and renamed into place, so
+        processes that still map the previous panel keep a consistent view.
+        """
+        frames = load_frames(symbols, loader)
+        if not frames:
+            raise ValueError("No price history available to build a panel")
+        return cls._write(Path(directory), frames, versions)
+
+    def update(self, frames: Dict[str, pd.DataFrame], versions: Optional[Dict[str, Any]] = None) -> 'PanelStore':
+        """
+        Replace the histories of the symbols in `frames` and return the updated panel.
+
+        When every symbol is already in the panel and their new dates all come
+        after its last date, only their columns are rewritten and the new date
+        rows are appended, in place in the mapped files. Otherwise the panel is
+        rewritten with the other symbols copied from the current arrays. Either
+        way, only the histories in `frames` are read.
+        """
+        indexes = {symbol: _naive_index(df) for symbol, df in frames.items()}
+        dates = self.dates
+        new_dates = pd.DatetimeIndex(np.unique(np.concatenate([index.values for index in indexes.values()])))
+        new_dates = new_dates[~new_dates.isin(dates)]
+        positions = self._symbol_positions()
+        if (all(symbol in positions for symbol in frames)
+                and (not len(new_dates) or new_dates[0] > dates[-1])
+                and self._append_rows(len(new_dates))):
+            all_dates = dates.append(new_dates)
+            arrays = {field: np.load(self.directory / f"{field}.npy", mmap_mode='r+') for field in PANEL_FIELDS}
+            _write_columns(arrays, all_dates, frames, indexes, positions)
+            for array in arrays.values():
+                array.flush()
+            del arrays
+            if len(new_dates):
+                _save_atomic(self.directory / PANEL_DATES_FILE,
+                             lambda f: np.save(f, all_dates.values.astype('datetime64[ns]')))
+            index_data = dict(self.index, rows=len(all_dates), end=str(all_dates[-1].date()),
+                              updated_at=datetime.now().isoformat(),
+                              versions=_recorded_versions(self.index.get('versions'), frames, versions))
+            _save_atomic(self.directory / PANEL_INDEX_FILE, lambda f: f.write(json.dumps(index_data).encode()))
+            logger.info(f"Updated {len(frames)} symbol(s) and appended {len(new_dates)} date(s) in place "
+                        f"in {self.directory}")
+            return PanelStore(self.directory)
+        return self._write(self.directory, frames, versions, base=self)
+
+    def _append_rows(self, rows: int) -> bool:
+        """
+        Grow every field file by `rows` NaN rows (the arrays are row-major, so
+        new dates go at the end of the file). False if a header cannot be
+        rewritten in place, which leaves the files unchanged.
+        """
+        if not rows:
+            return True
+        headers = {}
+        for field in PANEL_FIELDS:
+            with open(self.directory / f"{field}.npy", 'rb') as f:
+                version = np.lib.format.read_magic(f)
+                shape, fortran_order, dtype = (np.lib.format.read_array_header_1_0(f) if version == (1, 0)
+                                               else np.lib.format.read_array_header_2_0(f))
+                offset = f.tell()
+            header = io.BytesIO()
+            fields = {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': fortran_order,
+                      'shape': (shape[0] + rows, shape[1])}
+            if version == (1, 0):
+                np.lib.format.write_array_header_1_0(header, fields)
+            else:
+                np.lib.format.write_array_header_2_0(header, fields)
+            if fortran_order or header.tell() != offset:
+                return False
+            headers[field] = (header.getvalue(), shape[1], dtype)
+        for field, (header, columns, dtype) in headers.items():
+            with open(self.directory / f"{field}.npy", 'r+b') as f:
+                f.seek(0, os.SEEK_END)
+                f.write(np.full((rows, columns), np.nan, dtype=dtype).tobytes())
+                f.seek(0)
+                f.write(header)
+        return True
+
+    @classmethod
+    def _write(cls, directory: Path, frames: Dict[str, pd.DataFrame], versions: Optional[Dict[str, Any]],
+               base: Optional['PanelStore'] = None) -> 'PanelStore':
+        # A new panel in a staging directory: `base`'s arrays plus `frames`, swapped in atomically
+        indexes = {symbol: _naive_index(df) for symbol, df in frames.items()}
+        parts = [index.values for index in indexes.values()]
+        base_symbols = list(base.symbols) if base is not None else []
+        if base is not None:
+            parts.append(base.dates.values)
+        dates = pd.DatetimeIndex(np.unique(np.concatenate(parts)))
+        symbol_list = base_symbols + [symbol for symbol in frames if symbol not in base_symbols]
+
+        directory.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=directory.parent, prefix=f".{directory.name}-"))
+        try:
+            np.save(staging / PANEL_DATES_FILE, dates.values.astype('datetime64[ns]'))
+            arrays = {
+                field: np.lib.format.open_memmap(staging / f"{field}.npy", mode='w+', dtype=np.float64,
+                                                 shape=(len(dates), len(symbol_list)))
+                for field in PANEL_FIELDS
+            }
+            for field, array in arrays.items():
+                array[:] = np.nan
+                if base is not None:
+                    array[dates.searchsorted(base.dates), :len(base_symbols)] = base.array(field)
+            _write_columns(arrays, dates, frames, indexes, {symbol: i for i, symbol in enumerate(symbol_list)})
+            for array in arrays.values():
+                array.flush()
+            del arrays
+
+            index_data = {
+                'symbols': symbol_list,
+                'fields': PANEL_FIELDS,
+                'rows': len(dates),
+                'start': str(dates[0].date()),
+                'end': str(dates[-1].date()),
+                'built_at': datetime.now().isoformat(),
+                'versions': _recorded_versions(base.index.get('versions') if base is not None else None,
+                                               frames, versions)
+            }
+            with open(staging / PANEL_INDEX_FILE, 'w') as f:
+                json.dump(index_data, f)
+
+            cls._swap_in(staging, directory)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        logger.info(f"Wrote panel of {len(symbol_list)} symbols x {len(dates)} dates in {directory} "
+                    f"({len(frames)} loaded)")
+        return cls(directory)
+
+    @staticmethod
+    def _swap_in(staging: Path, directory: Path):
+        retired = None
+        if directory.exists():
+            retired = directory.with_name(f".{directory.name}-retired-{os.getpid()}")
+            shutil.rmtree(retired, ignore_errors=True)
+            os.replace(directory, retired)
+        os.replace(staging, directory)
+        if retired is not None:
+            # Open memory maps keep the unlinked files alive until they are closed
+            shutil.rmtree(retired, ignore_errors=True)
+
+    def exists(self) -> bool:
+        return (self.directory / PANEL_INDEX_FILE).exists()
+
+    @property
+    def index(self) -> Dict[str, Any]:
+        return self._load_index()
+
+    def _load_index(self) -> Dict[str, Any]:
+        if self._index is None:
+            with open(self.directory / PANEL_INDEX_FILE, 'r') as f:
+                index = json.load(f)
+            self._symbol_pos = {symbol: i for i, symbol in enumerate(index['symbols'])}
+            self._index = index
+        return self._index
+
+    @property
+    def symbols(self) -> List[str]:
+        return self.index['symbols']
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        if self._dates is None:
+            self._dates = pd.DatetimeIndex(np.load(self.directory / PANEL_DATES_FILE), name='Date')
+        return self._dates
+
+    def array(self, field: str) -> np.ndarray:
+        """
+        The full (dates x symbols) memory-mapped array for one field
+        """
+        if field not in self._arrays:
+            if field not in self.index['fields']:
+                raise KeyError(f"Unknown panel field '{field}'")
+            self._arrays[field] = np.load(self.directory / f"{field}.npy", mmap_mode='r')
+        return self._arrays[field]
+
+    def symbol_position(self, symbol: str) -> int:
+        self._load_index()
+        position = self._symbol_pos.get(symbol)
+        if position is None:
+            raise KeyError(f"{symbol} is not in the panel")
+        return position
+
+    def date_slice(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> slice:
+        """
+        Row slice covering [start, end] (both inclusive, either open-ended)
+        """
+        dates = self.dates
+        first = dates.searchsorted(pd.Timestamp(start), side='left') if start is not None else 0
+        last = dates.searchsorted(pd.Timestamp(end), side='right') if end is not None else len(dates)
+        return slice(int(first), int(last))
+
+    def window(self, field: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+               symbols: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        One field for a date range as a (dates x symbols) DataFrame.
+
+        Without `symbols` the frame wraps a view of the mapped block (no copy);
+        selecting symbols gathers their columns.
+        """
+        rows = self.date_slice(start, end)
+        block = self.array(field)[rows]
+        columns = self.symbols
+        if symbols is not None:
+            block = block[:, [self.symbol_position(symbol) for symbol in symbols]]
+            columns = list(symbols)
+        return pd.DataFrame(block, index=self.dates[rows], columns=columns, copy=False)
+
+    def symbol_frame(self, symbol: str, start: Optional[datetime] = None,
+                     end: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        OHLCV history of one symbol, without the dates it has no bars for
+        """
+        rows = self.date_slice(start, end)
+        col = self.symbol_position(symbol)
+        df = pd.DataFrame({field: self.array(field)[rows, col] for field in self.index['fields']},
+                          index=self.dates[rows])
+        df = df[df['Close'].notna()]
+        df['Volume'] = df['Volume'].astype(np.int64)
+        return df
+
+    def cross_section(self, date: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        All fields for every symbol on one date (default: the last date), symbols as rows
+        """
+        if date is None:
+            row = len(self.dates) - 1
+        else:
+            row = self.dates.searchsorted(pd.Timestamp(date), side='right') - 1
+            if row < 0:
+                raise KeyError(f"No panel rows on or before {date}")
+        return pd.DataFrame({field: self.array(field)[row] for field in self.index['fields']},
+                            index=pd.Index(self.symbols, name='Symbol'))
+
+    def returns(self, lookback: int, symbols: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Daily close-to-close returns over the last `lookback` rows (dates x symbols)
+        """
+        close = self.array('Close')[-(lookback + 1):]
+        if symbols is not None:
+            close = close[:, [self.symbol_position(symbol) for symbol in symbols]]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rets = close[1:] / close[:-1] - 1.0
+        return pd.DataFrame(rets, index=self.dates[-lookback:], columns=symbols or self.symbols)
+
+    def correlation(self, lookback: int = 60, symbols: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Pairwise correlation of daily returns over the last `lookback` rows
+        """
+        return self.returns(lookback, symbols).corr(min_periods=max(2, lookback // 2))
+
+    def momentum(self, lookback: int = 20, symbols: Optional[List[str]] = None) -> pd.Series:
+        """
+        Close-to-close return over the last `lookback` rows per symbol (a missing
+        last bar, e.g. a holiday of one market, carries the previous close forward)
+        """
+        symbols = [symbol for symbol in (symbols or self.symbols) if symbol in self._symbol_positions()]
+        close = self.array('Close')[-(lookback + 1):, [self.symbol_position(symbol) for symbol in symbols]]
+        close = pd.DataFrame(close, columns=symbols).ffill()
+        return (close.iloc[-1] / close.iloc[0] - 1.0).dropna()
+
+    def _symbol_positions(self) -> Dict[str, int]:
+        self._load_index()
+        return self._symbol_pos
+
+    def describe(self) -> Dict[str, Any]:
+        info = dict(self.index)
+        info.pop('versions', None)
+        info['symbols'] = len(info['symbols'])
+        info['directory'] = str(self.directory)
+        info['bytes'] = sum((self.directory / f"{field}.npy").stat().st_size for field in info['fields'])
+        return info
+
+
+def _naive_index(df: pd.DataFrame) -> pd.DatetimeIndex:
+    index = pd.DatetimeIndex(df.index)
+    return index.tz_localize(None) if index.tz is not None else index
+
+
+def load_frames(symbols: Iterable[str], loader: Callable[[str], Optional[pd.DataFrame]]) -> Dict[str, pd.DataFrame]:
+    """
+    Non-empty `loader(symbol)` histories by symbol (failures are logged and skipped)
+    """
+    frames = {}
+    for symbol in symbols:
+        try:
+            df = loader(symbol)
+        except Exception as e:
+            logger.warning(f"Skipping {symbol} in panel: {e}")
+            continue
+        if df is not None and not df.empty:
+            frames[symbol] = df
+    return frames
+
+
+def _write_columns(arrays: Dict[str, np.ndarray], dates: pd.DatetimeIndex, frames: Dict[str, pd.DataFrame],
+                   indexes: Dict[str, pd.DatetimeIndex], positions: Dict[str, int]):
+    # A symbol's whole column is replaced, so dates its new history dropped become NaN
+    for symbol, df in frames.items():
+        col = positions[symbol]
+        rows = dates.searchsorted(indexes[symbol])
+        for field in PANEL_FIELDS:
+            arrays[field][:, col] = np.nan
+            if field in df.columns:
+                arrays[field][rows, col] = df[field].to_numpy(dtype=np.float64)
+
+
+def _recorded_versions(recorded: Optional[Dict[str, Any]], frames: Dict[str, pd.DataFrame],
+                       versions: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    recorded = dict(recorded or {})
+    for symbol in frames:
+        if versions and versions.get(symbol) is not None:
+            recorded[symbol] = list(versions[symbol])
+        else:
+            recorded.pop(symbol, None)
+    return recorded
+
+
+def _save_atomic(path: Path, write: Callable[[Any], Any]):
+    # write(f) into a temporary file next to `path`, then rename it into place
+    temp_fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(temp_fd, 'wb') as f:
+            write(f)
+        os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def build_from_cache(symbols: Optional[List[str]] = None, directory: Path = PANEL_DIR) -> PanelStore:
+    """
+    Build the panel from the per-symbol price cache (every cached symbol by default)
+    """
+    from .data import EnhancedDataIngester, DATA_CACHE_DIR
+    ingester = EnhancedDataIngester()
+    if symbols is None:
+        symbols = sorted(path.name[:-len('_data.parquet')] for path in DATA_CACHE_DIR.glob("*_data.parquet"))
+    versions = {symbol: file_version(price_cache_path(symbol)) for symbol in symbols}
+    return PanelStore.build(symbols, ingester.load_price_history, directory, versions)
+
+
+class UniversePanel:
+    """
+    The shared panel, kept up to date with the price cache symbol by symbol
+    """
+    def __init__(self, directory: Path = PANEL_DIR):
+        self.directory = Path(directory)
+        self._store = None
+        self._index_version = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._wanted = set()
+        self.refreshes = 0
+        self.builds = 0
+        self.updates = 0
+        self.last_changed = 0
+        self.last_build_seconds = None
+
+    def _open(self) -> Optional[PanelStore]:
+        # Reopened when the panel was updated (here or by another process)
+        version = file_version(self.directory / PANEL_INDEX_FILE)
+        if version is None:
+            self._store = None
+        elif self._store is None or version != self._index_version:
+            self._store = PanelStore(self.directory)
+        self._index_version = version
+        return self._store
+
+    def current(self) -> Optional[PanelStore]:
+        """
+        The panel as it is now, without checking it against the price cache (None if there is none)
+        """
+        with self._lock:
+            return self._open()
+
+    def request(self, symbols: Iterable[str]):
+        """
+        Mark `symbols` for the next `refresh_requested`
+        """
+        with self._lock:
+            self._wanted.update(symbols)
+
+    def refresh_requested(self, loader: Callable[[str], Optional[pd.DataFrame]]) -> Optional[PanelStore]:
+        """
+        Refresh the symbols requested so far, until no more requests are waiting
+        """
+        while True:
+            with self._lock:
+                symbols = list(self._wanted)
+                self._wanted.clear()
+            if not symbols:
+                return self.current()
+            self.refresh(symbols, loader)
+
+    def refresh(self, symbols: Iterable[str],
+                loader: Callable[[str], Optional[pd.DataFrame]]) -> Optional[PanelStore]:
+        """
+        The panel, with every cached symbol of `symbols` that is missing from it or
+        whose price file changed since it was written brought up to date first
+        (None if nothing is cached).
+
+        Only file versions are compared, so an up-to-date panel costs one `stat`
+        per symbol, and only the changed symbols' histories are loaded (see
+        PanelStore.update).
+        """
+        with self._refresh_lock:
+            store = self.current()
+            built = store.index.get('versions', {}) if store is not None else {}
+            requested = {symbol: file_version(price_cache_path(symbol)) for symbol in dict.fromkeys(symbols)}
+            changed = {symbol: version for symbol, version in requested.items()
+                       if version is not None and built.get(symbol) != list(version)}
+            with self._lock:
+                self.refreshes += 1
+            if not changed:
+                return store
+
+            started = time.perf_counter()
+            frames = load_frames(changed, loader)
+            if not frames:
+                return store
+            if store is None:
+                updated = PanelStore.build(list(frames), frames.get, self.directory, changed)
+            else:
+                updated = store.update(frames, changed)
+            with self._lock:
+                self._store = updated
+                self._index_version = file_version(self.directory / PANEL_INDEX_FILE)
+                if store is None:
+                    self.builds += 1
+                else:
+                    self.updates += 1
+                self.last_changed = len(frames)
+                self.last_build_seconds = round(time.perf_counter() - started, 3)
+            return updated
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            store = self._open()
+            return {
+                'symbols': len(store.symbols) if store is not None else 0,
+                'end': store.index['end'] if store is not None else None,
+                'refreshes': self.refreshes,
+                'builds': self.builds,
+                'updates': self.updates,
+                'last_changed_symbols': self.last_changed,
+                'last_build_seconds': self.last_build_seconds,
+                'pending_symbols': len(self._wanted)
+            }
+
+
+# Shared by every adapter in the process
+universe_panel = UniversePanel()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    panel = build_from_cache()
+    logger.info(f"Built panel: {json.dumps(panel.describe())}")
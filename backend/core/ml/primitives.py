@@ -0,0 +1,45 @@
+"""
+This module holds the definitions shared by the indicator registry (indicators.py)
+and the streaming indicators (streaming.py).
+
+Both compute the same features, one over whole series and one bar at a time,
+so the SMA periods and the adjusted EWM recurrence live here rather than in
+either of them.
+"""
+from typing import Tuple
+
+NAN = float('nan')
+SMA_PERIODS = [5, 10, 20, 50, 100, 200]
+
+
+class EMA:
+    """
+    Exponential moving average (ewm(span).mean(), adjusted weights).
+
+    The state is the current average and the total weight of the inputs seen
+    so far, so an EMA can be resumed from a saved (average, weight) pair.
+    """
+    def __init__(self, span: int, average: float = NAN, weight: float = 0.0):
+        self.span = span
+        self.beta = 1 - 2 / (span + 1)
+        self.value = average
+        self.weight = weight
+
+    def update(self, value: float) -> float:
+        self.value, self.weight = self._next(value)
+        return self.value
+
+    def peek(self, value: float) -> float:
+        return self._next(value)[0]
+
+    def _next(self, value: float) -> Tuple[float, float]:
+        # Same recurrence as pandas' ewma with adjust=True, ignore_na=False
+        average, weight = self.value, self.weight
+        if average != average:
+            return (value, 1.0) if value == value else (average, weight)
+        weight *= self.beta
+        if value == value:
+            if average != value:
+                average = (weight * average + value) / (weight + 1)
+            weight += 1
+        return average, weight
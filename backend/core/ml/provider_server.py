@@ -0,0 +1,136 @@
+"""
+This module serves any data provider over HTTP, as a local stand-in for a remote upstream.
+
+HTTPProvider talks to it, so tests and load runs can exercise the remote code
+path (deadlines, retries, circuit breaker, fallback) without network access.
+Faults can be injected at runtime: a fixed extra latency, an HTTP error
+status for every request, or a failure rate.
+"""
+import logging
+import json
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse, parse_qs
+import pandas as pd
+
+from .providers import DataProvider, SyntheticProvider
+
+logger = logging.getLogger(__name__)
+
+
+def frame_to_split_json(df: Optional[pd.DataFrame]) -> Dict[str, Any]:
+    """
+    Encode a DatetimeIndex frame as pandas orient='split' JSON (ISO timestamps)
+    """
+    if df is None or df.empty:
+        return {'columns': [], 'index': [], 'data': []}
+    return {
+        'columns': [str(col) for col in df.columns],
+        'index': [ts.isoformat() for ts in pd.DatetimeIndex(df.index)],
+        'index_name': df.index.name,
+        'data': df.astype(object).where(df.notna(), None).values.tolist()
+    }
+
+
+class ProviderServer:
+    """
+    Threaded HTTP server exposing a provider's history/intraday/fundamentals/news
+    """
+    def __init__(self, provider: Optional[DataProvider] = None, host: str = '127.0.0.1', port: int = 0):
+        self.provider = provider or SyntheticProvider()
+        self.latency = 0.0
+        self.error_status = None
+        self.failure_rate = 0.0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'ProviderServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='provider-server', daemon=True)
+        self._thread.start()
+        logger.info(f"Serving {self.provider.label} at {self.url}")
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def inject(self, latency: float = 0.0, error_status: Optional[int] = None, failure_rate: float = 0.0):
+        """
+        Set the faults applied to every following request (all off by default)
+        """
+        self.latency = latency
+        self.error_status = error_status
+        self.failure_rate = failure_rate
+
+    def respond(self, endpoint: str, params: Dict[str, str]) -> Any:
+        symbol = params.get('symbol')
+        if not symbol:
+            raise ValueError("symbol is required")
+        if endpoint == 'history':
+            return frame_to_split_json(self.provider.history(symbol, period=params.get('period'),
+                                                             start=params.get('start')))
+        if endpoint == 'intraday':
+            return frame_to_split_json(self.provider.intraday(symbol, params.get('interval', '5m'),
+                                                              period=params.get('period'), start=params.get('start')))
+        if endpoint == 'fundamentals':
+            return self.provider.fundamentals(symbol)
+        if endpoint == 'news':
+            return self.provider.news(symbol)
+        raise KeyError(endpoint)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                if server.error_status or (server.failure_rate and random.random() < server.failure_rate):
+                    self._send(server.error_status or 503, {'error': 'injected failure'})
+                    return
+                url = urlparse(self.path)
+                params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                try:
+                    self._send(200, server.respond(url.path.strip('/'), params))
+                except KeyError:
+                    self._send(404, {'error': f"unknown endpoint {url.path}"})
+                except Exception as e:
+                    self._send(500, {'error': str(e)})
+
+            def _send(self, status: int, payload: Any):
+                body = json.dumps(payload, default=str).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+
+if __name__ == "__main__":
+    import os
+    logging.basicConfig(level=logging.INFO)
+    port = int(os.getenv('PROVIDER_SERVER_PORT', '8765'))
+    server = ProviderServer(port=port).start()
+    print(f"Synthetic data service at {server.url} (use DATA_PROVIDER=http DATA_PROVIDER_URL={server.url})")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,566 @@
+"""
+This module defines the market data providers used by the ingestion pipeline.
+
+A provider turns symbols into raw price history (and optionally fundamentals).
+Each provider carries its own concurrency limit so batch fetches never open
+more simultaneous requests against one upstream than it tolerates. Remote
+providers are wrapped in a ResilientProvider (deadlines, retries, circuit
+breaker), and several providers can be chained with ordered fallback.
+"""
+import logging
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+from urllib.parse import urlencode
+from urllib.request import urlopen
+import pandas as pd
+
+from .synthetic import SyntheticMarket
+from .intraday import interval_minutes
+from .resilience import ResilientCaller, RetryPolicy, CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+# Provider used when none is passed explicitly (e.g. DATA_PROVIDER=synthetic for offline runs);
+# a comma-separated list such as "yfinance,http" is tried in order
+DEFAULT_PROVIDER = os.getenv('DATA_PROVIDER', 'yfinance')
+# Base URL of the HTTP provider (see core.ml.provider_server for a local stand-in)
+HTTP_PROVIDER_URL = os.getenv('DATA_PROVIDER_URL', 'http://127.0.0.1:8765')
+
+# Failure handling for remote providers
+PROVIDER_TIMEOUT = float(os.getenv('PROVIDER_TIMEOUT', '15'))
+PROVIDER_RETRIES = int(os.getenv('PROVIDER_RETRIES', '2'))
+PROVIDER_BREAKER_THRESHOLD = int(os.getenv('PROVIDER_BREAKER_THRESHOLD', '5'))
+PROVIDER_BREAKER_RESET = float(os.getenv('PROVIDER_BREAKER_RESET', '30'))
+
+# yfinance-style history periods, as offsets back from today
+PERIOD_OFFSETS = {
+    '1d': pd.DateOffset(days=1), '5d': pd.DateOffset(days=5), '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3), '6mo': pd.DateOffset(months=6), '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2), '5y': pd.DateOffset(years=5), '10y': pd.DateOffset(years=10)
+}
+
+
+def period_start(period: Optional[str], today: Optional[datetime] = None) -> Optional[pd.Timestamp]:
+    """
+    First date covered by a yfinance-style `period` ('max' and unknown periods return None)
+    """
+    today = pd.Timestamp(today if today is not None else datetime.now()).normalize()
+    if period == 'ytd':
+        return today.replace(month=1, day=1)
+    if period and period.endswith('d') and period[:-1].isdigit():
+        return today - pd.DateOffset(days=int(period[:-1]))
+    offset = PERIOD_OFFSETS.get(period or '2y')
+    return today - offset if offset is not None else None
+
+
+class DataProvider:
+    """
+    Base class for price history providers.
+
+    Subclasses implement `_history` (and `_history_many` when the upstream has
+    a multi-ticker endpoint). Callers use the public methods, which hold one of
+    the provider's concurrency slots for the duration of each upstream call.
+    `adjusted` says whether returned prices are already back-adjusted for
+    splits and dividends; raw histories are adjusted on ingestion.
+    """
+    name = 'base'
+    label = 'data provider'
+    supports_bulk = False
+    bulk_chunk_size = 50
+    adjusted = True
+    remote = False
+
+    def __init__(self, max_concurrency: int = 4):
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    @contextmanager
+    def slot(self):
+        """
+        Hold one of this provider's concurrency slots
+        """
+        with self._slots:
+            yield
+
+    def history(self, symbol: str, period: Optional[str] = None, start: Optional[str] = None) -> pd.DataFrame:
+        """
+        Fetch daily bars for one symbol, either for a `period` or from `start`
+        """
+        with self.slot():
+            return self._history(symbol, period=period, start=start)
+
+    def history_many(self, symbols: List[str], period: Optional[str] = None,
+                     start: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch daily bars for several symbols, using the bulk endpoint if there is one.
+
+        Symbols the provider returned nothing for are left out of the result.
+        """
+        if not self.supports_bulk:
+            frames = {}
+            for symbol in symbols:
+                df = self.history(symbol, period=period, start=start)
+                if df is not None and not df.empty:
+                    frames[symbol] = df
+            return frames
+
+        frames = {}
+        for i in range(0, len(symbols), self.bulk_chunk_size):
+            chunk = symbols[i:i + self.bulk_chunk_size]
+            with self.slot():
+                frames.update(self._history_many(chunk, period=period, start=start))
+        return frames
+
+    def intraday(self, symbol: str, interval: str, period: Optional[str] = None,
+                 start: Optional[str] = None) -> pd.DataFrame:
+        """
+        Fetch intraday bars ('1m', '5m', '15m', '30m', '1h') for a `period` or from `start`
+        """
+        with self.slot():
+            return self._intraday(symbol, interval, period=period, start=start)
+
+    def fundamentals(self, symbol: str) -> Dict[str, Any]:
+        """
+        Fetch company info, financials and recommendations for one symbol
+        """
+        with self.slot():
+            return self._fundamentals(symbol)
+
+    def news(self, symbol: str) -> List[Dict[str, Any]]:
+        """
+        Fetch recent news items for one symbol
+        """
+        with self.slot():
+            return self._news(symbol)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Call/failure counters for health reporting
+        """
+        return {'name': self.name}
+
+    def _history(self, symbol: str, period: Optional[str] = None, start: Optional[str] = None) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def _history_many(self, symbols: List[str], period: Optional[str] = None,
+                      start: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+        raise NotImplementedError
+
+    def _intraday(self, symbol: str, interval: str, period: Optional[str] = None,
+                  start: Optional[str] = None) -> pd.DataFrame:
+        raise NotImplementedError(f"{self.label} does not provide intraday bars")
+
+    def _fundamentals(self, symbol: str) -> Dict[str, Any]:
+        return {'company_info': {}, 'financials': {}, 'recommendations': None}
+
+    def _news(self, symbol: str) -> List[Dict[str, Any]]:
+        return []
+
+
+class YFinanceProvider(DataProvider):
+    """
+    Yahoo Finance provider backed by yfinance
+    """
+    name = 'yfinance'
+    label = 'Yahoo Finance'
+    supports_bulk = True
+    remote = True
+
+    def _history(self, symbol: str, period: Optional[str] = None, start: Optional[str] = None) -> pd.DataFrame:
+        import yfinance as yf
+        ticker = yf.Ticker(symbol)
+        if start is not None:
+            return ticker.history(start=start)
+        return ticker.history(period=period or "2y")
+
+    def _history_many(self, symbols: List[str], period: Optional[str] = None,
+                      start: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+        import yfinance as yf
+        # Match Ticker.history(): adjusted prices plus Dividends/Stock Splits columns
+        kwargs = {'start': start} if start is not None else {'period': period or "2y"}
+        raw = yf.download(symbols, group_by='ticker', auto_adjust=True, actions=True,
+                          threads=False, progress=False, **kwargs)
+
+        frames = {}
+        if raw is None or raw.empty:
+            return frames
+        for symbol in symbols:
+            if isinstance(raw.columns, pd.MultiIndex):
+                if symbol not in raw.columns.get_level_values(0):
+                    continue
+                df = raw[symbol]
+            else:
+                df = raw
+            df = df.dropna(how='all')
+            if not df.empty:
+                frames[symbol] = df
+        return frames
+
+    def _intraday(self, symbol: str, interval: str, period: Optional[str] = None,
+                  start: Optional[str] = None) -> pd.DataFrame:
+        import yfinance as yf
+        ticker = yf.Ticker(symbol)
+        if start is not None:
+            return ticker.history(interval=interval, start=start)
+        return ticker.history(interval=interval, period=period or "5d")
+
+    def _fundamentals(self, symbol: str) -> Dict[str, Any]:
+        import yfinance as yf
+        ticker = yf.Ticker(symbol)
+        return {
+            'company_info': ticker.info or {},
+            'financials': {
+                'income_stmt': ticker.income_stmt.to_dict() if hasattr(ticker, 'income_stmt') and ticker.income_stmt is not None else {},
+                'balance_sheet': ticker.balance_sheet.to_dict() if hasattr(ticker, 'balance_sheet') and ticker.balance_sheet is not None else {},
+                'cashflow': ticker.cashflow.to_dict() if hasattr(ticker, 'cashflow') and ticker.cashflow is not None else {}
+            },
+            'recommendations': ticker.recommendations if hasattr(ticker, 'recommendations') else None
+        }
+
+    def _news(self, symbol: str) -> List[Dict[str, Any]]:
+        import yfinance as yf
+        ticker = yf.Ticker(symbol)
+        return ticker.news if hasattr(ticker, 'news') else []
+
+
+class LocalProvider(DataProvider):
+    """
+    Offline stand-in provider that serves price history from memory or disk.
+
+    Frames come from `frames` (symbol -> DataFrame) or from `{symbol}.parquet` /
+    `{symbol}.csv` files in `directory`. `latency` adds a per-call sleep so
+    concurrency behaviour can be exercised without a network. Pass
+    `adjusted=False` for unadjusted exchange files.
+    """
+    name = 'local'
+    label = 'local provider'
+
+    def __init__(self, frames: Optional[Dict[str, pd.DataFrame]] = None, directory: Optional[Path] = None,
+                 latency: float = 0.0, max_concurrency: int = 4, adjusted: bool = True):
+        super().__init__(max_concurrency=max_concurrency)
+        self.adjusted = adjusted
+        self.frames = dict(frames or {})
+        self.directory = Path(directory) if directory else None
+        self.latency = latency
+        self.calls = 0
+        self._calls_lock = threading.Lock()
+
+    def _history(self, symbol: str, period: Optional[str] = None, start: Optional[str] = None) -> pd.DataFrame:
+        with self._calls_lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        df = self._load_frame(symbol)
+        if df is None:
+            return pd.DataFrame()
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        return df.copy()
+
+    def _load_frame(self, symbol: str) -> Optional[pd.DataFrame]:
+        if symbol in self.frames:
+            return self.frames[symbol]
+        if self.directory is None:
+            return None
+        parquet_path = self.directory / f"{symbol}.parquet"
+        csv_path = self.directory / f"{symbol}.csv"
+        if parquet_path.exists():
+            return pd.read_parquet(parquet_path)
+        if csv_path.exists():
+            return pd.read_csv(csv_path, index_col=0, parse_dates=True)
+        return None
+
+
+class SyntheticProvider(DataProvider):
+    """
+    Offline provider that serves seeded synthetic markets (see `SyntheticMarket`).
+
+    Any symbol resolves to its own deterministic history, so the full
+    fetch / feature / predict pipeline can run and be load-tested without a
+    network. `latency` adds a per-call sleep to mimic an upstream.
+    """
+    name = 'synthetic'
+    label = 'synthetic market'
+    supports_bulk = True
+
+    def __init__(self, market: Optional[SyntheticMarket] = None, seed: int = 42,
+                 latency: float = 0.0, max_concurrency: int = 8):
+        super().__init__(max_concurrency=max_concurrency)
+        self.market = market or SyntheticMarket(seed=seed)
+        self.adjusted = self.market.adjusted
+        self.latency = latency
+
+    def _history(self, symbol: str, period: Optional[str] = None, start: Optional[str] = None) -> pd.DataFrame:
+        if self.latency:
+            time.sleep(self.latency)
+        return self.market.history(symbol, start=start if start is not None else period_start(period))
+
+    def _history_many(self, symbols: List[str], period: Optional[str] = None,
+                      start: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+        if self.latency:
+            time.sleep(self.latency)
+        first = start if start is not None else period_start(period)
+        return {symbol: self.market.history(symbol, start=first) for symbol in symbols}
+
+    def _intraday(self, symbol: str, interval: str, period: Optional[str] = None,
+                  start: Optional[str] = None) -> pd.DataFrame:
+        if self.latency:
+            time.sleep(self.latency)
+        first = pd.Timestamp(start) if start is not None else period_start(period or "5d")
+        days = len(pd.bdate_range(first, datetime.now())) if first is not None else 60
+        df = self.market.intraday(symbol, interval_minutes(interval), max(days, 1))
+        return df[df.index >= first] if first is not None else df
+
+    def _fundamentals(self, symbol: str) -> Dict[str, Any]:
+        return {
+            'company_info': {'symbol': symbol, 'shortName': f"{symbol} (synthetic)", 'currency': 'USD'},
+            'financials': {},
+            'recommendations': None
+        }
+
+
+class HTTPProvider(DataProvider):
+    """
+    Provider that reads from an HTTP data service.
+
+    GET /history, /intraday, /fundamentals and /news take the symbol and
+    period/start as query parameters; price endpoints answer with a pandas
+    orient='split' JSON frame. `core.ml.provider_server` serves any provider
+    this way, which gives tests a local stand-in for a remote upstream.
+    """
+    name = 'http'
+    label = 'HTTP data service'
+    remote = True
+
+    def __init__(self, base_url: str = HTTP_PROVIDER_URL, timeout: float = PROVIDER_TIMEOUT,
+                 max_concurrency: int = 8, adjusted: bool = True):
+        super().__init__(max_concurrency=max_concurrency)
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.adjusted = adjusted
+
+    def _history(self, symbol: str, period: Optional[str] = None, start: Optional[str] = None) -> pd.DataFrame:
+        return frame_from_split_json(self._get('history', symbol=symbol, period=period, start=start))
+
+    def _intraday(self, symbol: str, interval: str, period: Optional[str] = None,
+                  start: Optional[str] = None) -> pd.DataFrame:
+        return frame_from_split_json(self._get('intraday', symbol=symbol, interval=interval, period=period, start=start))
+
+    def _fundamentals(self, symbol: str) -> Dict[str, Any]:
+        return self._get('fundamentals', symbol=symbol)
+
+    def _news(self, symbol: str) -> List[Dict[str, Any]]:
+        return self._get('news', symbol=symbol)
+
+    def _get(self, endpoint: str, **params) -> Any:
+        query = urlencode({key: value for key, value in params.items() if value is not None})
+        with urlopen(f"{self.base_url}/{endpoint}?{query}", timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+
+def frame_from_split_json(payload: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Rebuild a DatetimeIndex frame from pandas orient='split' JSON
+    """
+    if not payload or not payload.get('data'):
+        return pd.DataFrame()
+    index = pd.DatetimeIndex(pd.to_datetime(payload['index']), name=payload.get('index_name') or 'Date')
+    return pd.DataFrame(payload['data'], index=index, columns=payload['columns'])
+
+
+class ResilientProvider(DataProvider):
+    """
+    Wraps a provider with per-call deadlines, jittered retries and a circuit breaker.
+
+    While the breaker is open every call raises ProviderUnavailable at once,
+    so the ingester falls back to the next provider or the cache immediately.
+    Other attributes (e.g. `market`) are those of the wrapped provider.
+    """
+    def __init__(self, provider: DataProvider, timeout: Optional[float] = PROVIDER_TIMEOUT,
+                 retries: int = PROVIDER_RETRIES, failure_threshold: int = PROVIDER_BREAKER_THRESHOLD,
+                 reset_timeout: float = PROVIDER_BREAKER_RESET):
+        super().__init__(max_concurrency=provider.max_concurrency)
+        self.provider = provider
+        self.name = provider.name
+        self.label = provider.label
+        self.supports_bulk = provider.supports_bulk
+        self.bulk_chunk_size = provider.bulk_chunk_size
+        self.adjusted = provider.adjusted
+        self.remote = provider.remote
+        self.caller = ResilientCaller(
+            provider.name,
+            RetryPolicy(attempts=retries + 1, timeout=timeout),
+            CircuitBreaker(provider.name, failure_threshold=failure_threshold, reset_timeout=reset_timeout),
+            max_workers=provider.max_concurrency
+        )
+
+    def __getattr__(self, item):
+        provider = self.__dict__.get('provider')
+        if provider is None:
+            raise AttributeError(item)
+        return getattr(provider, item)
+
+    def history(self, symbol: str, period: Optional[str] = None, start: Optional[str] = None) -> pd.DataFrame:
+        return self.caller.call(lambda: self.provider.history(symbol, period=period, start=start), f"history({symbol})")
+
+    def history_many(self, symbols: List[str], period: Optional[str] = None,
+                     start: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+        frames = {}
+        chunk_size = self.bulk_chunk_size if self.supports_bulk else 1
+        for i in range(0, len(symbols), chunk_size):
+            chunk = symbols[i:i + chunk_size]
+            frames.update(self.caller.call(lambda: self.provider.history_many(chunk, period=period, start=start),
+                                           f"history_many({len(chunk)} symbols)"))
+        return frames
+
+    def intraday(self, symbol: str, interval: str, period: Optional[str] = None,
+                 start: Optional[str] = None) -> pd.DataFrame:
+        return self.caller.call(lambda: self.provider.intraday(symbol, interval, period=period, start=start),
+                                f"intraday({symbol}, {interval})")
+
+    def fundamentals(self, symbol: str) -> Dict[str, Any]:
+        return self.caller.call(lambda: self.provider.fundamentals(symbol), f"fundamentals({symbol})")
+
+    def news(self, symbol: str) -> List[Dict[str, Any]]:
+        return self.caller.call(lambda: self.provider.news(symbol), f"news({symbol})")
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {'name': self.name}
+        stats.update(self.caller.stats())
+        return stats
+
+
+class FallbackProvider(DataProvider):
+    """
+    Tries providers in order and serves the first non-empty answer.
+
+    Returned price frames carry the serving provider's name and adjustment
+    convention in `df.attrs` ('provider', 'adjusted'). If every provider
+    raises, the last error is re-raised.
+    """
+    def __init__(self, providers: List[DataProvider]):
+        if not providers:
+            raise ValueError("FallbackProvider needs at least one provider")
+        super().__init__(max_concurrency=max(provider.max_concurrency for provider in providers))
+        self.providers = list(providers)
+        self.name = self.providers[0].name
+        self.label = ' -> '.join(provider.label for provider in self.providers)
+        self.supports_bulk = any(provider.supports_bulk for provider in self.providers)
+        self.adjusted = self.providers[0].adjusted
+        self.remote = any(provider.remote for provider in self.providers)
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+
+    def history(self, symbol: str, period: Optional[str] = None, start: Optional[str] = None) -> pd.DataFrame:
+        return self._first(lambda provider: provider.history(symbol, period=period, start=start),
+                           lambda df: df is not None and not df.empty, pd.DataFrame(), f"history({symbol})")
+
+    def history_many(self, symbols: List[str], period: Optional[str] = None,
+                     start: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+        frames = {}
+        remaining = list(symbols)
+        last_error = None
+        for position, provider in enumerate(self.providers):
+            if not remaining:
+                break
+            try:
+                served = provider.history_many(remaining, period=period, start=start)
+            except Exception as e:
+                logger.warning(f"{provider.label} failed for {len(remaining)} symbols: {e}")
+                last_error = e
+                continue
+            for symbol, df in served.items():
+                self._tag(df, provider)
+                frames[symbol] = df
+            if position and served:
+                self._count_fallback()
+            remaining = [symbol for symbol in remaining if symbol not in frames]
+        if not frames and last_error is not None:
+            raise last_error
+        return frames
+
+    def intraday(self, symbol: str, interval: str, period: Optional[str] = None,
+                 start: Optional[str] = None) -> pd.DataFrame:
+        return self._first(lambda provider: provider.intraday(symbol, interval, period=period, start=start),
+                           lambda df: df is not None and not df.empty, pd.DataFrame(), f"intraday({symbol})")
+
+    def fundamentals(self, symbol: str) -> Dict[str, Any]:
+        return self._first(lambda provider: provider.fundamentals(symbol),
+                           lambda data: bool(data and data.get('company_info')),
+                           {'company_info': {}, 'financials': {}, 'recommendations': None}, f"fundamentals({symbol})")
+
+    def news(self, symbol: str) -> List[Dict[str, Any]]:
+        return self._first(lambda provider: provider.news(symbol), bool, [], f"news({symbol})")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            fallbacks = self.fallbacks
+        return {'name': self.name, 'fallbacks': fallbacks, 'chain': [provider.stats() for provider in self.providers]}
+
+    def _first(self, call, usable, empty, description: str):
+        last_error = None
+        answered = False
+        for position, provider in enumerate(self.providers):
+            try:
+                result = call(provider)
+            except NotImplementedError:
+                continue
+            except Exception as e:
+                logger.warning(f"{provider.label} failed for {description}: {e}")
+                last_error = e
+                continue
+            answered = True
+            if usable(result):
+                if position:
+                    self._count_fallback()
+                return self._tag(result, provider)
+        if not answered and last_error is not None:
+            raise last_error
+        return empty
+
+    def _tag(self, result, provider: DataProvider):
+        if isinstance(result, pd.DataFrame):
+            result.attrs['provider'] = provider.name
+            result.attrs['adjusted'] = provider.adjusted
+        return result
+
+    def _count_fallback(self):
+        with self._lock:
+            self.fallbacks += 1
+
+
+PROVIDERS = {
+    YFinanceProvider.name: YFinanceProvider,
+    LocalProvider.name: LocalProvider,
+    SyntheticProvider.name: SyntheticProvider,
+    HTTPProvider.name: HTTPProvider
+}
+
+
+def create_provider(name: Optional[str] = None, resilient: bool = True, **kwargs) -> DataProvider:
+    """
+    Build a provider by name ('yfinance', 'local', 'synthetic' or 'http'; default from DATA_PROVIDER).
+
+    Remote providers are wrapped in a ResilientProvider unless `resilient=False`.
+    A comma-separated list builds a FallbackProvider over those providers, in
+    order (`kwargs` only apply to a single provider).
+    """
+    name = name or DEFAULT_PROVIDER
+    names = [part.strip() for part in name.split(',') if part.strip()]
+    for provider_name in names:
+        if provider_name not in PROVIDERS:
+            raise ValueError(f"Unknown data provider '{provider_name}'. Available: {', '.join(PROVIDERS)}")
+    if len(names) > 1:
+        return FallbackProvider([create_provider(provider_name, resilient=resilient) for provider_name in names])
+
+    provider = PROVIDERS[names[0]](**kwargs)
+    if resilient and provider.remote:
+        provider = ResilientProvider(provider)
+    return provider
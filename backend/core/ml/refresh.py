@@ -0,0 +1,72 @@
+"""
+This module runs background refreshes for the stale-while-revalidate cache policy.
+
+A request that finds cached data past its TTL (but within the grace period)
+is answered from cache immediately and queues a refresh here, so request
+latency stays flat while the cache catches up. Each key is queued at most
+once at a time.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundRefresher:
+    """
+    Small worker pool that runs de-duplicated refresh jobs
+    """
+    def __init__(self, max_workers: int = 2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='cache-refresh')
+        self._pending = set()
+        self._lock = threading.Lock()
+        self.scheduled = 0
+        self.skipped = 0
+        self.completed = 0
+        self.failed = 0
+
+    def schedule(self, key: Hashable, fn: Callable[[], Any]) -> bool:
+        """
+        Queue `fn` for `key` unless a refresh for it is already pending; True if queued
+        """
+        with self._lock:
+            if key in self._pending:
+                self.skipped += 1
+                return False
+            self._pending.add(key)
+            self.scheduled += 1
+        self._executor.submit(self._run, key, fn)
+        return True
+
+    def is_pending(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._pending
+
+    def _run(self, key: Hashable, fn: Callable[[], Any]):
+        try:
+            fn()
+            with self._lock:
+                self.completed += 1
+            logger.info(f"Background refresh of {key} complete")
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            logger.warning(f"Background refresh of {key} failed: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'pending': len(self._pending),
+                'scheduled': self.scheduled,
+                'skipped': self.skipped,
+                'completed': self.completed,
+                'failed': self.failed
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,161 @@
+"""
+This module resamples cached daily bars to weekly and monthly resolution.
+
+Periods are found once from the (sorted) daily index and every field is
+reduced over contiguous runs with `np.ufunc.reduceat`, so a resample is a
+handful of array passes. Results are cached per (symbol, resolution) along
+with the version of the daily data (the price file version), so a lookup for
+unchanged data costs no pass over the bars. When new daily bars arrive, only
+the last (possibly incomplete) period and the periods after it are rebuilt;
+the earlier periods are reused while the daily bars they were built from still
+start and end at the same bars with the same last close (an O(1) check; a
+corporate-action re-adjustment rescales that close and triggers a full rebuild).
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Hashable, Optional, Tuple
+import pandas as pd
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Resolution -> pandas period frequency (weeks end on Friday)
+RESOLUTIONS = {'weekly': 'W-FRI', 'monthly': 'M'}
+# Bar resolution that matches each prediction horizon
+HORIZON_RESOLUTIONS = {'intraday': 'daily', 'short': 'weekly', 'long': 'monthly'}
+# Resampled series kept in memory
+RESAMPLE_CACHE_ENTRIES = int(os.getenv('RESAMPLE_CACHE_ENTRIES', '1024'))
+
+
+def period_codes(index: pd.DatetimeIndex, resolution: str) -> np.ndarray:
+    """
+    Integer period number of every timestamp (weeks or months since the epoch)
+    """
+    return pd.DatetimeIndex(index).to_period(RESOLUTIONS[resolution]).asi8
+
+
+def resample_bars(df: pd.DataFrame, resolution: str) -> pd.DataFrame:
+    """
+    OHLCV bars of `resolution` ('weekly' or 'monthly') from sorted daily bars.
+
+    Each bar is labelled with the date of its last daily bar; `Bars` counts
+    the daily bars it aggregates.
+    """
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Unsupported resolution '{resolution}'. Available: daily, {', '.join(RESOLUTIONS)}")
+    if df is None or df.empty:
+        return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume', 'Bars'])
+
+    codes = period_codes(df.index, resolution)
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(codes)) + 1])
+    ends = np.append(starts[1:], len(df)) - 1
+
+    bars = {}
+    if 'Open' in df.columns:
+        bars['Open'] = df['Open'].to_numpy()[starts]
+    if 'High' in df.columns:
+        bars['High'] = np.fmax.reduceat(df['High'].to_numpy(dtype=np.float64), starts)
+    if 'Low' in df.columns:
+        bars['Low'] = np.fmin.reduceat(df['Low'].to_numpy(dtype=np.float64), starts)
+    if 'Close' in df.columns:
+        bars['Close'] = df['Close'].to_numpy()[ends]
+    if 'Volume' in df.columns:
+        bars['Volume'] = np.add.reduceat(df['Volume'].to_numpy(), starts)
+    if 'Dividends' in df.columns:
+        bars['Dividends'] = np.add.reduceat(df['Dividends'].fillna(0).to_numpy(dtype=np.float64), starts)
+    if 'Stock Splits' in df.columns:
+        splits = df['Stock Splits'].fillna(0).to_numpy(dtype=np.float64)
+        combined = np.multiply.reduceat(np.where(splits > 0, splits, 1.0), starts)
+        bars['Stock Splits'] = np.where(combined != 1.0, combined, 0.0)
+    bars['Bars'] = ends - starts + 1
+    return pd.DataFrame(bars, index=pd.DatetimeIndex(df.index[ends], name=df.index.name or 'Date'))
+
+
+def _prefix_marker(df: pd.DataFrame, rows: int) -> Optional[Tuple[Any, ...]]:
+    # Row count, first and last timestamp and last close of the first `rows` daily bars
+    if rows < 1 or rows > len(df):
+        return None
+    close = float(df['Close'].iloc[rows - 1]) if 'Close' in df.columns else None
+    return rows, df.index[0], df.index[rows - 1], close
+
+
+class ResampleCache:
+    """
+    LRU cache of resampled bars with incremental updates from new daily bars
+    """
+    def __init__(self, max_entries: int = RESAMPLE_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        # (symbol, resolution) -> (bars, daily rows before the last period, their marker,
+        #                         marker of all daily rows, version of the daily data)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.incremental = 0
+        self.rebuilds = 0
+
+    def get(self, symbol: str, resolution: str, daily: pd.DataFrame,
+            version: Optional[Hashable] = None) -> pd.DataFrame:
+        """
+        Resampled bars for `daily`, reusing and extending the cached ones when possible
+
+        `version` identifies the daily data (e.g. the file version it was read
+        from, taken before the read): an entry cached for the same version is
+        returned as is. Otherwise the daily bars are compared with the cached
+        ones by their bounds and last close. The returned frame is shared with
+        the cache and must not be modified.
+        """
+        if daily is None or daily.empty:
+            return resample_bars(daily, resolution)
+        key = (symbol, resolution)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if version is not None and entry[4] == version:
+                    self.hits += 1
+                    return entry[0]
+
+        full_marker = _prefix_marker(daily, len(daily))
+        bars = None
+        if entry is not None:
+            cached, stable_rows, marker, cached_full_marker, _ = entry
+            if cached_full_marker == full_marker:
+                with self._lock:
+                    self._entries[key] = entry[:4] + (version,)
+                    self.hits += 1
+                return cached
+            if marker is not None and _prefix_marker(daily, stable_rows) == marker:
+                # Rebuild the last (possibly incomplete) period and everything after it
+                tail = resample_bars(daily.iloc[stable_rows:], resolution)
+                bars = pd.concat([cached.iloc[:-1], tail])
+                with self._lock:
+                    self.incremental += 1
+
+        if bars is None:
+            bars = resample_bars(daily, resolution)
+            with self._lock:
+                self.rebuilds += 1
+
+        # Daily bars before the last period are final; the last period may still grow
+        stable_rows = len(daily) - int(bars['Bars'].iloc[-1])
+        with self._lock:
+            self._entries[key] = (bars, stable_rows, _prefix_marker(daily, stable_rows), full_marker, version)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return bars
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'incremental': self.incremental,
+                'rebuilds': self.rebuilds
+            }
+
+
+# Shared by every ingester in the process
+resample_cache = ResampleCache()
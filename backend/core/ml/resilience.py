@@ -0,0 +1,189 @@
+"""
+This module provides the failure handling used around upstream data providers.
+
+Calls get a deadline, failed calls are retried with jittered exponential
+backoff, and a per-provider circuit breaker stops calling an upstream that
+keeps failing: while the breaker is open, calls fail immediately with
+ProviderUnavailable so callers fall back to other providers or the cache
+instead of waiting out timeouts. After a cool-down one trial call is let
+through, and its outcome closes or re-opens the breaker.
+"""
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, Any, Callable, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderUnavailable(RuntimeError):
+    """
+    Raised without calling the upstream while its circuit breaker is open
+    """
+
+
+class ProviderTimeout(TimeoutError):
+    """
+    Raised when an upstream call exceeds its deadline
+    """
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker (closed -> open -> half-open -> closed)
+    """
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self.rejected = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go upstream now (in half-open state, only one trial call)
+        """
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                self._trial_in_flight = False
+            if self.state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != 'closed':
+                logger.info(f"Circuit for {self.name} closed again")
+            self.state = 'closed'
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == 'half_open' or (self.state == 'closed' and self.failures >= self.failure_threshold):
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                self.times_opened += 1
+                logger.warning(f"Circuit for {self.name} opened after {self.failures} consecutive failure(s); "
+                               f"failing fast for {self.reset_timeout:.0f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = None
+            if self.state == 'open':
+                retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1)
+            return {
+                'state': self.state,
+                'consecutive_failures': self.failures,
+                'times_opened': self.times_opened,
+                'rejected': self.rejected,
+                'retry_in_seconds': retry_in
+            }
+
+
+class RetryPolicy:
+    """
+    Per-attempt deadline plus jittered exponential backoff between attempts
+    """
+    def __init__(self, attempts: int = 3, timeout: Optional[float] = 15.0, base_delay: float = 0.5,
+                 max_delay: float = 8.0, no_retry: Tuple[Type[BaseException], ...] = (NotImplementedError,)):
+        self.attempts = max(1, attempts)
+        self.timeout = timeout
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.no_retry = no_retry
+
+    def delay(self, attempt: int) -> float:
+        """
+        Full-jitter backoff before retry number `attempt` (1-based)
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class ResilientCaller:
+    """
+    Runs upstream calls through a circuit breaker with deadlines and retries
+    """
+    def __init__(self, name: str, policy: Optional[RetryPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None, max_workers: int = 8):
+        self.name = name
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker(name)
+        # Deadlines are enforced by waiting on a worker; a timed-out call keeps
+        # its worker until the upstream returns, so the pool bounds those too
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-call")
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    def call(self, fn: Callable[[], Any], description: str = '') -> Any:
+        """
+        Call `fn()` with retries; raises ProviderUnavailable while the breaker is open
+        """
+        with self._lock:
+            self.calls += 1
+        last_error = None
+        for attempt in range(1, self.policy.attempts + 1):
+            if not self.breaker.allow():
+                raise ProviderUnavailable(f"{self.name} is unavailable (circuit open)") from last_error
+            try:
+                result = self._run(fn)
+            except self.policy.no_retry:
+                # Not an upstream failure (e.g. an unsupported call)
+                self.breaker.record_success()
+                raise
+            except Exception as e:
+                last_error = e
+                self.breaker.record_failure()
+                with self._lock:
+                    self.failures += 1
+                if attempt == self.policy.attempts:
+                    break
+                delay = self.policy.delay(attempt)
+                with self._lock:
+                    self.retries += 1
+                logger.info(f"{self.name} {description} failed ({e}); retry {attempt} in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+        raise last_error
+
+    def _run(self, fn: Callable[[], Any]) -> Any:
+        if self.policy.timeout is None:
+            return fn()
+        future = self._executor.submit(fn)
+        try:
+            return future.result(timeout=self.policy.timeout)
+        except FutureTimeout:
+            future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            raise ProviderTimeout(f"{self.name} did not answer within {self.policy.timeout:.1f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {
+                'calls': self.calls,
+                'retries': self.retries,
+                'timeouts': self.timeouts,
+                'failures': self.failures
+            }
+        counters['circuit'] = self.breaker.stats()
+        return counters
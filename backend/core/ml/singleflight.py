@@ -0,0 +1,95 @@
+"""
+This module provides single-flight coalescing of duplicate pipeline work.
+
+When several requests need the same expensive step at the same time (fetching a
+symbol, calculating its features, training its models for a horizon), the
+first caller runs it and the others wait for that run and share its result or
+exception instead of repeating the work and racing on the same cache files.
+"""
+import logging
+import threading
+from typing import Dict, Any, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """
+    One in-flight execution and the callers waiting on it
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one execution.
+
+    Keys are tuples whose first element names the pipeline stage, e.g.
+    ('train', 'AAPL', 'intraday'); counters are kept per stage. Only calls
+    that overlap are coalesced - once a call has finished, the next caller
+    with the same key runs it again.
+    """
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run `fn()` for `key`, or wait for the run already in flight for it
+        """
+        stage = key[0] if isinstance(key, tuple) and key else key
+        with self._lock:
+            stats = self._stats.setdefault(stage, {'executions': 0, 'coalesced': 0, 'errors': 0})
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                stats['coalesced'] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                stats['executions'] += 1
+                leader = True
+
+        if not leader:
+            logger.info(f"Joining in-flight {stage} for {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                stats['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+            if call.waiters:
+                logger.info(f"{stage} for {key} shared with {call.waiters} waiting caller(s)")
+        return call.result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Per-stage execution/coalesced/error counters and the keys currently in flight
+        """
+        with self._lock:
+            stages = {stage: dict(counts) for stage, counts in self._stats.items()}
+            executions = sum(counts['executions'] for counts in stages.values())
+            coalesced = sum(counts['coalesced'] for counts in stages.values())
+            return {
+                'executions': executions,
+                'coalesced': coalesced,
+                'saved_ratio': round(coalesced / (executions + coalesced), 4) if executions + coalesced else 0.0,
+                'in_flight': [list(key) if isinstance(key, tuple) else key for key in self._calls],
+                'stages': stages
+            }
@@ -0,0 +1,513 @@
+"""
+This module handles the on-disk columnar store for cached price history and features.
+
+Price history and calculated features are written as Parquet with typed
+columns and the DatetimeIndex preserved, so loads can be memory-mapped instead
+of re-parsing indented JSON. Feature files are split into small row groups so
+the last rows can be read without decoding the rest.
+Fundamentals and news are kept in separate compact JSON artifacts so reading
+prices never has to deserialize them.
+
+Every artifact carries a small record header (format version, row count, last
+timestamp and checksums): Parquet files keep it in the footer, JSON records on
+their first line. Integrity checks and "latest bar / price" lookups read the
+header alone.
+"""
+import logging
+import json
+import os
+import tempfile
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+import pandas as pd
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Directory configuration
+DATA_DIR = Path("data")
+DATA_CACHE_DIR = DATA_DIR / "cache"
+
+# Parquet support is optional; without pyarrow the cache falls back to JSON
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+    logger.warning("pyarrow not available, price cache will use JSON format")
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+VOLUME_COLUMN = 'Volume'
+PRICE_META_KEY = b'trading.price_history_metadata'
+RECORD_META_KEY = b'trading.record'
+RECORD_FORMAT_VERSION = 1
+PARQUET_COMPRESSION = 'snappy'
+# Rows per Parquet row group in feature files (the unit of a tail read; more
+# groups make the footer, parsed on every open, slower)
+FEATURE_ROW_GROUP_SIZE = 1024
+# Relative tolerance when comparing re-fetched bars against cached ones
+RESTATEMENT_RTOL = 1e-6
+
+
+def price_cache_path(symbol: str, cache_dir: Path = DATA_CACHE_DIR) -> Path:
+    """
+    Path of the columnar price history file for a symbol
+    """
+    return cache_dir / f"{symbol}_data.parquet"
+
+
+def legacy_cache_path(symbol: str, cache_dir: Path = DATA_CACHE_DIR) -> Path:
+    """
+    Path of the JSON cache file (a full legacy cache, or the JSON price
+    history when pyarrow is not installed)
+    """
+    return cache_dir / f"{symbol}_all_data.json"
+
+
+def fundamentals_cache_path(symbol: str, cache_dir: Path = DATA_CACHE_DIR) -> Path:
+    """
+    Path of the company info / financials / recommendations artifact
+    """
+    return cache_dir / f"{symbol}_fundamentals.json"
+
+
+def news_cache_path(symbol: str, cache_dir: Path = DATA_CACHE_DIR) -> Path:
+    """
+    Path of the news artifact
+    """
+    return cache_dir / f"{symbol}_news.json"
+
+
+class CorruptRecordError(ValueError):
+    """
+    A cached artifact whose content does not match its record header
+    """
+
+
+def frame_checksums(df: pd.DataFrame) -> Dict[str, str]:
+    """
+    CRC32 of the index and of every column of a frame, as hex strings.
+
+    Timestamps are hashed at ns resolution so the checksum does not depend on
+    the datetime unit pandas picks when the file is read back.
+    """
+    checksums = {}
+    if isinstance(df.index, pd.DatetimeIndex):
+        checksums['__index__'] = _crc(df.index.as_unit('ns').asi8)
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            data = pd.DatetimeIndex(values).as_unit('ns').asi8
+        elif pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+            data = values.to_numpy()
+        else:
+            data = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        checksums[str(col)] = _crc(data)
+    return checksums
+
+
+def _crc(values: np.ndarray) -> str:
+    return f"{zlib.crc32(np.ascontiguousarray(values).tobytes()) & 0xffffffff:08x}"
+
+
+def frame_summary(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Header fields describing a frame: rows, first/last timestamp and the last close
+    """
+    summary = {'rows': len(df)}
+    if len(df) and isinstance(df.index, pd.DatetimeIndex):
+        summary['first_timestamp'] = df.index[0].isoformat()
+        summary['last_timestamp'] = df.index[-1].isoformat()
+    if len(df) and 'Close' in df.columns:
+        last_close = df['Close'].iloc[-1]
+        summary['last_close'] = float(last_close) if pd.notna(last_close) else None
+    return summary
+
+
+def record_header(kind: str, summary: Optional[Dict[str, Any]] = None, **fields) -> Dict[str, Any]:
+    header = {'format_version': RECORD_FORMAT_VERSION, 'kind': kind, 'written_at': datetime.now().isoformat()}
+    header.update(summary or {})
+    header.update(fields)
+    return header
+
+
+def read_record_header(path: Path) -> Dict[str, Any]:
+    """
+    Read an artifact's record header without reading its body.
+
+    Returns {} for files written before headers existed. Raises
+    CorruptRecordError if the header itself is unreadable (e.g. a truncated
+    Parquet footer).
+    """
+    if path.suffix == '.parquet':
+        try:
+            schema_metadata = pq.ParquetFile(path, memory_map=True).schema_arrow.metadata or {}
+        except (OSError, pa.ArrowInvalid) as e:
+            raise CorruptRecordError(f"Unreadable Parquet footer in {path}: {e}") from e
+        raw = schema_metadata.get(RECORD_META_KEY)
+        return json.loads(raw) if raw else {}
+    with open(path, 'rb') as f:
+        first_line = f.readline()
+    return _parse_json_header(first_line) or {}
+
+
+def _parse_json_header(line: bytes) -> Optional[Dict[str, Any]]:
+    if not line.startswith(b'{"_record":'):
+        return None
+    try:
+        return json.loads(line)['_record']
+    except (ValueError, KeyError) as e:
+        raise CorruptRecordError(f"Unreadable record header: {e}") from e
+
+
+def split_legacy_payload(data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Split the non-price keys of a legacy cache into (fundamentals, news) artifacts
+    """
+    fetched_at = data.get('fetch_time') or (data.get('metadata') or {}).get('fetch_timestamp')
+    fundamentals = {
+        'company_info': data.get('company_info') or data.get('info') or {},
+        'financials': data.get('financials') or {},
+        'recommendations': data.get('recommendations'),
+        'fetched_at': fetched_at
+    }
+    if 'key_metrics' in data:
+        fundamentals['key_metrics'] = data['key_metrics']
+    news = {'news': data.get('news') or [], 'fetched_at': fetched_at}
+    return fundamentals, news
+
+
+def normalize_price_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sort, de-duplicate and type a price history frame for storage.
+
+    The index is kept as a tz-naive DatetimeIndex in exchange-local wall time,
+    prices are float64 and volume is int64.
+    """
+    df = df.copy()
+    if not isinstance(df.index, pd.DatetimeIndex):
+        df.index = pd.DatetimeIndex(_parse_timestamps(df.index))
+    if df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    df.index.name = 'Date'
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+
+    for col in df.columns:
+        if col == VOLUME_COLUMN:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(np.int64)
+        else:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(np.float64)
+    return df
+
+
+def price_frame_from_json(payload: Any) -> Optional[pd.DataFrame]:
+    """
+    Rebuild a price history DataFrame from any of the JSON layouts the
+    cache has used: list of records, orient='list' columns, or orient='dict'.
+    """
+    if isinstance(payload, list):
+        df = pd.DataFrame.from_records(payload)
+    elif isinstance(payload, dict):
+        df = pd.DataFrame(payload)
+    else:
+        return None
+
+    if df.empty:
+        return None
+
+    for date_col in ['Date', 'Datetime', 'index']:
+        if date_col in df.columns:
+            df = df.set_index(date_col)
+            break
+    df.index = _parse_timestamps(df.index)
+    return normalize_price_frame(df)
+
+
+def _parse_timestamps(values) -> pd.DatetimeIndex:
+    """
+    Parse cached timestamp strings, keeping exchange-local wall time.
+
+    yfinance dates carry per-row UTC offsets (e.g. -05:00 / -04:00 across DST),
+    which pandas cannot combine into one tz-aware index, so offsets are dropped.
+    """
+    strings = pd.Index(values).astype(str).str.replace(r'(Z|[+-]\d{2}:?\d{2})$', '', regex=True)
+    return pd.DatetimeIndex(pd.to_datetime(strings, format='ISO8601'))
+
+
+def write_price_frame(df: pd.DataFrame, path: Path, metadata: Optional[Dict[str, Any]] = None):
+    """
+    Write price history to a Parquet file using an atomic temp-file rename.
+
+    `metadata` (e.g. data source and fetch time) is stored in the file footer.
+    """
+    if not PARQUET_AVAILABLE:
+        raise RuntimeError("pyarrow is required to write the columnar price cache")
+
+    df = normalize_price_frame(df)
+    header = record_header('price_history', frame_summary(df), checksums=frame_checksums(df))
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    schema_metadata = dict(table.schema.metadata or {})
+    schema_metadata[PRICE_META_KEY] = json.dumps(metadata or {}, default=str).encode('utf-8')
+    schema_metadata[RECORD_META_KEY] = json.dumps(header).encode('utf-8')
+    table = table.replace_schema_metadata(schema_metadata)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    os.close(temp_fd)
+    try:
+        pq.write_table(table, temp_path, compression=PARQUET_COMPRESSION)
+        os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def read_price_frame(path: Path, columns: Optional[List[str]] = None, verify: bool = True) -> pd.DataFrame:
+    """
+    Read price history from a Parquet file via a memory map.
+
+    Only the requested `columns` are decoded; the DatetimeIndex is always restored.
+    With `verify`, the decoded columns are checked against the header
+    checksums and CorruptRecordError is raised on a mismatch.
+    """
+    # ParquetFile skips the dataset discovery that pq.read_table does, which
+    # dominates the cost for files of this size
+    parquet_file = pq.ParquetFile(path, memory_map=True)
+    df = parquet_file.read(columns=columns, use_pandas_metadata=True).to_pandas()
+    if verify:
+        raw = (parquet_file.schema_arrow.metadata or {}).get(RECORD_META_KEY)
+        if raw:
+            verify_frame(df, json.loads(raw), path)
+    return df
+
+
+def verify_frame(df: pd.DataFrame, header: Dict[str, Any], path: Path):
+    """
+    Check a decoded frame against its record header (rows and per-column checksums)
+    """
+    if header.get('rows') is not None and header['rows'] != len(df):
+        raise CorruptRecordError(f"{path}: header says {header['rows']} rows, read {len(df)}")
+    expected = header.get('checksums') or {}
+    actual = frame_checksums(df)
+    for key, checksum in actual.items():
+        if key in expected and expected[key] != checksum:
+            raise CorruptRecordError(f"{path}: checksum mismatch in {key}")
+
+
+def write_feature_frame(df: pd.DataFrame, path: Path, fields: Optional[Dict[str, Any]] = None):
+    """
+    Write a feature frame to Parquet using an atomic temp-file rename.
+
+    `fields` (feature version, indicator state, ...) are stored in the record
+    header. Rows are written in groups of FEATURE_ROW_GROUP_SIZE with page
+    checksums, so tail reads that skip most of the file are verified too.
+    """
+    if not PARQUET_AVAILABLE:
+        raise RuntimeError("pyarrow is required to write the columnar feature store")
+
+    header = record_header('features', frame_summary(df), checksums=frame_checksums(df), **(fields or {}))
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    schema_metadata = dict(table.schema.metadata or {})
+    schema_metadata[RECORD_META_KEY] = json.dumps(header, default=str).encode('utf-8')
+    table = table.replace_schema_metadata(schema_metadata)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    os.close(temp_fd)
+    try:
+        # Float features rarely repeat and are never filtered on, so no dictionaries or statistics
+        pq.write_table(table, temp_path, compression=PARQUET_COMPRESSION, row_group_size=FEATURE_ROW_GROUP_SIZE,
+                       use_dictionary=False, write_statistics=False, write_page_checksum=True)
+        os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def read_feature_frame(path: Path, columns: Optional[List[str]] = None, tail: Optional[int] = None,
+                       verify: bool = True) -> pd.DataFrame:
+    """
+    Read a feature frame (or only its `columns` and last `tail` rows) via a memory map.
+
+    A tail read decodes only the trailing row groups that hold those rows.
+    With `verify`, page checksums are checked, and full reads are also
+    checked against the header checksums; CorruptRecordError is raised on a
+    mismatch.
+    """
+    try:
+        parquet_file = pq.ParquetFile(path, memory_map=True, page_checksum_verification=verify)
+        if tail is None:
+            df = parquet_file.read(columns=columns, use_pandas_metadata=True).to_pandas()
+        else:
+            groups = []
+            rows = 0
+            for group in range(parquet_file.num_row_groups - 1, -1, -1):
+                if rows >= tail:
+                    break
+                groups.insert(0, group)
+                rows += parquet_file.metadata.row_group(group).num_rows
+            df = parquet_file.read_row_groups(groups, columns=columns, use_pandas_metadata=True).to_pandas()
+            df = df.iloc[max(0, len(df) - tail):]
+    except (OSError, pa.ArrowInvalid) as e:
+        raise CorruptRecordError(f"Unreadable feature file {path}: {e}") from e
+    if verify and tail is None:
+        raw = (parquet_file.schema_arrow.metadata or {}).get(RECORD_META_KEY)
+        if raw:
+            verify_frame(df, json.loads(raw), path)
+    return df
+
+
+def read_price_metadata(path: Path) -> Dict[str, Any]:
+    """
+    Read the metadata stored in a price file footer without loading any rows
+    """
+    schema_metadata = pq.ParquetFile(path, memory_map=True).schema_arrow.metadata or {}
+    raw = schema_metadata.get(PRICE_META_KEY)
+    return json.loads(raw) if raw else {}
+
+
+def merge_price_frames(cached: pd.DataFrame, delta: pd.DataFrame,
+                       rtol: float = RESTATEMENT_RTOL) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Append a freshly fetched `delta` to the `cached` history.
+
+    Bars present in both frames are compared on OHLC prices. A mismatch on the
+    last cached bar is a normal repair (that bar was still forming when it was
+    cached) and the new values win. A mismatch on any earlier bar means the
+    provider restated history (e.g. a split or dividend back-adjustment), which
+    is reported via `restated` so the caller can decide how to rebuild.
+    """
+    cached = normalize_price_frame(cached)
+    delta = normalize_price_frame(delta)
+
+    overlap = cached.index.intersection(delta.index)
+    columns = [col for col in PRICE_COLUMNS if col in cached.columns and col in delta.columns]
+    if len(overlap) and columns:
+        old = cached.loc[overlap, columns].to_numpy()
+        new = delta.loc[overlap, columns].to_numpy()
+        changed = ~np.isclose(old, new, rtol=rtol, equal_nan=True).all(axis=1)
+    else:
+        changed = np.zeros(len(overlap), dtype=bool)
+
+    changed_index = overlap[changed]
+    restated_index = changed_index[changed_index < cached.index[-1]]
+
+    merged = pd.concat([cached[cached.index < delta.index[0]], delta]) if len(delta) else cached
+    merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+
+    info = {
+        'appended': int((delta.index > cached.index[-1]).sum()),
+        'repaired': int(len(changed_index)),
+        'overlap': int(len(overlap)),
+        'restated': bool(len(restated_index)),
+        'restated_from': str(restated_index[0]) if len(restated_index) else None
+    }
+    return merged, info
+
+
+def write_json_record(data: Dict[str, Any], path: Path, kind: str,
+                      summary: Optional[Dict[str, Any]] = None):
+    """
+    Write a compact JSON record using an atomic temp-file rename.
+
+    The first line is the record header (with the body's size and CRC32 and
+    any `summary` fields), the second line the JSON body.
+    """
+    body = json.dumps(data, default=str, separators=(',', ':')).encode('utf-8')
+    header = record_header(kind, summary, bytes=len(body), checksum=f"{zlib.crc32(body) & 0xffffffff:08x}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(temp_fd, 'wb') as f:
+            f.write(json.dumps({'_record': header}, default=str, separators=(',', ':')).encode('utf-8'))
+            f.write(b'\n')
+            f.write(body)
+        os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def read_json_record(path: Path, verify: bool = True) -> Tuple[Dict[str, Any], Any]:
+    """
+    Read a JSON record as (header, body).
+
+    Plain JSON files written before record headers existed are returned with
+    an empty header. With `verify`, the body's size and CRC32 are checked and
+    CorruptRecordError is raised on a mismatch.
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    first_line, _, rest = raw.partition(b'\n')
+    header = _parse_json_header(first_line)
+    if header is None:
+        return {}, json.loads(raw)
+    if verify:
+        if header.get('bytes') is not None and header['bytes'] != len(rest):
+            raise CorruptRecordError(f"{path}: header says {header['bytes']} bytes, found {len(rest)}")
+        if header.get('checksum') and header['checksum'] != f"{zlib.crc32(rest) & 0xffffffff:08x}":
+            raise CorruptRecordError(f"{path}: checksum mismatch")
+    return header, json.loads(rest)
+
+
+def migrate_json_cache(json_path: Path) -> bool:
+    """
+    Split a legacy `{symbol}_all_data.json` cache into separate artifacts.
+
+    Price history moves to the columnar store and fundamentals / news to their
+    own JSON files, after which the legacy file is removed. A file without
+    usable price history is left in place. Returns True if the file was migrated.
+    """
+    _, data = read_json_record(json_path)
+
+    symbol = json_path.name[:-len('_all_data.json')]
+    cache_dir = json_path.parent
+
+    df = price_frame_from_json(data.pop('price_history', None))
+    if df is None or df.empty:
+        logger.warning(f"No usable price history in {json_path}, leaving it unchanged")
+        return False
+    metadata = dict(data.pop('price_history_metadata', None) or data.get('metadata') or {})
+    metadata.setdefault('rows', len(df))
+    write_price_frame(df, price_cache_path(symbol, cache_dir), metadata)
+    logger.info(f"Migrated {len(df)} price rows for {symbol} to {price_cache_path(symbol, cache_dir)}")
+
+    fundamentals, news = split_legacy_payload(data)
+    if not fundamentals_cache_path(symbol, cache_dir).exists():
+        write_json_record(fundamentals, fundamentals_cache_path(symbol, cache_dir), 'fundamentals')
+    if not news_cache_path(symbol, cache_dir).exists():
+        write_json_record(news, news_cache_path(symbol, cache_dir), 'news', {'rows': len(news['news'])})
+
+    json_path.unlink()
+    return True
+
+
+def migrate_json_caches(cache_dir: Path = DATA_CACHE_DIR) -> Dict[str, Any]:
+    """
+    One-shot migration of every legacy `{symbol}_all_data.json` cache in `cache_dir`
+    """
+    summary = {'migrated': [], 'skipped': [], 'failed': {}}
+    for json_path in sorted(cache_dir.glob("*_all_data.json")):
+        symbol = json_path.name[:-len('_all_data.json')]
+        try:
+            if migrate_json_cache(json_path):
+                summary['migrated'].append(symbol)
+            else:
+                summary['skipped'].append(symbol)
+        except Exception as e:
+            logger.error(f"Failed to migrate cache for {symbol}: {e}")
+            summary['failed'][symbol] = str(e)
+    return summary
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    result = migrate_json_caches()
+    logger.info(f"Migrated: {len(result['migrated'])}, skipped: {len(result['skipped'])}, "
+                f"failed: {len(result['failed'])}")
@@ -0,0 +1,444 @@
+"""
+This module computes the technical indicators of FeatureEngineer one bar at a time.
+
+Every indicator is a small stateful object whose `update` consumes the next
+value (or bar) and returns the indicator's current value in O(1) time and
+O(window) memory, so a live bar feed never recomputes over a DataFrame.
+Results follow the batch definitions in `FeatureEngineer.calculate_all_features`
+(pandas rolling/ewm semantics, including NaN until a window is full and
+skipped NaN inputs): rolling sums are Kahan-compensated and rolling variance
+uses Welford's add/remove updates like pandas, so values agree with the batch
+path to floating-point rounding (checked by backend/test_streaming.py).
+Every indicator also has a `peek` that returns the value the next input would
+give without consuming it, in the same O(1) time, for a bar that is still
+forming.
+"""
+import logging
+import math
+from collections import deque
+from typing import Dict, Tuple
+import pandas as pd
+import numpy as np
+
+from .primitives import NAN, SMA_PERIODS, EMA
+
+logger = logging.getLogger(__name__)
+
+
+def _divide(numerator: float, denominator: float) -> float:
+    # IEEE division like pandas/NumPy (x/0 -> +-inf, 0/0 -> nan) instead of ZeroDivisionError
+    if denominator == 0:
+        if numerator != numerator or numerator == 0:
+            return NAN
+        return math.copysign(math.inf, numerator) * math.copysign(1.0, denominator)
+    return numerator / denominator
+
+
+class _Window:
+    """
+    Fixed-length ring of the last `period` inputs with a count of the non-NaN ones
+    """
+    def __init__(self, period: int):
+        self.period = period
+        self._values = [NAN] * period
+        self._position = 0
+        self.count = 0
+
+    def push(self, value: float) -> float:
+        """
+        Store `value` and return the input that dropped out of the window (NaN if none)
+        """
+        evicted = self._values[self._position]
+        self._values[self._position] = value
+        self._position = (self._position + 1) % self.period
+        if evicted == evicted:
+            self.count -= 1
+        if value == value:
+            self.count += 1
+        return evicted
+
+    def peek(self, value: float) -> Tuple[float, int]:
+        """
+        The input `push(value)` would evict and the count after it, without pushing
+        """
+        evicted = self._values[self._position]
+        return evicted, self.count - (evicted == evicted) + (value == value)
+
+
+def _kahan_add(total: float, compensation: float, value: float) -> Tuple[float, float]:
+    # Kahan summation, as pandas' rolling mean
+    y = value - compensation
+    t = total + y
+    return t, t - total - y
+
+
+def _welford_add(nobs: int, mean: float, ssqdm: float, value: float) -> Tuple[int, float, float]:
+    nobs += 1
+    delta = value - mean
+    mean += delta / nobs
+    return nobs, mean, ssqdm + delta * (value - mean)
+
+
+def _welford_remove(nobs: int, mean: float, ssqdm: float, value: float) -> Tuple[int, float, float]:
+    nobs -= 1
+    if not nobs:
+        return 0, 0.0, 0.0
+    delta = value - mean
+    mean -= delta / nobs
+    return nobs, mean, ssqdm - delta * (value - mean)
+
+
+class SMA:
+    """
+    Simple moving average (rolling(period).mean())
+    """
+    def __init__(self, period: int):
+        self.period = period
+        self._window = _Window(period)
+        self._total = 0.0
+        self._compensation = 0.0
+        self.value = NAN
+
+    def update(self, value: float) -> float:
+        evicted = self._window.push(value)
+        self._total, self._compensation = self._sum(evicted, value)
+        self.value = self._mean(self._total, self._window.count)
+        return self.value
+
+    def peek(self, value: float) -> float:
+        evicted, count = self._window.peek(value)
+        return self._mean(self._sum(evicted, value)[0], count)
+
+    def _sum(self, evicted: float, value: float) -> Tuple[float, float]:
+        total, compensation = self._total, self._compensation
+        if evicted == evicted:
+            total, compensation = _kahan_add(total, compensation, -evicted)
+        if value == value:
+            total, compensation = _kahan_add(total, compensation, value)
+        return total, compensation
+
+    def _mean(self, total: float, count: int) -> float:
+        return NAN if count < self.period else total / count
+
+
+class STD:
+    """
+    Rolling sample standard deviation (rolling(period).std(), ddof=1)
+    """
+    def __init__(self, period: int, ddof: int = 1):
+        self.period = period
+        self.ddof = ddof
+        self._window = _Window(period)
+        self._nobs = 0
+        self._mean = 0.0
+        self._ssqdm = 0.0
+        # Length of the run of identical inputs ending at the newest one
+        self._same = 0
+        self._previous = NAN
+        self.value = NAN
+
+    def update(self, value: float) -> float:
+        evicted = self._window.push(value)
+        self._nobs, self._mean, self._ssqdm = self._moments(evicted, value)
+        self._same = self._same + 1 if value == self._previous else 1
+        self._previous = value
+        self.value = self._std(self._window.count, self._nobs, self._ssqdm, self._same)
+        return self.value
+
+    def peek(self, value: float) -> float:
+        evicted, count = self._window.peek(value)
+        nobs, _, ssqdm = self._moments(evicted, value)
+        same = self._same + 1 if value == self._previous else 1
+        return self._std(count, nobs, ssqdm, same)
+
+    def _moments(self, evicted: float, value: float) -> Tuple[int, float, float]:
+        moments = (self._nobs, self._mean, self._ssqdm)
+        if evicted == evicted:
+            moments = _welford_remove(*moments, evicted)
+        if value == value:
+            moments = _welford_add(*moments, value)
+        return moments
+
+    def _std(self, count: int, nobs: int, ssqdm: float, same: int) -> float:
+        if count < self.period or nobs <= self.ddof:
+            return NAN
+        if same >= nobs:
+            # Constant window: exactly zero, not Welford's rounding residue
+            return 0.0
+        return math.sqrt(max(ssqdm, 0.0) / (nobs - self.ddof))
+
+
+class _RollingExtreme:
+    """
+    Rolling max (or min) over a monotonic deque: amortized O(1) per update
+    """
+    def __init__(self, period: int, sign: float):
+        self.period = period
+        self._sign = sign
+        self._window = _Window(period)
+        self._deque = deque()  # (bar number, sign * value), decreasing values
+        self._bar = 0
+        self.value = NAN
+
+    def update(self, value: float) -> float:
+        self._window.push(value)
+        bar = self._bar
+        self._bar += 1
+        while self._deque and self._deque[0][0] <= bar - self.period:
+            self._deque.popleft()
+        if value == value:
+            keyed = self._sign * value
+            while self._deque and self._deque[-1][1] <= keyed:
+                self._deque.pop()
+            self._deque.append((bar, keyed))
+        if self._window.count < self.period:
+            self.value = NAN
+        else:
+            self.value = self._sign * self._deque[0][1]
+        return self.value
+
+    def peek(self, value: float) -> float:
+        _, count = self._window.peek(value)
+        if count < self.period:
+            return NAN
+        # Expired entries are dropped every update, so at most the front one drops out now
+        front = 1 if self._deque and self._deque[0][0] <= self._bar - self.period else 0
+        candidates = [self._deque[front][1]] if len(self._deque) > front else []
+        if value == value:
+            candidates.append(self._sign * value)
+        return self._sign * max(candidates)
+
+
+class RollingMax(_RollingExtreme):
+    """
+    Rolling maximum (rolling(period).max())
+    """
+    def __init__(self, period: int):
+        super().__init__(period, 1.0)
+
+
+class RollingMin(_RollingExtreme):
+    """
+    Rolling minimum (rolling(period).min())
+    """
+    def __init__(self, period: int):
+        super().__init__(period, -1.0)
+
+
+class RSI:
+    """
+    Relative Strength Index over simple averages of gains and losses (as the batch RSI_14)
+    """
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._gain = SMA(period)
+        self._loss = SMA(period)
+        self._previous = NAN
+        self.value = NAN
+
+    def update(self, close: float) -> float:
+        self.value = self._rsi(close, 'update')
+        self._previous = close
+        return self.value
+
+    def peek(self, close: float) -> float:
+        return self._rsi(close, 'peek')
+
+    def _rsi(self, close: float, step: str) -> float:
+        delta = close - self._previous
+        # A NaN change counts as no gain and no loss, as delta.where(...) does
+        gain = getattr(self._gain, step)(delta if delta > 0 else 0.0)
+        loss = getattr(self._loss, step)(-delta if delta < 0 else 0.0)
+        return 100 - _divide(100, 1 + _divide(gain, loss))
+
+
+class MACD:
+    """
+    MACD line, signal line and histogram
+    """
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, close: float) -> Tuple[float, float, float]:
+        self.value = self._macd(close, 'update')
+        return self.value
+
+    def peek(self, close: float) -> Tuple[float, float, float]:
+        return self._macd(close, 'peek')
+
+    def _macd(self, close: float, step: str) -> Tuple[float, float, float]:
+        macd = getattr(self.fast, step)(close) - getattr(self.slow, step)(close)
+        signal = getattr(self.signal, step)(macd)
+        return (macd, signal, macd - signal)
+
+
+class Bollinger:
+    """
+    Bollinger Bands: (middle, upper, lower) at `k` standard deviations
+    """
+    def __init__(self, period: int = 20, k: float = 2.0):
+        self.k = k
+        self._mean = SMA(period)
+        self._std = STD(period)
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, close: float) -> Tuple[float, float, float]:
+        self.value = self._bands(self._mean.update(close), self._std.update(close))
+        return self.value
+
+    def peek(self, close: float) -> Tuple[float, float, float]:
+        return self._bands(self._mean.peek(close), self._std.peek(close))
+
+    def _bands(self, middle: float, std: float) -> Tuple[float, float, float]:
+        return (middle, middle + std * self.k, middle - std * self.k)
+
+
+class ATR:
+    """
+    Average True Range over a simple average of true ranges (as the batch ATR)
+    """
+    def __init__(self, period: int = 14):
+        self._mean = SMA(period)
+        self._previous_close = NAN
+        self.value = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        self.value = self._mean.update(self._true_range(high, low))
+        self._previous_close = close
+        return self.value
+
+    def peek(self, high: float, low: float, close: float) -> float:
+        return self._mean.peek(self._true_range(high, low))
+
+    def _true_range(self, high: float, low: float) -> float:
+        previous = self._previous_close
+        # np.maximum semantics: any NaN operand makes the true range NaN
+        ranges = (high - low, abs(high - previous), abs(low - previous))
+        return NAN if any(r != r for r in ranges) else max(ranges)
+
+
+class OBV:
+    """
+    On-Balance Volume running total
+    """
+    def __init__(self, total: float = 0):
+        self.value = total
+        self._previous = NAN
+        self._started = False
+
+    def update(self, close: float, volume: float) -> float:
+        self.value = self.peek(close, volume)
+        self._started = True
+        self._previous = close
+        return self.value
+
+    def peek(self, close: float, volume: float) -> float:
+        if self._started:
+            if close > self._previous:
+                return self.value + volume
+            if close < self._previous:
+                return self.value - volume
+        return self.value
+
+
+class StreamingFeatures:
+    """
+    All FeatureEngineer indicators for one symbol, updated one bar at a time
+    """
+    def __init__(self):
+        self.bars = 0
+        self._previous_close = NAN
+        self._previous_high = NAN
+        self._previous_low = NAN
+        self._return_mean = SMA(5)
+        self._sma = {period: SMA(period) for period in SMA_PERIODS}
+        self._ema_12 = EMA(12)
+        self._ema_26 = EMA(26)
+        self._std_20 = STD(20)
+        self._volatility = STD(20)
+        self._bollinger = Bollinger(20, 2.0)
+        self._rsi = RSI(14)
+        self._macd_signal = EMA(9)
+        self._volume_sma = SMA(20)
+        self._obv = OBV()
+        self._atr = ATR(14)
+        self._low_50 = RollingMin(50)
+        self._high_50 = RollingMax(50)
+        self.value = {}
+
+    def update(self, open_: float, high: float, low: float, close: float, volume: float) -> Dict[str, float]:
+        """
+        Consume the next bar and return every feature for it (NaN until warmed up)
+        """
+        features = self._features(open_, high, low, close, volume, 'update')
+        self._previous_close = close
+        self._previous_high = high
+        self._previous_low = low
+        self.bars += 1
+        self.value = features
+        return features
+
+    def _features(self, open_: float, high: float, low: float, close: float, volume: float,
+                  step: str) -> Dict[str, float]:
+        # `step` is 'update' (consume the bar) or 'peek' (leave every indicator unchanged)
+        daily_return = _divide(close, self._previous_close) - 1
+        features = {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume,
+                    'daily_return': daily_return,
+                    'daily_return_ma_5': getattr(self._return_mean, step)(daily_return)}
+        for period, sma in self._sma.items():
+            features[f'SMA_{period}'] = getattr(sma, step)(close)
+            features[f'price_to_sma_{period}'] = _divide(close, features[f'SMA_{period}'])
+        features['EMA_12'] = getattr(self._ema_12, step)(close)
+        features['EMA_26'] = getattr(self._ema_26, step)(close)
+        features['STD_20'] = getattr(self._std_20, step)(close)
+        features['volatility_20'] = getattr(self._volatility, step)(daily_return) * math.sqrt(252)
+
+        middle, upper, lower = getattr(self._bollinger, step)(close)
+        features['BB_middle'] = middle
+        features['BB_upper'] = upper
+        features['BB_lower'] = lower
+        features['BB_width'] = upper - lower
+        features['BB_pct'] = _divide(close - lower, upper - lower)
+
+        features['RSI_14'] = getattr(self._rsi, step)(close)
+        macd = features['EMA_12'] - features['EMA_26']
+        features['MACD'] = macd
+        features['MACD_signal'] = getattr(self._macd_signal, step)(macd)
+        features['MACD_hist'] = macd - features['MACD_signal']
+
+        features['Volume_SMA_20'] = getattr(self._volume_sma, step)(volume)
+        features['volume_ratio'] = _divide(volume, features['Volume_SMA_20'])
+        features['OBV'] = getattr(self._obv, step)(close, volume)
+        features['ATR'] = getattr(self._atr, step)(high, low, close)
+
+        features['higher_high'] = int(high > self._previous_high)
+        features['lower_low'] = int(low < self._previous_low)
+        low_50 = getattr(self._low_50, step)(low)
+        high_50 = getattr(self._high_50, step)(high)
+        features['price_position'] = _divide(close - low_50, high_50 - low_50)
+        return features
+
+    @property
+    def ready(self) -> bool:
+        """
+        Whether every feature of the last bar is defined (the batch path would keep the row)
+        """
+        return bool(self.value) and not any(v != v for v in self.value.values())
+
+    def peek(self, open_: float, high: float, low: float, close: float, volume: float) -> Dict[str, float]:
+        """
+        Features for a bar that may still change (the forming bar) without consuming it, in O(1)
+        """
+        return self._features(open_, high, low, close, volume, 'peek')
+
+    def feed(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Consume every bar of an OHLCV frame; returns the features of each bar
+        """
+        columns = [df[field].to_numpy(dtype=np.float64) for field in ['Open', 'High', 'Low', 'Close', 'Volume']]
+        rows = [self.update(*bar) for bar in zip(*columns)]
+        return pd.DataFrame(rows, index=df.index)
+
@@ -0,0 +1,217 @@
+"""
+This module generates synthetic daily OHLCV markets for offline runs, benchmarks and load tests.
+
+Every symbol gets its own deterministic random streams (derived from the
+market seed and the symbol name), so a symbol's history does not depend on
+which other symbols are generated, and extending the end date only appends
+bars. Prices follow a regime-switching geometric random walk with overnight
+gaps and occasional stock splits; all bars are generated with array
+operations, without per-row Python loops.
+"""
+import logging
+import zlib
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+import pandas as pd
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_PER_YEAR = 252
+# Regular session used for synthetic intraday bars (09:30-16:00)
+SESSION_OPEN_MINUTES = 9 * 60 + 30
+SESSION_MINUTES = 390
+
+# Market regimes: name -> (annualized drift, annualized volatility)
+DEFAULT_REGIMES = {
+    'bull': (0.18, 0.16),
+    'sideways': (0.02, 0.12),
+    'bear': (-0.22, 0.28),
+    'crisis': (-0.60, 0.65)
+}
+# Relative frequency with which each regime is entered
+DEFAULT_REGIME_WEIGHTS = {'bull': 0.45, 'sideways': 0.35, 'bear': 0.15, 'crisis': 0.05}
+
+# One independent random stream per generated array, so that every array is
+# prefix-stable: generating more bars never changes the earlier ones
+_STREAMS = ['start', 'regime_switch', 'regime_pick', 'overnight', 'intraday', 'gap_days', 'gap_sizes',
+            'high_range', 'low_range', 'volume', 'split_days', 'split_ratios']
+
+
+class SyntheticMarket:
+    """
+    Seeded generator of daily OHLCV bars for any number of symbols.
+
+    Bars run on business days from `origin`. With `adjusted=True` (the
+    default, matching yfinance's auto-adjusted history) prices and volumes
+    before each split are back-adjusted to the latest share count; otherwise
+    raw prices drop on the split date. The `Stock Splits` column carries the
+    split ratio on split dates either way.
+    """
+    def __init__(self, seed: int = 42, origin: str = "2000-01-03",
+                 regimes: Optional[Dict[str, Tuple[float, float]]] = None,
+                 regime_weights: Optional[Dict[str, float]] = None,
+                 regime_switch_prob: float = 1 / 126, gap_prob: float = 0.02, gap_vol: float = 0.04,
+                 split_prob: float = 1 / 2500, split_ratios: Tuple[float, ...] = (2.0, 3.0, 4.0),
+                 adjusted: bool = True):
+        self.seed = seed
+        self.origin = pd.Timestamp(origin).normalize()
+        self.regimes = dict(regimes or DEFAULT_REGIMES)
+        weights = regime_weights or {name: DEFAULT_REGIME_WEIGHTS.get(name, 1.0) for name in self.regimes}
+        total = sum(weights[name] for name in self.regimes)
+        self._regime_names = list(self.regimes)
+        self._regime_p = np.array([weights[name] / total for name in self._regime_names])
+        self._regime_drift = np.array([self.regimes[name][0] for name in self._regime_names])
+        self._regime_vol = np.array([self.regimes[name][1] for name in self._regime_names])
+        self.regime_switch_prob = regime_switch_prob
+        self.gap_prob = gap_prob
+        self.gap_vol = gap_vol
+        self.split_prob = split_prob
+        self.split_ratios = np.asarray(split_ratios, dtype=np.float64)
+        self.adjusted = adjusted
+
+    def dates(self, end: Optional[datetime] = None) -> pd.DatetimeIndex:
+        """
+        Business-day calendar from the origin through `end` (default: today)
+        """
+        end = pd.Timestamp(end if end is not None else datetime.now()).normalize()
+        return pd.bdate_range(self.origin, end, name='Date')
+
+    def universe(self, n: int, prefix: str = "SYN") -> List[str]:
+        """
+        Symbol names for an n-symbol synthetic universe
+        """
+        width = max(4, len(str(n)))
+        return [f"{prefix}{i:0{width}d}" for i in range(n)]
+
+    def history(self, symbol: str, start: Optional[datetime] = None,
+                end: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        Daily bars for `symbol` between `start` and `end` (inclusive)
+        """
+        dates = self.dates(end)
+        df = pd.DataFrame(self.generate(symbol, len(dates)), index=dates)
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        return df
+
+    def generate(self, symbol: str, n_bars: int) -> Dict[str, np.ndarray]:
+        """
+        Generate `n_bars` bars from the origin as column arrays
+        """
+        if n_bars <= 0:
+            return {col: np.zeros(0, dtype=np.int64 if col == 'Volume' else np.float64)
+                    for col in ['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits']}
+        rng = {name: self._rng(symbol, stream) for stream, name in enumerate(_STREAMS)}
+
+        # Regimes: switch days are Bernoulli, each new segment draws its regime
+        switches = rng['regime_switch'].random(n_bars) < self.regime_switch_prob
+        segment = np.cumsum(switches)
+        segment_regime = rng['regime_pick'].choice(len(self._regime_names), size=segment[-1] + 1,
+                                                    p=self._regime_p)
+        regime = segment_regime[segment]
+        drift = self._regime_drift[regime] / TRADING_DAYS_PER_YEAR
+        vol = self._regime_vol[regime] / np.sqrt(TRADING_DAYS_PER_YEAR)
+
+        # Log returns split into an overnight part (with occasional gaps) and an intraday part
+        gap_days = rng['gap_days'].random(n_bars) < self.gap_prob
+        gaps = np.where(gap_days, rng['gap_sizes'].normal(0.0, self.gap_vol, n_bars), 0.0)
+        overnight = 0.3 * vol * rng['overnight'].standard_normal(n_bars) + gaps
+        intraday = drift - 0.5 * vol ** 2 + np.sqrt(0.91) * vol * rng['intraday'].standard_normal(n_bars)
+        overnight[0] = 0.0
+
+        start_price = float(np.exp(rng['start'].uniform(np.log(5.0), np.log(500.0))))
+        log_close = np.log(start_price) + np.cumsum(overnight + intraday)
+        log_open = log_close - intraday
+        close = np.exp(log_close)
+        open_ = np.exp(log_open)
+
+        high = np.maximum(open_, close) * np.exp(np.abs(rng['high_range'].standard_normal(n_bars)) * vol * 0.6)
+        low = np.minimum(open_, close) * np.exp(-np.abs(rng['low_range'].standard_normal(n_bars)) * vol * 0.6)
+
+        base_volume = np.exp(rng['volume'].uniform(np.log(2e5), np.log(2e7)))
+        activity = np.exp(np.abs(overnight + intraday) / np.maximum(vol, 1e-12) * 0.35
+                          + rng['volume'].normal(0.0, 0.35, n_bars))
+        volume = base_volume * activity
+
+        # Splits: share counts multiply by the ratio on split days. The walk above
+        # is the price of one original share; raw prices are per share held at
+        # the time, adjusted prices per share held after the latest split
+        split_days = rng['split_days'].random(n_bars) < self.split_prob
+        split_days[0] = False
+        ratios = np.where(split_days, rng['split_ratios'].choice(self.split_ratios, size=n_bars), 1.0)
+        shares = np.cumprod(ratios)
+        factor = np.full(n_bars, shares[-1]) if self.adjusted else shares
+
+        return {
+            'Open': open_ / factor,
+            'High': high / factor,
+            'Low': low / factor,
+            'Close': close / factor,
+            'Volume': np.rint(volume * factor).astype(np.int64),
+            'Dividends': np.zeros(n_bars),
+            'Stock Splits': np.where(split_days, ratios, 0.0)
+        }
+
+    def intraday(self, symbol: str, minutes: int, days: int, end: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        Intraday bars of `minutes` length for the last `days` sessions (09:30-16:00).
+
+        Each session is a Brownian bridge from the daily Open to the daily Close,
+        so intraday and daily data for a symbol agree; bars are labelled by
+        their start time, like yfinance.
+        """
+        daily = self.history(symbol, end=end).iloc[-days:]
+        if daily.empty:
+            return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+        bars = -(-SESSION_MINUTES // minutes)
+        starts = np.arange(bars) * minutes
+        frac = np.minimum(starts + minutes, SESSION_MINUTES) / SESSION_MINUTES
+
+        # One stream per session, so a day's bars do not change as more days are requested
+        noise = np.stack([
+            self._rng(symbol, 1000 + minutes, day.toordinal()).standard_normal((2, bars))
+            for day in daily.index
+        ])
+        log_open = np.log(daily['Open'].to_numpy())[:, None]
+        log_close = np.log(daily['Close'].to_numpy())[:, None]
+        bar_vol = (np.log(daily['High'].to_numpy() / daily['Low'].to_numpy())[:, None]
+                   / np.sqrt(bars) * 0.5)
+
+        walk = np.cumsum(noise[:, 0] * bar_vol, axis=1)
+        path = log_open + frac * (log_close - log_open) + walk - frac * walk[:, -1:]
+        close = np.exp(path)
+        open_ = np.exp(np.concatenate([log_open, path[:, :-1]], axis=1))
+        wick = np.exp(np.abs(noise[:, 1]) * bar_vol * 0.5)
+        high = np.minimum(np.maximum(open_, close) * wick, daily['High'].to_numpy()[:, None])
+        low = np.maximum(np.minimum(open_, close) / wick, daily['Low'].to_numpy()[:, None])
+        high = np.maximum(high, np.maximum(open_, close))
+        low = np.minimum(low, np.minimum(open_, close))
+
+        # U-shaped volume profile: busier at the open and the close
+        profile = 1.0 + 2.0 * (2 * (starts + minutes / 2) / SESSION_MINUTES - 1) ** 2
+        volume = daily['Volume'].to_numpy()[:, None] * profile / profile.sum()
+
+        index = (daily.index.values[:, None] + np.timedelta64(SESSION_OPEN_MINUTES, 'm')
+                 + starts.astype('timedelta64[m]')).ravel()
+        return pd.DataFrame({
+            'Open': open_.ravel(),
+            'High': high.ravel(),
+            'Low': low.ravel(),
+            'Close': close.ravel(),
+            'Volume': np.rint(volume).astype(np.int64).ravel()
+        }, index=pd.DatetimeIndex(index, name='Datetime'))
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'seed': self.seed,
+            'origin': str(self.origin.date()),
+            'regimes': self.regimes,
+            'regime_switch_prob': self.regime_switch_prob,
+            'gap_prob': self.gap_prob,
+            'split_prob': self.split_prob,
+            'adjusted': self.adjusted
+        }
+
+    def _rng(self, symbol: str, *stream: int) -> np.random.Generator:
+        return np.random.default_rng([self.seed, zlib.crc32(symbol.encode('utf-8')), *stream])
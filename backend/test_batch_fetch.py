@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Offline test of concurrent multi-symbol fetching (core.ml.batch.BatchFetcher)
+
+Runs against LocalProvider with injected latency, in a scratch directory, so
+no network or running backend is needed:
+    cd backend && python -m pytest test_batch_fetch.py
+"""
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from core.ml.batch import BatchFetcher
+from core.ml.data import EnhancedDataIngester
+from core.ml.providers import LocalProvider
+from core.ml.synthetic import SyntheticMarket
+
+LATENCY = 0.05
+
+
+class CountingProvider(LocalProvider):
+    """
+    LocalProvider that records the peak number of concurrent upstream calls
+    and raises for symbols in `failing`
+    """
+    def __init__(self, frames, failing=(), **kwargs):
+        super().__init__(frames=frames, **kwargs)
+        self.failing = set(failing)
+        self.active = 0
+        self.peak = 0
+        self._active_lock = threading.Lock()
+
+    def _history(self, symbol, period=None, start=None):
+        with self._active_lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            if symbol in self.failing:
+                time.sleep(self.latency)
+                raise ConnectionError(f"upstream error for {symbol}")
+            return super()._history(symbol, period=period, start=start)
+        finally:
+            with self._active_lock:
+                self.active -= 1
+
+
+@contextmanager
+def scratch_dir():
+    """
+    Run in an empty directory: the caches live under ./data
+    """
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            yield directory
+        finally:
+            os.chdir(previous)
+
+
+def market_frames(symbols):
+    market = SyntheticMarket(seed=7)
+    end = pd.Timestamp.now().normalize()
+    start = end - pd.DateOffset(years=1)
+    return {symbol: market.history(symbol, start=start, end=end) for symbol in symbols}
+
+
+def test_results_follow_request_order():
+    symbols = ['MSFT', 'AAPL', 'ZZZ', 'GOOGL', 'AAPL', 'AMZN']
+    with scratch_dir():
+        provider = CountingProvider(market_frames(['MSFT', 'AAPL', 'GOOGL', 'AMZN']), latency=LATENCY)
+        results = BatchFetcher(EnhancedDataIngester(provider=provider)).fetch(symbols, period="1y",
+                                                                               include_fundamentals=False)
+    # Duplicates collapse to their first position; the order is the request order, not completion order
+    assert list(results) == ['MSFT', 'AAPL', 'ZZZ', 'GOOGL', 'AMZN']
+
+
+def test_errors_are_isolated_per_symbol():
+    good = ['AAPL', 'MSFT', 'GOOGL', 'AMZN']
+    with scratch_dir():
+        provider = CountingProvider(market_frames(good + ['FAIL']), failing=['FAIL'], latency=LATENCY)
+        results = BatchFetcher(EnhancedDataIngester(provider=provider)).fetch(
+            good + ['FAIL', 'MISSING'], period="1y", include_fundamentals=False)
+
+    for symbol in good:
+        assert results[symbol]['status'] == 'success', results[symbol]['message']
+        assert not results[symbol]['data']['price_history'].empty
+    # An upstream exception and an empty history fail only their own symbol
+    for symbol in ('FAIL', 'MISSING'):
+        assert results[symbol]['status'] == 'error'
+        assert results[symbol]['data'] is None
+
+
+def test_concurrency_is_bounded_by_provider_slots():
+    symbols = [f"S{i:02d}" for i in range(12)]
+    max_concurrency = 3
+    with scratch_dir():
+        provider = CountingProvider(market_frames(symbols), latency=LATENCY, max_concurrency=max_concurrency)
+        fetcher = BatchFetcher(EnhancedDataIngester(provider=provider), max_workers=8)
+        started = time.perf_counter()
+        results = fetcher.fetch(symbols, period="1y", include_fundamentals=False)
+        elapsed = time.perf_counter() - started
+
+    assert all(outcome['status'] == 'success' for outcome in results.values())
+    # More worker threads than slots: calls overlap, but never beyond the provider's slots
+    assert 1 < provider.peak <= max_concurrency
+    assert elapsed < len(symbols) * LATENCY
+
+
+def test_second_fetch_is_served_from_cache():
+    symbols = ['AAPL', 'MSFT']
+    with scratch_dir():
+        provider = CountingProvider(market_frames(symbols), latency=LATENCY)
+        fetcher = BatchFetcher(EnhancedDataIngester(provider=provider))
+        fetcher.fetch(symbols, period="1y", include_fundamentals=False)
+        calls = provider.calls
+        results = fetcher.fetch(symbols, period="1y", include_fundamentals=False)
+
+    assert [outcome['status'] for outcome in results.values()] == ['cached', 'cached']
+    assert provider.calls == calls
+
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Offline test of the compact dtypes (core.ml.compact) against the float64 path
+
+    cd backend && python -m pytest test_compact.py
+"""
+import numpy as np
+import pandas as pd
+
+from core.ml.compact import compact_frame, compare_precision, FLOAT32_RTOL, FLAG_COLUMNS
+from core.ml.synthetic import SyntheticMarket
+
+SYMBOLS = ['AAPL', 'MSFT', 'TSLA']
+
+
+def history(symbol, years=2):
+    end = pd.Timestamp.now().normalize()
+    return SyntheticMarket(seed=5).history(symbol, start=end - pd.DateOffset(years=years), end=end)
+
+
+def test_compact_prices_within_tolerance():
+    for symbol in SYMBOLS:
+        prices = history(symbol)
+        compact = compact_frame(prices)
+        for name in prices.columns:
+            expected = prices[name].to_numpy(dtype=np.float64)
+            actual = compact[name].to_numpy(dtype=np.float64)
+            scale = max(float(np.max(np.abs(expected))), 1e-12)
+            error = float(np.max(np.abs(actual - expected))) / scale
+            assert error <= FLOAT32_RTOL, f"{symbol} {name} differs by {error:.3g}"
+        assert all(compact[name].dtype == np.float32 for name in ['Open', 'High', 'Low', 'Close'])
+        if np.issubdtype(prices['Volume'].dtype, np.integer):
+            assert compact['Volume'].dtype == np.int64
+
+
+def test_compact_features_within_tolerance():
+    for symbol in SYMBOLS:
+        precision = compare_precision(history(symbol), symbol)
+        assert precision['rows'] > 0
+        assert precision['max_relative_error'] <= FLOAT32_RTOL, \
+            f"{symbol} {precision['worst_column']} differs by {precision['max_relative_error']:.3g}"
+
+
+def test_flags_are_int8():
+    features = pd.DataFrame({name: np.array([0, 1, 0]) for name in FLAG_COLUMNS})
+    assert all(dtype == np.int8 for dtype in compact_frame(features).dtypes)
+
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Offline test of incremental feature updates (FeatureEngineer.update_features)
+
+Runs in a scratch directory, so no network or running backend is needed:
+    cd backend && python -m pytest test_features.py
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from core.ml.features import FeatureEngineer
+from core.ml.synthetic import SyntheticMarket
+
+
+@contextmanager
+def scratch_dir():
+    """
+    Run in an empty directory: the caches live under ./data
+    """
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            yield directory
+        finally:
+            os.chdir(previous)
+
+
+def history(symbol='AAPL', years=2):
+    end = pd.Timestamp.now().normalize()
+    return SyntheticMarket(seed=3).history(symbol, start=end - pd.DateOffset(years=years), end=end)
+
+
+def assert_features_match(actual, expected):
+    assert list(actual.index) == list(expected.index)
+    assert list(actual.columns) == list(expected.columns)
+    assert np.allclose(actual.to_numpy(dtype=np.float64), expected.to_numpy(dtype=np.float64), rtol=1e-9)
+
+
+def test_new_bars_are_computed_incrementally():
+    df = history()
+    with scratch_dir():
+        engineer = FeatureEngineer(compact=False)
+        assert engineer.update_features(df.iloc[:-5], 'AAPL')['mode'] == 'full'
+        assert engineer.update_features(df.iloc[:-5], 'AAPL')['mode'] == 'current'
+
+        update = engineer.update_features(df, 'AAPL')
+        assert update['mode'] == 'incremental' and update['rows_added'] == 5
+        assert_features_match(engineer.load_feature_frame('AAPL'), engineer.calculate_all_features(df, 'AAPL'))
+
+
+def test_restated_earlier_bar_recalculates_all_features():
+    df = history()
+    with scratch_dir():
+        engineer = FeatureEngineer(compact=False)
+        engineer.update_features(df, 'AAPL')
+
+        # Same length, last timestamp and last close: only an earlier bar changed
+        restated = df.copy()
+        restated.iloc[100, restated.columns.get_loc('Close')] *= 1.05
+        update = engineer.update_features(restated, 'AAPL')
+
+        assert update['mode'] == 'full'
+        assert_features_match(engineer.load_feature_frame('AAPL'),
+                              engineer.calculate_all_features(restated, 'AAPL'))
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Offline test of the mirrored intraday ring buffer (core.ml.intraday.BarRingBuffer)
+
+    cd backend && python -m pytest test_intraday_buffer.py
+"""
+import numpy as np
+import pandas as pd
+
+from core.ml.intraday import BarRingBuffer, INTRADAY_FIELDS
+
+CAPACITY = 7
+MINUTE = 60 * 10**9
+START = pd.Timestamp('2026-01-05 09:30').value
+
+
+def bars(first, count):
+    """
+    `count` one-minute bars starting at bar number `first`; every field holds the bar number
+    """
+    numbers = np.arange(first, first + count)
+    values = np.repeat(numbers[:, None].astype(np.float64), len(INTRADAY_FIELDS), axis=1)
+    return START + numbers * MINUTE, values
+
+
+def assert_holds(buffer, first, last):
+    # Bars first..last (inclusive), oldest first, as one contiguous slice
+    timestamps, values = buffer.last()
+    expected = np.arange(first, last + 1)
+    assert len(buffer) == len(expected)
+    assert np.array_equal(timestamps, START + expected * MINUTE)
+    assert np.array_equal(values[:, 0], expected)
+    assert not timestamps.flags.writeable and values.base is not None
+
+
+def test_wraparound_keeps_contiguous_order():
+    buffer = BarRingBuffer(CAPACITY)
+    buffer.append(*bars(0, 5))
+    assert_holds(buffer, 0, 4)
+
+    # Past capacity, one bar at a time and in chunks: every head position is visited
+    for first, count in [(5, 1), (6, 3), (9, 4), (13, 1), (14, 6)]:
+        buffer.append(*bars(first, count))
+        assert_holds(buffer, max(0, first + count - CAPACITY), first + count - 1)
+
+    # A chunk longer than the buffer keeps its newest bars
+    buffer.append(*bars(20, 2 * CAPACITY + 3))
+    assert_holds(buffer, 20 + CAPACITY + 3, 20 + 2 * CAPACITY + 2)
+
+    timestamps, values = buffer.last(3)
+    assert np.array_equal(values[:, 0], np.arange(20 + 2 * CAPACITY, 20 + 2 * CAPACITY + 3))
+    frame = buffer.frame(3)
+    assert list(frame.index) == [pd.Timestamp(value) for value in timestamps]
+
+
+def test_same_timestamp_replaces_forming_bar_after_wrap():
+    buffer = BarRingBuffer(CAPACITY)
+    buffer.append(*bars(0, CAPACITY + 2))
+    timestamps, values = bars(CAPACITY + 1, 1)
+    buffer.append(timestamps, values + 0.5)
+    # Older bars are ignored
+    assert buffer.append(*bars(3, 1)) == 0
+
+    _, stored = buffer.last()
+    assert len(buffer) == CAPACITY
+    assert stored[-1, 0] == CAPACITY + 1.5
+    assert np.array_equal(stored[:-1, 0], np.arange(2, CAPACITY + 1))
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Offline test of the universe panel (core.ml.panel) updating symbols in place
+
+    cd backend && python -m pytest test_panel.py
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from core.ml.data import EnhancedDataIngester
+from core.ml.panel import PanelStore, UniversePanel, PANEL_FIELDS
+from core.ml.providers import LocalProvider
+from core.ml.synthetic import SyntheticMarket
+
+SYMBOLS = ['AAPL', 'MSFT', 'GOOGL']
+
+
+@contextmanager
+def scratch_dir():
+    """
+    Run in an empty directory: the caches live under ./data
+    """
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            yield directory
+        finally:
+            os.chdir(previous)
+
+
+def histories(symbols, years=1):
+    market = SyntheticMarket(seed=9)
+    end = pd.Timestamp.now().normalize()
+    return {symbol: market.history(symbol, start=end - pd.DateOffset(years=years), end=end) for symbol in symbols}
+
+
+def assert_same_panel(actual: PanelStore, expected: PanelStore):
+    assert sorted(actual.symbols) == sorted(expected.symbols)
+    assert actual.dates.equals(expected.dates)
+    for field in PANEL_FIELDS:
+        np.testing.assert_array_equal(actual.window(field, symbols=expected.symbols).to_numpy(),
+                                      expected.window(field).to_numpy())
+
+
+class CountingLoader:
+    def __init__(self, frames):
+        self.frames = frames
+        self.loaded = []
+
+    def __call__(self, symbol):
+        self.loaded.append(symbol)
+        return self.frames.get(symbol)
+
+
+def test_update_appends_rows_in_place():
+    frames = histories(SYMBOLS)
+    with scratch_dir():
+        stale = {symbol: df.iloc[:-5] for symbol, df in frames.items()}
+        store = PanelStore.build(SYMBOLS, stale.get, Path('panel'))
+        mapped = os.stat(Path('panel') / 'Close.npy').st_ino
+
+        # One symbol gains five bars and has an earlier bar corrected
+        changed = frames['MSFT'].copy()
+        changed.iloc[10, changed.columns.get_loc('Close')] *= 1.01
+        updated = store.update({'MSFT': changed})
+
+        assert os.stat(Path('panel') / 'Close.npy').st_ino == mapped
+        expected = PanelStore.build(SYMBOLS, dict(stale, MSFT=changed).get, Path('expected'))
+        assert_same_panel(updated, expected)
+        assert updated.symbol_frame('MSFT')['Close'].iloc[10] == changed['Close'].iloc[10]
+
+
+def test_update_adds_symbols_without_reloading_others():
+    frames = histories(SYMBOLS + ['AMZN'])
+    with scratch_dir():
+        store = PanelStore.build(SYMBOLS, frames.get, Path('panel'))
+        updated = store.update({'AMZN': frames['AMZN']})
+        assert_same_panel(updated, PanelStore.build(SYMBOLS + ['AMZN'], frames.get, Path('expected')))
+
+
+def test_refresh_loads_only_changed_symbols():
+    frames = histories(SYMBOLS)
+    with scratch_dir():
+        provider = LocalProvider(frames={symbol: df.iloc[:-5] for symbol, df in frames.items()})
+        ingester = EnhancedDataIngester(provider=provider, compact=False)
+        for symbol in SYMBOLS:
+            ingester.fetch_all_data(symbol, period="1y", include_fundamentals=False)
+        panel = UniversePanel(Path('data/panel'))
+        loader = CountingLoader({symbol: ingester.load_price_history(symbol) for symbol in SYMBOLS})
+        panel.refresh(SYMBOLS, loader)
+        assert sorted(loader.loaded) == sorted(SYMBOLS)
+
+        # A routine incremental fetch of one symbol
+        provider.frames['GOOGL'] = frames['GOOGL']
+        ingester.fetch_all_data('GOOGL', period="1y", incremental=True, include_fundamentals=False)
+        loader.frames['GOOGL'] = ingester.load_price_history('GOOGL')
+        loader.loaded.clear()
+        panel.request(SYMBOLS)
+        store = panel.refresh_requested(loader)
+
+        assert loader.loaded == ['GOOGL']
+        assert store.dates[-1] == frames['GOOGL'].index[-1]
+        assert panel.stats()['updates'] == 1 and panel.stats()['pending_symbols'] == 0
+        # Unchanged: nothing is loaded
+        loader.loaded.clear()
+        panel.refresh(SYMBOLS, loader)
+        assert loader.loaded == []
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Offline test of incremental price history updates (core.ml.store.merge_price_frames)
+and of re-adjusting cached history for new corporate actions (core.ml.adjust)
+
+Runs against LocalProvider in a scratch directory, so no network or running
+backend is needed:
+    cd backend && python -m pytest test_price_history.py
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from core.ml.adjust import back_adjust, DIVIDENDS, SPLITS
+from core.ml.data import EnhancedDataIngester
+from core.ml.providers import LocalProvider
+from core.ml.store import merge_price_frames
+from core.ml.synthetic import SyntheticMarket
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+
+@contextmanager
+def scratch_dir():
+    """
+    Run in an empty directory: the caches live under ./data
+    """
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            yield directory
+        finally:
+            os.chdir(previous)
+
+
+def history(symbol='AAPL', years=1, adjusted=True):
+    end = pd.Timestamp.now().normalize()
+    market = SyntheticMarket(seed=3, adjusted=adjusted)
+    return market.history(symbol, start=end - pd.DateOffset(years=years), end=end)
+
+
+def restate(df, position, factor=1.05):
+    df = df.copy()
+    df.iloc[position, [df.columns.get_loc(col) for col in PRICE_COLUMNS]] *= factor
+    return df
+
+
+def test_merge_appends_new_bars():
+    df = history()
+    merged, info = merge_price_frames(df.iloc[:-10], df.iloc[-15:])
+
+    assert info['appended'] == 10 and info['overlap'] == 5
+    assert info['repaired'] == 0 and not info['restated']
+    pd.testing.assert_frame_equal(merged, df, check_dtype=False, check_freq=False)
+
+
+def test_merge_repairs_last_cached_bar():
+    df = history()
+    # The last cached bar was still forming: the delta's final values replace it
+    cached = restate(df.iloc[:-10], -1)
+    merged, info = merge_price_frames(cached, df.iloc[-15:])
+
+    assert info['repaired'] == 1 and not info['restated']
+    assert np.allclose(merged[PRICE_COLUMNS].to_numpy(), df[PRICE_COLUMNS].to_numpy())
+
+
+def test_merge_reports_restated_history():
+    df = history()
+    cached = df.iloc[:-10]
+    merged, info = merge_price_frames(cached, restate(df, -13).iloc[-15:])
+
+    assert info['restated']
+    assert pd.Timestamp(info['restated_from']) == df.index[-13]
+
+
+def test_restated_bar_forces_full_download():
+    df = history()
+    with scratch_dir():
+        provider = LocalProvider(frames={'AAPL': df.iloc[:-10]})
+        ingester = EnhancedDataIngester(provider=provider, compact=False)
+        ingester.fetch_all_data('AAPL', period="1y", include_fundamentals=False)
+
+        # Upstream restates a bar inside the incremental overlap
+        provider.frames['AAPL'] = restate(df, -13)
+        calls = provider.calls
+        data = ingester.fetch_all_data('AAPL', period="1y", incremental=True, include_fundamentals=False)
+
+        # One incremental request, then the full download it fell back to
+        assert provider.calls == calls + 2
+        assert data['price_history_metadata'].get('fetch_mode') != 'incremental'
+        cached, _ = ingester._read_price('AAPL', compact=False)
+        assert np.allclose(cached[PRICE_COLUMNS].to_numpy(), restate(df, -13)[PRICE_COLUMNS].to_numpy())
+
+
+def raw_with_new_actions():
+    """
+    Unadjusted history with a dividend and a 2:1 split among its last bars
+    """
+    df = history(years=2, adjusted=False)
+    df[DIVIDENDS] = 0.0
+    df.iloc[-20:, df.columns.get_loc(SPLITS)] = 0.0
+    df.iloc[-6, df.columns.get_loc(DIVIDENDS)] = 0.02 * df['Close'].iloc[-7]
+    df.iloc[-3:, [df.columns.get_loc(col) for col in PRICE_COLUMNS]] /= 2
+    df.iloc[-3:, df.columns.get_loc('Volume')] *= 2
+    df.iloc[-3, df.columns.get_loc(SPLITS)] = 2.0
+    return df
+
+
+def incremental_history(raw, adjusted):
+    """
+    Cache the history up to before the new actions, then fetch the rest incrementally
+    """
+    before = raw.iloc[:-8]
+    frames = {True: (back_adjust(before), back_adjust(raw)), False: (before, raw)}[adjusted]
+    with scratch_dir():
+        provider = LocalProvider(frames={'AAPL': frames[0]}, adjusted=adjusted)
+        ingester = EnhancedDataIngester(provider=provider, compact=False)
+        ingester.fetch_all_data('AAPL', period="2y", include_fundamentals=False)
+
+        provider.frames['AAPL'] = frames[1]
+        calls = provider.calls
+        data = ingester.fetch_all_data('AAPL', period="2y", incremental=True, include_fundamentals=False)
+        # No fallback to a full download
+        assert provider.calls == calls + 1
+        assert data['price_history_metadata']['fetch_mode'] == 'incremental'
+        assert data['price_history_metadata']['readjusted_actions'] == 2
+        cached, _ = ingester._read_price('AAPL', compact=False)
+    return cached
+
+
+def assert_same_history(actual, expected):
+    assert list(actual.index) == list(expected.index)
+    for col in PRICE_COLUMNS:
+        assert np.allclose(actual[col].to_numpy(), expected[col].to_numpy(), rtol=1e-9), col
+    assert np.array_equal(actual['Volume'].to_numpy(), expected['Volume'].to_numpy())
+
+
+def test_readjust_raw_delta_matches_full_back_adjust():
+    raw = raw_with_new_actions()
+    assert_same_history(incremental_history(raw, adjusted=False), back_adjust(raw))
+
+
+def test_readjust_adjusted_delta_matches_full_back_adjust():
+    raw = raw_with_new_actions()
+    assert_same_history(incremental_history(raw, adjusted=True), back_adjust(raw))
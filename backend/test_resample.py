@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Offline test of weekly/monthly bars (core.ml.resample) and of the short/long
+prediction features computed on them (core.ml.model)
+
+Runs against LocalProvider in a scratch directory, so no network or running
+backend is needed:
+    cd backend && python -m pytest test_resample.py
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from core.ml import model
+from core.ml.data import EnhancedDataIngester
+from core.ml.providers import LocalProvider
+from core.ml.resample import ResampleCache, resample_bars
+from core.ml.synthetic import SyntheticMarket
+
+
+@contextmanager
+def scratch_dir():
+    """
+    Run in an empty directory: the caches live under ./data
+    """
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            yield directory
+        finally:
+            os.chdir(previous)
+
+
+def history(symbol='AAPL', years=6):
+    end = pd.Timestamp.now().normalize()
+    return SyntheticMarket(seed=3).history(symbol, start=end - pd.DateOffset(years=years), end=end)
+
+
+def test_incremental_resample_matches_full():
+    df = history()
+    cache = ResampleCache()
+    cache.get('AAPL', 'weekly', df.iloc[:-7])
+    bars = cache.get('AAPL', 'weekly', df)
+
+    assert cache.incremental == 1 and cache.rebuilds == 1
+    pd.testing.assert_frame_equal(bars, resample_bars(df, 'weekly'), check_dtype=False)
+
+
+def test_short_and_long_predictions_use_resampled_features():
+    df = history()
+    previous = model._components.pop('ingester', None)
+    try:
+        with scratch_dir():
+            ingester = EnhancedDataIngester(provider=LocalProvider(frames={'AAPL': df}))
+            ingester.fetch_all_data('AAPL', period="5y", include_fundamentals=False)
+            model._components['ingester'] = ingester
+            model.LOGS_DIR.mkdir(parents=True, exist_ok=True)
+
+            for horizon, resolution in [('intraday', 'daily'), ('short', 'weekly'), ('long', 'monthly')]:
+                prediction = model.predict_stock_price('AAPL', horizon, verbose=False)
+                assert prediction['feature_resolution'] == resolution
+
+            weekly = ingester.load_horizon_bars('AAPL', 'short')
+            values = model._horizon_feature_values('AAPL', 'short')
+            assert values['Close'] == weekly['Close'].iloc[-1]
+            assert np.isclose(values['SMA_50'], weekly['Close'].iloc[-50:].mean())
+    finally:
+        model._components.pop('horizon_values', None)
+        model._components.pop('ingester', None)
+        if previous is not None:
+            model._components['ingester'] = previous
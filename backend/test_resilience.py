@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Offline test of the provider failure handling (core.ml.resilience and
+core.ml.providers.FallbackProvider)
+
+    cd backend && python -m pytest test_resilience.py
+"""
+import random
+import time
+
+import pandas as pd
+import pytest
+
+from core.ml.providers import FallbackProvider, LocalProvider, ResilientProvider
+from core.ml.resilience import (CircuitBreaker, ResilientCaller, RetryPolicy, ProviderTimeout,
+                                ProviderUnavailable)
+from core.ml.synthetic import SyntheticMarket
+
+RESET = 0.05
+
+
+class Upstream:
+    """
+    Callable that fails its first `failures` calls, then returns 'ok'
+    """
+    def __init__(self, failures=0, delay=0.0):
+        self.failures = failures
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise ConnectionError(f"failure {self.calls}")
+        return 'ok'
+
+
+class FailingProvider(LocalProvider):
+    name = 'primary'
+    label = 'failing provider'
+
+    def _history(self, symbol, period=None, start=None):
+        self.calls += 1
+        raise ConnectionError("upstream down")
+
+
+def caller(attempts=1, timeout=None, threshold=3):
+    return ResilientCaller('test', RetryPolicy(attempts=attempts, timeout=timeout, base_delay=0.0),
+                           CircuitBreaker('test', failure_threshold=threshold, reset_timeout=RESET))
+
+
+def frames():
+    end = pd.Timestamp.now().normalize()
+    return {'AAPL': SyntheticMarket(seed=1).history('AAPL', start=end - pd.DateOffset(months=3), end=end)}
+
+
+def test_breaker_opens_after_threshold_failures():
+    resilient = caller(threshold=3)
+    upstream = Upstream(failures=100)
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            resilient.call(upstream)
+    assert resilient.breaker.state == 'open'
+
+    # Open: fails fast without calling upstream
+    with pytest.raises(ProviderUnavailable):
+        resilient.call(upstream)
+    assert upstream.calls == 3
+    assert resilient.breaker.stats()['rejected'] == 1
+
+
+def test_half_open_trial_success_closes_breaker():
+    resilient = caller(threshold=1)
+    with pytest.raises(ConnectionError):
+        resilient.call(Upstream(failures=1))
+    assert resilient.breaker.state == 'open'
+
+    time.sleep(RESET * 1.5)
+    breaker = resilient.breaker
+    assert breaker.allow()
+    # Only one trial call while half-open
+    assert breaker.state == 'half_open' and not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert resilient.call(Upstream()) == 'ok'
+
+
+def test_half_open_trial_failure_reopens_breaker():
+    resilient = caller(threshold=1)
+    upstream = Upstream(failures=100)
+    with pytest.raises(ConnectionError):
+        resilient.call(upstream)
+
+    time.sleep(RESET * 1.5)
+    with pytest.raises(ConnectionError):
+        resilient.call(upstream)
+    stats = resilient.breaker.stats()
+    assert stats['state'] == 'open' and stats['times_opened'] == 2
+    with pytest.raises(ProviderUnavailable):
+        resilient.call(upstream)
+    assert upstream.calls == 2
+
+
+def test_retries_until_success():
+    resilient = caller(attempts=3, threshold=5)
+    upstream = Upstream(failures=2)
+    assert resilient.call(upstream) == 'ok'
+    assert upstream.calls == 3
+    stats = resilient.stats()
+    assert stats['retries'] == 2 and stats['failures'] == 2
+    assert stats['circuit']['state'] == 'closed' and stats['circuit']['consecutive_failures'] == 0
+
+
+def test_backoff_is_jittered_and_capped():
+    policy = RetryPolicy(base_delay=0.5, max_delay=2.0)
+    random.seed(0)
+    for attempt in range(1, 8):
+        delays = [policy.delay(attempt) for _ in range(200)]
+        cap = min(2.0, 0.5 * 2 ** (attempt - 1))
+        assert all(0 <= delay <= cap for delay in delays)
+        assert max(delays) - min(delays) > cap / 2
+
+
+def test_deadline_raises_timeout():
+    resilient = caller(timeout=0.05)
+    started = time.perf_counter()
+    with pytest.raises(ProviderTimeout):
+        resilient.call(Upstream(delay=0.5))
+    assert time.perf_counter() - started < 0.4
+    assert resilient.stats()['timeouts'] == 1
+
+
+def test_unsupported_calls_are_not_failures():
+    resilient = caller(attempts=3, threshold=1)
+
+    def unsupported():
+        raise NotImplementedError
+
+    with pytest.raises(NotImplementedError):
+        resilient.call(unsupported)
+    assert resilient.stats()['retries'] == 0
+    assert resilient.breaker.state == 'closed'
+
+
+def test_fallback_serves_from_next_provider():
+    primary = ResilientProvider(FailingProvider(), timeout=None, retries=0, failure_threshold=2,
+                                reset_timeout=60)
+    chain = FallbackProvider([primary, LocalProvider(frames=frames())])
+
+    df = chain.history('AAPL')
+    assert not df.empty and df.attrs['provider'] == 'local'
+    assert chain.stats()['fallbacks'] == 1
+
+    # Once the primary's breaker is open, it is skipped without an upstream call
+    chain.history('AAPL')
+    calls = primary.provider.calls
+    chain.history('AAPL')
+    assert primary.provider.calls == calls == 2
+    assert chain.stats()['fallbacks'] == 3
+
+
+def test_fallback_on_empty_answer_and_last_error():
+    chain = FallbackProvider([LocalProvider(frames={}), LocalProvider(frames=frames())])
+    assert not chain.history('AAPL').empty
+    # Nothing anywhere: an empty frame, not an error
+    assert chain.history('MISSING').empty
+
+    with pytest.raises(ConnectionError):
+        FallbackProvider([FailingProvider(), FailingProvider()]).history('AAPL')
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Offline test of single-flight coalescing (core.ml.singleflight.SingleFlight)
+
+    cd backend && python -m pytest test_singleflight.py
+"""
+import threading
+import time
+
+from core.ml.singleflight import SingleFlight
+
+THREADS = 8
+
+
+def run_concurrently(flight, key, fn):
+    """
+    Call flight.do(key, fn) from THREADS threads; fn blocks until every other
+    thread has joined the call in flight. Returns each thread's result or exception.
+    """
+    release = threading.Event()
+    outcomes = [None] * THREADS
+
+    def blocking():
+        release.wait(5)
+        return fn()
+
+    def worker(i):
+        try:
+            outcomes[i] = ('result', flight.do(key, blocking))
+        except Exception as e:
+            outcomes[i] = ('error', e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while flight.stats()['coalesced'] < THREADS - 1 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    return outcomes
+
+
+def test_concurrent_callers_share_one_result():
+    flight = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return object()
+
+    outcomes = run_concurrently(flight, ('fetch', 'AAPL'), fetch)
+
+    assert len(calls) == 1
+    assert all(kind == 'result' for kind, _ in outcomes)
+    assert all(value is outcomes[0][1] for _, value in outcomes)
+    stats = flight.stats()
+    assert stats['stages']['fetch'] == {'executions': 1, 'coalesced': THREADS - 1, 'errors': 0}
+    assert stats['in_flight'] == []
+
+
+def test_concurrent_callers_share_one_exception():
+    flight = SingleFlight()
+    calls = []
+
+    def fail():
+        calls.append(1)
+        raise ConnectionError("upstream down")
+
+    outcomes = run_concurrently(flight, ('fetch', 'AAPL'), fail)
+
+    assert len(calls) == 1
+    assert all(kind == 'error' for kind, _ in outcomes)
+    assert all(error is outcomes[0][1] for _, error in outcomes)
+    assert flight.stats()['stages']['fetch']['errors'] == 1
+
+
+def test_finished_calls_are_not_reused():
+    flight = SingleFlight()
+    assert flight.do(('train', 'AAPL'), lambda: 1) == 1
+    assert flight.do(('train', 'AAPL'), lambda: 2) == 2
+    # Different keys never coalesce
+    assert flight.do(('train', 'MSFT'), lambda: 3) == 3
+    assert flight.stats()['stages']['train'] == {'executions': 3, 'coalesced': 0, 'errors': 0}
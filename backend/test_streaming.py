@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Offline test of the streaming indicators (core.ml.streaming) against the batch features
+
+    cd backend && python -m pytest test_streaming.py
+"""
+import copy
+import math
+
+import numpy as np
+import pandas as pd
+
+from core.ml.features import FeatureEngineer
+from core.ml.indicators import plan_for
+from core.ml.streaming import StreamingFeatures
+from core.ml.synthetic import SyntheticMarket
+
+# Streaming and batch paths differ only by floating-point rounding
+RTOL = 1e-9
+
+
+def history(symbol='AAPL', years=3):
+    end = pd.Timestamp.now().normalize()
+    return SyntheticMarket(seed=11).history(symbol, start=end - pd.DateOffset(years=years), end=end)
+
+
+def relative_errors(expected: pd.DataFrame, actual: pd.DataFrame):
+    errors = {}
+    for column in expected.columns:
+        want = expected[column].to_numpy(dtype=np.float64)
+        got = actual[column].to_numpy(dtype=np.float64)
+        scale = np.maximum(np.abs(want), 1e-12)
+        errors[column] = float(np.max(np.abs(got - want) / scale)) if len(want) else 0.0
+    return errors
+
+
+def test_streamed_features_match_batch():
+    df = history()
+    # Full precision explicitly: COMPACT_DTYPES=1 would make the batch frame float32
+    batch = FeatureEngineer(compact=False).calculate_all_features(df, 'streaming-check')
+    streamed = StreamingFeatures().feed(df).reindex(batch.index)
+
+    # Every registered indicator is streamed (pass-through columns like Dividends are not)
+    missing = set(plan_for().columns) - set(streamed.columns)
+    assert not missing, f"not streamed: {', '.join(sorted(missing))}"
+    errors = relative_errors(batch[[column for column in batch.columns if column in streamed.columns]], streamed)
+    worst = max(errors, key=errors.get)
+    assert errors[worst] <= RTOL, f"{worst} differs by {errors[worst]:.3g}"
+
+
+def test_peek_matches_update_without_consuming():
+    df = history('MSFT', years=1)
+    engine = StreamingFeatures()
+    engine.feed(df.iloc[:-1])
+    before = copy.deepcopy(engine)
+
+    last = df.iloc[-1]
+    bars = [
+        (last['Open'], last['High'], last['Low'], last['Close'], last['Volume']),
+        (last['Open'], last['High'] * 1.5, last['Low'] * 0.5, last['Close'] * 1.2, 0.0),
+        (last['Open'], math.nan, last['Low'], last['Close'], last['Volume']),
+    ]
+    for bar in bars:
+        peeked = engine.peek(*bar)
+        expected = copy.deepcopy(engine).update(*bar)
+        for name, value in expected.items():
+            assert peeked[name] == value or (value != value and peeked[name] != peeked[name]), name
+
+    # Peeking left every indicator as it was
+    assert engine.bars == before.bars
+    assert engine.update(*bars[0]) == before.update(*bars[0])
+
@@ -148,21 +148,20 @@ class EnhancedDataIngester:
         np.random.seed(42)  # For reproducible results
         base_price = 100 + np.random.random() * 50  # Random base price between 100-150
         
-        prices = []
-        current_price = base_price
-        for _ in dates:
-            change = np.random.normal(0, 2)  # Random daily change
-            current_price = max(1, current_price + change)  # Ensure price doesn't go below 1
-            prices.append(current_price)
+        # Random walk floored at 1 (price_t = max(1, price_{t-1} + change_t)), in closed
+        # form: the floor lifts the unfloored walk by its largest shortfall below 1 so far
+        changes = np.random.normal(0, 2, size=len(dates))
+        walk = base_price + np.cumsum(changes)
+        prices = walk + np.maximum(np.maximum.accumulate(1 - walk), 0)
         
         df = pd.DataFrame({
             'Open': prices,
-            'High': [p * (1 + abs(np.random.normal(0, 0.02))) for p in prices],
-            'Low': [p * (1 - abs(np.random.normal(0, 0.02))) for p in prices],
+            'High': prices * (1 + np.abs(np.random.normal(0, 0.02, size=len(dates)))),
+            'Low': prices * (1 - np.abs(np.random.normal(0, 0.02, size=len(dates)))),
             'Close': prices,
             'Volume': np.random.randint(100000, 10000000, size=len(dates)),
-            'Dividends': [0.0] * len(dates),
-            'Stock Splits': [0.0] * len(dates)
+            'Dividends': np.zeros(len(dates)),
+            'Stock Splits': np.zeros(len(dates))
         }, index=dates)
         
         df.index.name = 'Date'
@@ -212,19 +211,32 @@ class EnhancedDataIngester:
         return data
 
 
-class FeatureEngineer:
-    """
-    Feature engineering class that calculates technical indicators
-    """
-    def __init__(self):
-        # Import pandas_ta if available, otherwise use basic indicators
+# pandas_ta module once imported (None if missing); the import is heavy, so it is done on first use
+_pandas_ta = {}
+
+
+def _load_pandas_ta():
+    if 'module' not in _pandas_ta:
         try:
             import pandas_ta as ta
-            self.ta_available = True
-            self.ta = ta
+            _pandas_ta['module'] = ta
         except ImportError:
-            self.ta_available = False
+            _pandas_ta['module'] = None
             logger.warning("pandas_ta not available, using basic indicators only")
+    return _pandas_ta['module']
+
+
+class FeatureEngineer:
+    """
+    Feature engineering class that calculates technical indicators
+    """
+    @property
+    def ta(self):
+        return _load_pandas_ta()
+    
+    @property
+    def ta_available(self) -> bool:
+        return _load_pandas_ta() is not None
     
     def calculate_all_features(self, df: pd.DataFrame, symbol: str) -> pd.DataFrame:
         """
@@ -312,15 +324,12 @@ class FeatureEngineer:
         """
         Calculate On-Balance Volume
         """
-        obv = [0]
-        for i in range(1, len(df)):
-            if df['Close'].iloc[i] > df['Close'].iloc[i-1]:
-                obv.append(obv[-1] + df['Volume'].iloc[i])
-            elif df['Close'].iloc[i] < df['Close'].iloc[i-1]:
-                obv.append(obv[-1] - df['Volume'].iloc[i])
-            else:
-                obv.append(obv[-1])
-        return pd.Series(obv, index=df.index)
+        # Signed volume (+ on up closes, - on down closes, 0 when unchanged), accumulated
+        close = df['Close'].to_numpy()
+        volume = df['Volume'].to_numpy()
+        change = np.diff(close, prepend=close[:1])
+        signed = np.where(change > 0, volume, np.where(change < 0, -volume, 0))
+        return pd.Series(np.cumsum(signed), index=df.index)
     
     def _calculate_atr(self, df: pd.DataFrame) -> pd.Series:
         """